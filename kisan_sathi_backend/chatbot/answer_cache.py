@@ -0,0 +1,181 @@
+"""
+Per-process cache of chatbot answers keyed on the normalized question.
+
+Retrieval only sees the question's set of tokens after ``tokenize``
+(lowercased, punctuation and filler words dropped, Kannada farming terms
+folded to their English equivalents), so two questions with the same token
+set get the same answer. The cache key is that set, sorted, plus the answer
+language; "Best time to plant rice?" and "rice: when is the best planting
+time" share one entry.
+
+An answer costs a fraction of a millisecond to compute, less than a round
+trip to a shared cache, so entries live in a bounded LRU in each process.
+The whole cache is dropped when the knowledge version changes.
+
+With ``CHATBOT_NEAR_DUPLICATES`` on, a miss also looks for an earlier
+question whose normalized form is a near duplicate (a misspelling, an
+extra word): MinHash signatures over character trigrams, banded for
+locality-sensitive hashing, find candidates whose estimated Jaccard
+similarity is at least ``CHATBOT_NEAR_DUPLICATE_THRESHOLD``.
+"""
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .text import tokenize
+
+
+# 16 bands of 4 rows: pairs at Jaccard 0.8 share a band with ~99.9% probability, at 0.4 ~34%
+BANDS = 16
+ROWS = 4
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20240601)
+_A = _rng.integers(1, 1 << 32, BANDS * ROWS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, BANDS * ROWS, dtype=np.uint64)
+
+
+def normalize_question(question: str) -> str:
+    return ' '.join(sorted(set(tokenize(question))))
+
+
+def minhash(text: str) -> np.ndarray:
+    padded = f" {text} "
+    shingles = np.array(
+        sorted({zlib.crc32(padded[i:i + 3].encode()) for i in range(len(padded) - 2)}), dtype=np.uint64,
+    )
+    # (a * x + b) mod p for every permutation and shingle; values stay below 2**64
+    return ((np.outer(_A, shingles) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+class NearDuplicates:
+    """LSH over the MinHash signatures of the normalized questions in the cache."""
+
+    def __init__(self):
+        self.signatures: Dict[Tuple[str, str], np.ndarray] = {}
+        self.buckets: Dict[Tuple[int, bytes], set] = {}
+
+    def _bands(self, signature):
+        return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+    def add(self, key, signature):
+        self.signatures[key] = signature
+        for band in self._bands(signature):
+            self.buckets.setdefault(band, set()).add(key)
+
+    def discard(self, key):
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band in self._bands(signature):
+            keys = self.buckets[band]
+            keys.discard(key)
+            if not keys:
+                del self.buckets[band]
+
+    def find(self, language, signature, threshold) -> Optional[Tuple[str, str]]:
+        candidates = set()
+        for band in self._bands(signature):
+            candidates |= self.buckets.get(band, set())
+        best, best_similarity = None, threshold
+        for key in candidates:
+            if key[0] != language:
+                continue
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = key, similarity
+        return best
+
+
+class AnswerCache:
+    def __init__(self):
+        self.version = None
+        self.entries: 'OrderedDict[Tuple[str, str], dict]' = OrderedDict()
+        self.near = NearDuplicates()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        # Time spent computing answers on misses, and on lookups (hit or miss)
+        self.compute_seconds = 0.0
+        self.lookup_seconds = 0.0
+
+    def _reset(self, version):
+        self.version = version
+        self.entries.clear()
+        self.near = NearDuplicates()
+
+    def _put(self, key, signature, result):
+        self.entries[key] = result
+        if signature is not None:
+            self.near.add(key, signature)
+        while len(self.entries) > settings.CHATBOT_ANSWER_CACHE_SIZE:
+            evicted, _ = self.entries.popitem(last=False)
+            self.near.discard(evicted)
+
+    def _hit(self, key, started):
+        self.entries.move_to_end(key)
+        self.lookup_seconds += time.perf_counter() - started
+        return self.entries[key]
+
+    def fetch(self, version, question, language, compute: Callable[[], dict]) -> dict:
+        """The cached answer to ``question`` in ``language``, else ``compute()``'s, remembered."""
+        started = time.perf_counter()
+        key = (language, normalize_question(question))
+        with self.lock:
+            if version != self.version:
+                self._reset(version)
+            if key in self.entries:
+                self.hits += 1
+                return self._hit(key, started)
+
+        signature = None
+        if settings.CHATBOT_NEAR_DUPLICATES and key[1]:
+            signature = minhash(key[1])
+            with self.lock:
+                match = self.near.find(language, signature, settings.CHATBOT_NEAR_DUPLICATE_THRESHOLD)
+                if match is not None and match in self.entries:
+                    self.near_hits += 1
+                    return self._hit(match, started)
+        lookup = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = compute()
+        seconds = time.perf_counter() - started
+        with self.lock:
+            self.misses += 1
+            self.lookup_seconds += lookup
+            self.compute_seconds += seconds
+            if version == self.version:
+                self._put(key, signature, result)
+        return result
+
+    def stats(self) -> dict:
+        with self.lock:
+            hits = self.hits + self.near_hits
+            lookups = hits + self.misses
+            # Each hit would have cost about as much as the average miss
+            saved = hits * self.compute_seconds / self.misses if self.misses else 0.0
+            return {
+                'version': self.version,
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'nearHits': self.near_hits,
+                'misses': self.misses,
+                'hitRate': round(hits / lookups, 4) if lookups else 0.0,
+                'savedSeconds': round(saved, 6),
+                'lookupSeconds': round(self.lookup_seconds, 6),
+            }
+
+    def clear(self):
+        with self.lock:
+            self._reset(None)
+            self.hits = self.near_hits = self.misses = 0
+            self.compute_seconds = self.lookup_seconds = 0.0
+
+
+answer_cache = AnswerCache()
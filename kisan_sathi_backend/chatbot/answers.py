@@ -0,0 +1,70 @@
+"""Compose chatbot answers from the top retrieved knowledge documents."""
+from .answer_cache import answer_cache
+from .index import get_knowledge_index
+from .sessions import recent_questions, remember
+from .text import detect_language
+
+
+# BM25 score below which the best match is too weak to answer with
+MIN_SCORE = 1.0
+MAX_SOURCES = 3
+
+NO_ANSWER = {
+    'en': "Sorry, I don't have an answer for that yet. Try asking about crop diseases, farming tips "
+          "or government schemes.",
+    'kn': "ಕ್ಷಮಿಸಿ, ಇದಕ್ಕೆ ಉತ್ತರ ಇನ್ನೂ ಇಲ್ಲ. ಬೆಳೆ ರೋಗಗಳು, ಕೃಷಿ ಸಲಹೆಗಳು ಅಥವಾ ಸರ್ಕಾರಿ ಯೋಜನೆಗಳ ಬಗ್ಗೆ ಕೇಳಿ.",
+}
+
+
+def _matches(index, query, language):
+    groups = {}
+    for doc_id, score in index.search(query, k=10, language=language):
+        if score < MIN_SCORE:
+            break
+        groups.setdefault(index.documents[doc_id].group, score)
+    return groups
+
+
+def _compose(index, query, language):
+    groups = _matches(index, query, language)
+    if not groups:
+        return {'answer': NO_ANSWER[language], 'language': language, 'sources': []}
+
+    ranked = [index.in_language(group, language) for group in list(groups)[:MAX_SOURCES]]
+    best = ranked[0]
+    return {
+        'answer': f"{best.title}\n{best.body}",
+        'language': best.language,
+        'sources': [
+            {'type': doc.source, 'id': doc.group.split(':', 1)[1], 'title': doc.title,
+             'score': round(groups[doc.group], 2)}
+            for doc in ranked
+        ],
+    }
+
+
+def answer(question, language=None, context=()):
+    """
+    ``{'answer', 'language', 'sources'}`` for ``question``, in ``language``
+    (default: the question's script) where the matched item has that
+    translation, else English. ``context`` holds the conversation's earlier
+    questions, oldest first; a follow-up that does not match on its own
+    ("how do I treat it?") is retried together with the previous question.
+    Answers come from the normalized-question cache when they can.
+    """
+    language = language if language in NO_ANSWER else detect_language(question)
+    index = get_knowledge_index()
+    result = answer_cache.fetch(index.version, question, language, lambda: _compose(index, question, language))
+    if not result['sources'] and context:
+        followup = f"{context[-1]} {question}"
+        result = answer_cache.fetch(index.version, followup, language, lambda: _compose(index, followup, language))
+    return result
+
+
+def respond(question, language=None, session_id=None):
+    """``answer`` within a session: the session's earlier questions are its context."""
+    turns = recent_questions(session_id) if session_id else []
+    result = answer(question, language, turns)
+    if session_id:
+        remember(session_id, question, turns)
+    return result
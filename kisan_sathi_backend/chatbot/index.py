@@ -0,0 +1,168 @@
+"""
+BM25 retrieval index over the chatbot's knowledge documents.
+
+The index is an inverted file in CSR form: ``indptr[t]:indptr[t + 1]``
+slices ``doc_ids`` and ``weights`` for term ``t``, where each weight is the
+term's full BM25 contribution to that document, computed at build time. A
+query is therefore a few array slices and one ``np.bincount`` over the
+matched postings, followed by ``argpartition`` for the top k.
+
+Indexes are written to ``CHATBOT_INDEX_DIR/<knowledge version>/`` and the
+arrays are loaded memory-mapped, so every worker on a host shares one copy
+in the page cache. Whichever process first sees a new knowledge version
+builds it; the others load the directory it publishes. Publishing a
+version removes the directories of the versions it supersedes.
+"""
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .knowledge import Document, collect_documents, knowledge_version, superseded
+from .text import tokenize
+
+
+K1 = 1.2
+B = 0.75
+# Titles say what a document is about; count their terms more
+TITLE_REPEAT = 2
+
+
+class KnowledgeIndex:
+    def __init__(self, version, vocab, documents, indptr, doc_ids, weights):
+        self.version = version
+        self.vocab = vocab
+        self.documents: List[Document] = documents
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.languages = np.array([doc.language for doc in documents])
+        self.translations = {}
+        for doc_id, doc in enumerate(documents):
+            self.translations.setdefault(doc.group, {})[doc.language] = doc_id
+
+    def in_language(self, group, language) -> Document:
+        """The group's document in ``language``, else in English, else any."""
+        docs = self.translations[group]
+        doc_id = docs.get(language, docs.get('en', next(iter(docs.values()))))
+        return self.documents[doc_id]
+
+    @classmethod
+    def build(cls, documents: Sequence[Document], version=None):
+        counts = [
+            Counter(tokenize(doc.title) * TITLE_REPEAT + tokenize(doc.body)) for doc in documents
+        ]
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) else 1.0
+
+        postings = {}
+        for doc_id, terms in enumerate(counts):
+            for term, tf in terms.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocab = {term: term_id for term_id, term in enumerate(sorted(postings))}
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        doc_ids, weights = [], []
+        n = len(documents)
+        for term, term_id in vocab.items():
+            entries = postings[term]
+            idf = math.log(1 + (n - len(entries) + 0.5) / (len(entries) + 0.5))
+            for doc_id, tf in entries:
+                norm = K1 * (1 - B + B * lengths[doc_id] / avg_length)
+                doc_ids.append(doc_id)
+                weights.append(idf * tf * (K1 + 1) / (tf + norm))
+            indptr[term_id + 1] = len(doc_ids)
+        return cls(version, vocab, list(documents), indptr,
+                   np.array(doc_ids, dtype=np.int32), np.array(weights, dtype=np.float32))
+
+    def save(self, path: Path):
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / 'indptr.npy', self.indptr)
+        np.save(path / 'doc_ids.npy', self.doc_ids)
+        np.save(path / 'weights.npy', self.weights)
+        meta = {'version': self.version, 'vocab': self.vocab, 'documents': [doc._asdict() for doc in self.documents]}
+        with open(path / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Path):
+        with open(path / 'meta.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = [np.load(path / name, mmap_mode='r') for name in ('indptr.npy', 'doc_ids.npy', 'weights.npy')]
+        return cls(meta['version'], meta['vocab'], [Document(**doc) for doc in meta['documents']], *arrays)
+
+    def search(self, query: str, k=5, language: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Top ``k`` (document index, score) pairs; documents in ``language`` win ties with translations."""
+        terms = [self.vocab[token] for token in set(tokenize(query)) if token in self.vocab]
+        if not terms:
+            return []
+        spans = [(self.indptr[t], self.indptr[t + 1]) for t in terms]
+        docs = np.concatenate([self.doc_ids[start:end] for start, end in spans])
+        weights = np.concatenate([self.weights[start:end] for start, end in spans])
+        scores = np.bincount(docs, weights=weights, minlength=len(self.documents))
+        if language:
+            scores[self.languages == language] *= 1.05
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(doc), float(scores[doc])) for doc in best]
+
+
+def publish_index(version) -> Path:
+    """Build the index for ``version`` into its directory, unless another process already has."""
+    root = Path(settings.CHATBOT_INDEX_DIR)
+    path = root / version
+    if (path / 'meta.json').exists():
+        return path
+    root.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix='.build-', dir=root))
+    try:
+        KnowledgeIndex.build(collect_documents(), version).save(staging)
+        try:
+            os.rename(staging, path)
+        except OSError:
+            # Lost the race to another process; its copy is identical
+            pass
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    # Only versions this one supersedes: a worker that has already seen a
+    # newer version may have just published it and be about to load it
+    for old in root.iterdir():
+        if not old.name.startswith('.') and superseded(old.name, version):
+            shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+_index: Optional[KnowledgeIndex] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_knowledge_index() -> KnowledgeIndex:
+    """Process-wide index, reloaded (and rebuilt if nobody has yet) when the knowledge version changes."""
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < settings.CHATBOT_INDEX_CHECK_SECONDS:
+        return _index
+    with _lock:
+        version = knowledge_version()
+        if _index is None or version != _index.version:
+            try:
+                _index = KnowledgeIndex.load(publish_index(version))
+            except FileNotFoundError:
+                # Removed by a process that published a later version in
+                # the meantime (this one's content is stale); build it again
+                _index = KnowledgeIndex.load(publish_index(version))
+        _checked_at = now
+    return _index
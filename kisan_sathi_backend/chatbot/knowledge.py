@@ -0,0 +1,94 @@
+"""
+The content the chatbot answers from: crop-doctor disease metadata,
+published farming tips and active schemes, as one document per item and
+language. Documents for the same item share a ``group`` so an answer can be
+given in the asker's language whichever translation matched.
+"""
+import hashlib
+import json
+import re
+from typing import List, NamedTuple
+
+from crop_doctor.diseases import all_diseases
+from farming_tips.bundles import TIPS_VERSION
+from farming_tips.models import Tip
+from schemes.matching import SCHEMES_VERSION
+from schemes.models import Scheme
+from stats.counters import current
+
+
+class Document(NamedTuple):
+    group: str
+    source: str
+    language: str
+    title: str
+    body: str
+
+
+DISEASE_LABELS = {
+    'en': {'cause': "Cause", 'immediate': "Immediate steps", 'chemical': "Chemical control",
+           'organic': "Organic control", 'prevention': "Prevention"},
+    'kn': {'cause': "ಕಾರಣ", 'immediate': "ತಕ್ಷಣದ ಕ್ರಮಗಳು", 'chemical': "ರಾಸಾಯನಿಕ ನಿಯಂತ್ರಣ",
+           'organic': "ಸಾವಯವ ನಿಯಂತ್ರಣ", 'prevention': "ತಡೆಗಟ್ಟುವಿಕೆ"},
+}
+
+
+def _disease_documents():
+    for meta in all_diseases():
+        if meta['key'] == 'healthy':
+            continue
+        for language, labels in DISEASE_LABELS.items():
+            lines = [f"{labels['cause']}: {meta['cause'][language]}"]
+            for step in ('immediate', 'chemical', 'organic'):
+                items = meta['treatment'][step][language]
+                if items:
+                    lines.append(f"{labels[step]}: {'; '.join(items)}.")
+            if meta['prevention'][language]:
+                lines.append(f"{labels['prevention']}: {'; '.join(meta['prevention'][language])}.")
+            yield Document(f"disease:{meta['key']}", 'disease', language, meta['disease'][language], '\n'.join(lines))
+
+
+def _tip_documents():
+    for tip in Tip.objects.filter(is_published=True).prefetch_related('translations').order_by('id'):
+        for text in tip.translations.all():
+            yield Document(f"tip:{tip.pk}", 'tip', text.language, text.title, text.description)
+
+
+def _scheme_documents():
+    for scheme in Scheme.objects.filter(is_active=True).order_by('id'):
+        lines = [scheme.description, f"Benefit: {scheme.benefit}.", f"Eligibility: {scheme.eligibility}."]
+        if scheme.deadline:
+            lines.append(f"Apply by {scheme.deadline:%d %b %Y}.")
+        yield Document(f"scheme:{scheme.pk}", 'scheme', 'en', scheme.name, '\n'.join(lines))
+
+
+def collect_documents() -> List[Document]:
+    return [*_disease_documents(), *_tip_documents(), *_scheme_documents()]
+
+
+_DISEASES_DIGEST = hashlib.sha1(json.dumps(all_diseases(), sort_keys=True).encode()).hexdigest()[:8]
+
+
+def knowledge_version() -> str:
+    """Changes whenever any indexed content does (tips and schemes bump their counters on edit)."""
+    return f"t{current(TIPS_VERSION)}-s{current(SCHEMES_VERSION)}-d{_DISEASES_DIGEST}"
+
+
+_VERSION = re.compile(r't(\d+)-s(\d+)-d\w+')
+
+
+def superseded(old: str, new: str) -> bool:
+    """
+    Whether content version ``new`` came after ``old``. Content counters
+    only go up, so an older version has no counter ahead of ``new``'s and
+    at least one behind; versions with the same counters from different
+    deployments are left for the next edit to supersede.
+    """
+    old_match, new_match = _VERSION.fullmatch(old), _VERSION.fullmatch(new)
+    if new_match is None:
+        return False
+    if old_match is None:
+        return True
+    old_counters = [int(n) for n in old_match.groups()]
+    new_counters = [int(n) for n in new_match.groups()]
+    return old_counters != new_counters and all(o <= n for o, n in zip(old_counters, new_counters))
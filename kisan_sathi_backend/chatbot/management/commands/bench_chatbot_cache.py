@@ -0,0 +1,66 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from chatbot.answer_cache import answer_cache
+from chatbot.answers import _compose, answer
+from chatbot.index import get_knowledge_index
+from chatbot.text import detect_language
+
+
+# The same few questions, asked the ways farmers actually type them
+QUESTIONS = [
+    ["best time to plant rice", "Best time to plant rice?", "rice - best planting time",
+     "When is the best time for planting paddy", "best tme to plant rice"],
+    ["how to prevent crop diseases", "How do I prevent crop disease?", "crop disease prevention",
+     "preventing diseases in my crop", "how to prevnt crop diseases"],
+    ["tomato late blight treatment", "How do I treat late blight on tomato?", "Late blight, tomato: cure",
+     "ಟೊಮೇಟೊ ಬ್ಲೈಟ್ ಚಿಕಿತ್ಸೆ", "tomato late blite treatment"],
+    ["drip irrigation subsidy", "Subsidy for drip irrigation?", "is there any subsidy on drip irrigation",
+     "ಹನಿ ನೀರಾವರಿ ಸಬ್ಸಿಡಿ", "drip irrigaton subsidy"],
+    ["neem oil for leaf spots", "Leaf spot - neem oil?", "can I use neem oil on leaf spot",
+     "ಎಲೆ ಕಲೆ ಬೇವು", "neem oil for leef spots"],
+    ["cassava mosaic disease", "Cassava mosaic disease?", "what is mosaic disease in cassava",
+     "ಸಾವುಗಡ್ಡೆ ರೋಗ", "casava mosaic disease"],
+]
+
+
+class Command(BaseCommand):
+    help = "Replay a skewed mix of reworded farmer questions and report answer-cache hit rate and saved time"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # A few topics dominate, as they do in practice
+        weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+        workload = [rng.choice(rng.choices(QUESTIONS, weights)[0]) for _ in range(options['questions'])]
+        index = get_knowledge_index()
+
+        started = time.perf_counter()
+        expected = [_compose(index, q, detect_language(q)) for q in workload]
+        uncached = time.perf_counter() - started
+        self.stdout.write(f"Uncached: {uncached / len(workload) * 1e6:.1f} us per question")
+
+        for near in (False, True):
+            with override_settings(CHATBOT_NEAR_DUPLICATES=near):
+                answer_cache.clear()
+                started = time.perf_counter()
+                results = [answer(q) for q in workload]
+                elapsed = time.perf_counter() - started
+                stats = answer_cache.stats()
+            wrong = sum(1 for got, want in zip(results, expected) if got['answer'] != want['answer'])
+            self.stdout.write(
+                f"{'Near-duplicates' if near else 'Exact keys'}: {elapsed / len(workload) * 1e6:.1f} us per question, "
+                f"hit rate {stats['hitRate']:.1%} ({stats['nearHits']} near), {stats['entries']} entries, "
+                f"saved {stats['savedSeconds'] * 1000:.0f} ms of compute for {stats['lookupSeconds'] * 1000:.0f} ms "
+                f"of lookups; {wrong} answers differ from uncached"
+            )
+            if not near and wrong:
+                raise CommandError("Exact-key cache returned answers that differ from computing them")
+        answer_cache.clear()
+        self.stdout.write(self.style.SUCCESS("OK"))
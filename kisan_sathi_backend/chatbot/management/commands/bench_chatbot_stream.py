@@ -0,0 +1,143 @@
+import asyncio
+import random
+import statistics
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot import views
+from chatbot.index import get_knowledge_index
+from kisan_sathi.asgi import application
+
+
+QUESTIONS = [
+    "How do I treat tomato late blight?",
+    "What about organic control?",
+    "How to prevent cassava mosaic disease",
+    "ಟೊಮೇಟೊ ಎಲೆ ಕಲೆ ರೋಗಕ್ಕೆ ಚಿಕಿತ್ಸೆ ಏನು?",
+    "Which schemes give a subsidy for drip irrigation?",
+    "When should I plant in the monsoon?",
+]
+
+
+class Client:
+    """An in-process ASGI client asking one question over /api/chatbot/stream/."""
+
+    def __init__(self, question, session=None, delay=0.0):
+        query = {'q': question}
+        if session:
+            query['session'] = session
+        self.scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': '/api/chatbot/stream/', 'raw_path': b'/api/chatbot/stream/',
+            'query_string': urlencode(query).encode(), 'root_path': '',
+            'headers': [(b'host', b'localhost')], 'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        # Seconds each write takes to reach the client, to model a slow connection
+        self.delay = delay
+        self.status = None
+        self.body = b''
+        self.first_byte = None
+        self.done = asyncio.Event()
+
+    async def receive(self):
+        await self.done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message['type'] == 'http.response.body':
+            body = message.get('body', b'')
+            if body and self.first_byte is None:
+                self.first_byte = time.perf_counter()
+            self.body += body
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if not message.get('more_body'):
+                self.done.set()
+
+    async def ask(self):
+        started = time.perf_counter()
+        pending = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if pending:
+                return pending.pop()
+            return await self.receive()
+
+        await application(self.scope, receive, self.send)
+        self.elapsed = time.perf_counter() - started
+        self.ttfb = (self.first_byte or time.perf_counter()) - started
+        return self
+
+    @property
+    def session(self):
+        marker = b'event: session\ndata: {"session": "'
+        start = self.body.find(marker)
+        if start < 0:
+            return None
+        start += len(marker)
+        return self.body[start:self.body.index(b'"', start)].decode()
+
+
+class Command(BaseCommand):
+    help = "Stream chatbot answers to many concurrent in-process clients and report time-to-first-byte and throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=500, help="Concurrent conversations")
+        parser.add_argument('--turns', type=int, default=4, help="Questions asked in each conversation")
+        parser.add_argument('--slow', type=int, default=0, help="Extra clients that read one chunk per --slow-delay")
+        parser.add_argument('--slow-delay', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        get_knowledge_index()
+        asyncio.run(self._run(options['clients'], options['turns'], options['slow'], options['slow_delay']))
+
+    async def _run(self, clients, turns, slow, slow_delay):
+        rng = random.Random(0)
+        results = []
+
+        async def conversation():
+            session = None
+            for _ in range(turns):
+                client = await Client(rng.choice(QUESTIONS), session).ask()
+                results.append(client)
+                session = client.session or session
+
+        slow_clients = [Client(rng.choice(QUESTIONS), delay=slow_delay) for _ in range(slow)]
+        slow_tasks = [asyncio.ensure_future(client.ask()) for client in slow_clients]
+        # Let the slow clients take their slots first
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        await asyncio.gather(*(conversation() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+        answered = [c for c in results if c.status == 200]
+        rejected = sum(1 for c in results if c.status == 503)
+        failed = [c for c in results if c.status not in (200, 503) or (c.status == 200 and b'event: done' not in c.body)]
+        ttfb = sorted(c.ttfb for c in answered)
+        total = sorted(c.elapsed for c in answered)
+        if ttfb:
+            self.stdout.write(
+                f"{len(answered)} answers streamed in {elapsed:.2f}s ({len(answered) / elapsed:.0f}/s) "
+                f"across {clients} conversations of {turns} turns, at most {settings.CHATBOT_MAX_STREAMS} streams"
+            )
+            self.stdout.write(
+                f"Time to first byte: p50 {statistics.median(ttfb) * 1000:.1f} ms, "
+                f"p99 {ttfb[int(len(ttfb) * 0.99)] * 1000:.1f} ms; "
+                f"full answer: p50 {statistics.median(total) * 1000:.1f} ms, "
+                f"p99 {total[int(len(total) * 0.99)] * 1000:.1f} ms"
+            )
+        self.stdout.write(f"{rejected} requests turned away as busy")
+
+        # Slow clients hang up; their streams are cancelled and release their slots
+        for client in slow_clients:
+            client.done.set()
+        await asyncio.gather(*slow_tasks, return_exceptions=True)
+        self.stdout.write(f"{views._open_streams} streams still counted open")
+        if failed or views._open_streams:
+            raise CommandError(f"{len(failed)} streams failed or slots leaked")
+        self.stdout.write(self.style.SUCCESS("OK"))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from chatbot.index import KnowledgeIndex, publish_index
+from chatbot.knowledge import knowledge_version
+
+
+SAMPLE_QUESTIONS = [
+    "How do I prevent diseases in my tomatoes?", "ಟೊಮೇಟೊ ರೋಗ ತಡೆಗಟ್ಟುವುದು ಹೇಗೆ",
+    "best time to plant rice", "crop insurance scheme", "neem oil for leaf spots", "drip irrigation",
+]
+
+
+class Command(BaseCommand):
+    help = "Build the chatbot knowledge index for the current content (run on deploy so workers only load it)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=1000, help="Timed sample queries after building")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        path = publish_index(knowledge_version())
+        index = KnowledgeIndex.load(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"{path}: {len(index.documents)} documents, {len(index.vocab)} terms, "
+            f"{len(index.doc_ids)} postings in {time.monotonic() - started:.2f}s"
+        ))
+        if options['queries']:
+            started = time.perf_counter()
+            for i in range(options['queries']):
+                index.search(SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{elapsed / options['queries'] * 1000:.3f} ms per query")
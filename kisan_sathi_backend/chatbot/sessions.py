@@ -0,0 +1,35 @@
+"""
+Per-session conversation context.
+
+Each session keeps only its last ``CHATBOT_CONTEXT_TURNS`` questions, a
+ring buffer rewritten on every turn, in the default cache with a TTL that
+restarts on each turn, so idle conversations evict themselves and no
+session grows without bound. With REDIS_URL set, a conversation can
+continue on any worker.
+"""
+import secrets
+from typing import List
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _key(session_id):
+    return f"chatbot:session:{session_id}"
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+def valid_session_id(session_id) -> bool:
+    return isinstance(session_id, str) and 0 < len(session_id) <= 64 and session_id.replace('-', '').replace('_', '').isalnum()
+
+
+def recent_questions(session_id) -> List[str]:
+    return cache.get(_key(session_id)) or []
+
+
+def remember(session_id, question, turns: List[str]):
+    turns = (turns + [question])[-settings.CHATBOT_CONTEXT_TURNS:]
+    cache.set(_key(session_id), turns, settings.CHATBOT_SESSION_TTL)
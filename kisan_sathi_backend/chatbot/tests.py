@@ -1,3 +1,213 @@
-from django.test import TestCase
+import asyncio
+import gc
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.asgi import get_asgi_application
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+
+from live.asgi import StreamDisconnectMiddleware
+
+from . import index, views
+from .answer_cache import AnswerCache, normalize_question
+from .knowledge import knowledge_version
+
+
+class AskValidationTests(TestCase):
+    def ask(self, body):
+        return self.client.post('/api/chatbot/ask/', data=body, content_type='application/json')
+
+    def test_non_string_questions_are_rejected(self):
+        for question in (42, ['how', 'to', 'water'], {'text': 'tomato'}, None):
+            with self.subTest(question=question):
+                self.assertEqual(self.ask({'question': question}).status_code, 400)
+
+    def test_a_body_that_is_not_an_object_is_rejected(self):
+        self.assertEqual(self.ask(['tomato blight']).status_code, 400)
+
+    def test_a_non_string_session_starts_no_conversation(self):
+        for session in (12345, ['abc'], {'id': 'abc'}):
+            with self.subTest(session=session):
+                response = self.ask({'question': 'How do I water tomatoes?', 'session': session})
+                self.assertEqual(response.status_code, 200)
+
+
+class PublishIndexTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, True)
+        overridden = override_settings(CHATBOT_INDEX_DIR=str(self.root))
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+    def published(self):
+        return sorted(path.name for path in self.root.iterdir())
+
+    def test_removes_only_superseded_versions(self):
+        index.publish_index('t1-s1-dabc')
+        index.publish_index('t3-s1-dabc')
+        # A worker that has not yet seen the latest tip edit publishes after
+        index.publish_index('t2-s1-dabc')
+        self.assertEqual(self.published(), ['t2-s1-dabc', 't3-s1-dabc'])
+
+        index.publish_index('t3-s2-dabc')
+        self.assertEqual(self.published(), ['t3-s2-dabc'])
+
+    def test_versions_from_another_deployment_wait_for_the_next_edit(self):
+        index.publish_index('t1-s1-dold')
+        index.publish_index('t1-s1-dnew')
+        self.assertEqual(self.published(), ['t1-s1-dnew', 't1-s1-dold'])
+        index.publish_index('t2-s1-dnew')
+        self.assertEqual(self.published(), ['t2-s1-dnew'])
+
+    def test_rebuilds_a_version_removed_before_it_was_loaded(self):
+        publish = index.publish_index
+
+        def removed_by_a_newer_worker(version):
+            path = publish(version)
+            shutil.rmtree(path)
+            return path
+
+        index._index = None
+        self.addCleanup(setattr, index, '_index', None)
+        calls = iter([removed_by_a_newer_worker, publish])
+        with mock.patch.object(index, 'publish_index', side_effect=lambda version: next(calls)(version)):
+            loaded = index.get_knowledge_index()
+        self.assertEqual(loaded.version, knowledge_version())
+
+
+def answer(text):
+    return lambda: {'answer': text, 'sources': []}
+
+
+class AnswerCacheTests(TestCase):
+    def setUp(self):
+        self.cache = AnswerCache()
+
+    def test_questions_with_the_same_tokens_share_an_entry(self):
+        self.assertEqual(
+            normalize_question("Best time to plant rice?"), normalize_question("rice: when is the best planting time"),
+        )
+        self.cache.fetch('v1', "Best time to plant rice?", 'en', answer("June"))
+        compute = mock.Mock()
+        self.assertEqual(self.cache.fetch('v1', "rice: when is the best planting time", 'en', compute)['answer'], "June")
+        compute.assert_not_called()
+        # Answers are per language
+        self.assertEqual(self.cache.fetch('v1', "Best time to plant rice?", 'kn', answer("ಜೂನ್"))['answer'], "ಜೂನ್")
+
+    @override_settings(CHATBOT_ANSWER_CACHE_SIZE=2)
+    def test_the_least_recently_used_entry_is_evicted(self):
+        self.cache.fetch('v1', "rice", 'en', answer("rice"))
+        self.cache.fetch('v1', "ragi", 'en', answer("ragi"))
+        self.cache.fetch('v1', "rice", 'en', answer("recomputed"))
+        self.cache.fetch('v1', "maize", 'en', answer("maize"))
+        self.assertEqual(list(self.cache.entries), [('en', 'rice'), ('en', 'maize')])
+        self.assertEqual(self.cache.fetch('v1', "ragi", 'en', answer("recomputed"))['answer'], "recomputed")
+
+    def test_a_new_knowledge_version_drops_every_entry(self):
+        self.cache.fetch('v1', "rice", 'en', answer("old"))
+        self.assertEqual(self.cache.fetch('v2', "rice", 'en', answer("new"))['answer'], "new")
+        self.assertEqual(self.cache.stats()['entries'], 1)
+
+    def test_an_answer_computed_under_a_stale_version_is_not_kept(self):
+        def computed_while_knowledge_changes():
+            self.cache.fetch('v2', "ragi", 'en', answer("ragi"))
+            return {'answer': "stale", 'sources': []}
+
+        self.cache.fetch('v1', "rice", 'en', computed_while_knowledge_changes)
+        self.assertEqual(list(self.cache.entries), [('en', 'ragi')])
+
+    @override_settings(CHATBOT_NEAR_DUPLICATES=True, CHATBOT_NEAR_DUPLICATE_THRESHOLD=0.8)
+    def test_near_duplicates_reuse_an_answer_above_the_threshold(self):
+        self.cache.fetch('v1', "how to control tomato blight", 'en', answer("Copper spray"))
+        self.assertEqual(
+            self.cache.fetch('v1', "how to control tomatoe blight", 'en', answer("recomputed"))['answer'],
+            "Copper spray",
+        )
+        self.assertEqual(
+            self.cache.fetch('v1', "ragi seed rate per acre", 'en', answer("4 kg"))['answer'], "4 kg",
+        )
+        # Never across languages
+        self.assertEqual(
+            self.cache.fetch('v1', "how to control tomatoe blight", 'kn', answer("kn"))['answer'], "kn",
+        )
+        # An extra word: about 0.77 similar
+        self.assertEqual(
+            self.cache.fetch('v1', "control tomato leaf blight", 'en', answer("Leaf blight"))['answer'], "Leaf blight",
+        )
+        with override_settings(CHATBOT_NEAR_DUPLICATE_THRESHOLD=0.7):
+            self.assertEqual(
+                self.cache.fetch('v1', "control tomato late blight", 'en', answer("recomputed"))['answer'],
+                "Leaf blight",
+            )
+
+    def test_near_duplicates_are_off_by_default(self):
+        self.cache.fetch('v1', "how to control tomato blight", 'en', answer("Copper spray"))
+        self.assertEqual(
+            self.cache.fetch('v1', "how to control tomatoe blight", 'en', answer("recomputed"))['answer'],
+            "recomputed",
+        )
+
+    @override_settings(CHATBOT_NEAR_DUPLICATES=True)
+    def test_stats(self):
+        self.assertEqual(self.cache.stats()['hitRate'], 0.0)
+        self.cache.fetch('v1', "tomato blight", 'en', answer("Copper spray"))
+        self.cache.fetch('v1', "blight on tomato", 'en', answer("recomputed"))
+        self.cache.fetch('v1', "tomatoe blight", 'en', answer("recomputed"))
+        self.cache.fetch('v1', "ragi seed rate", 'en', answer("4 kg"))
+        stats = self.cache.stats()
+        self.assertEqual(
+            {key: stats[key] for key in ('version', 'entries', 'hits', 'nearHits', 'misses', 'hitRate')},
+            {'version': 'v1', 'entries': 2, 'hits': 1, 'nearHits': 1, 'misses': 2, 'hitRate': 0.5},
+        )
+        self.assertGreaterEqual(stats['savedSeconds'], 0)
+        self.cache.clear()
+        self.assertEqual((self.cache.stats()['entries'], self.cache.stats()['misses']), (0, 0))
+
+
+class StalledStreamTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, True)
+        overridden = override_settings(CHATBOT_INDEX_DIR=root)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        # As the test client does, keep the handler off the test transaction's connection
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+
+    async def test_a_client_that_stops_reading_gives_up_its_slot(self):
+        app = StreamDisconnectMiddleware(get_asgi_application(), prefixes=('/api/chatbot/stream/',), send_timeout=0.2)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': '/api/chatbot/stream/', 'raw_path': b'/api/chatbot/stream/',
+            'query_string': b'q=How+do+I+water+tomatoes%3F', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 5000), 'server': ('testserver', 80),
+        }
+        requested = False
+        sent = []
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b''}
+            # Connected, but never says anything again
+            await asyncio.Event().wait()
+
+        async def send(message):
+            sent.append(message)
+            if message['type'] == 'http.response.body':
+                # The client's socket buffer is full and stays full
+                await asyncio.Event().wait()
+
+        await asyncio.wait_for(app(scope, receive, send), 5)
+        gc.collect()
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertEqual(views._open_streams, 0)
@@ -0,0 +1,79 @@
+"""
+Question and document tokenization for the chatbot.
+
+Builds on the marketplace tokenizer (lowercasing, English singularizing,
+Kannada suffix stripping and Kannada produce names folded to English), adds
+the farming vocabulary farmers ask about in Kannada, folds common English
+word forms together and drops question filler words in both languages. Unlike
+the marketplace tokenizer, repeated tokens are kept for term frequencies.
+"""
+import re
+from typing import List
+
+from marketplace.search import normalize_token
+
+
+_TOKEN_RE = re.compile(r'(?:[^\W_]|[\u0c80-\u0cff])+')
+_KANNADA_RE = re.compile(r'[\u0c80-\u0cff]')
+
+# After normalize_token, so "does" appears as "doe"
+_STOPWORDS = {
+    'how', 'what', 'when', 'where', 'why', 'which', 'who', 'do', 'doe', 'did', 'i', 'my', 'me', 'we', 'our',
+    'you', 'your', 'is', 'are', 'was', 'be', 'can', 'could', 'should', 'would', 'will', 'it', 'this',
+    'that', 'these', 'those', 'on', 'about', 'tell', 'please', 'any', 'some', 'there', 'much', 'many',
+    'get', 'give', 'need', 'want', 'know', 'if', 'by', 'as', 'up', 'use',
+    'ಹೇಗೆ', 'ಏನು', 'ಯಾವಾಗ', 'ಯಾವ', 'ಯಾಕೆ', 'ಎಲ್ಲಿ', 'ನನ್ನ', 'ನಮ್ಮ', 'ಬಗ್ಗೆ', 'ಹೇಳಿ', 'ಮಾಡುವುದು',
+    'ಮಾಡಬೇಕು', 'ಇದೆ', 'ಮತ್ತು', 'ಅಥವಾ', 'ಈ', 'ಆ', 'ಇರುವ',
+}
+
+# English word forms asked about interchangeably
+_ENGLISH_FOLDS = {
+    'prevention': 'prevent', 'preventing': 'prevent', 'protect': 'prevent', 'avoid': 'prevent',
+    'planting': 'plant', 'sowing': 'plant', 'sow': 'plant', 'sown': 'plant', 'cultivation': 'grow',
+    'cultivate': 'grow', 'growing': 'grow', 'treatment': 'treat', 'treating': 'treat', 'cure': 'treat',
+    'control': 'treat', 'irrigate': 'irrigation', 'watering': 'water', 'fungal': 'fungus',
+    'fungicide': 'fungus', 'insect': 'pest', 'insecticide': 'pest', 'pesticide': 'pest',
+    'infection': 'disease', 'infected': 'disease', 'sick': 'disease', 'loan': 'credit',
+    'subsidie': 'subsidy', 'fertiliser': 'fertilizer', 'manure': 'fertilizer', 'paddy': 'rice',
+}
+
+# Kannada farming terms folded to the English token used in content
+_KANNADA_FOLDS = {
+    'ರೋಗ': 'disease', 'ರೋಗವನ್ನು': 'disease', 'ಕೀಟ': 'pest', 'ಎಲೆ': 'leaf', 'ನೀರಾವರಿ': 'irrigation',
+    'ನೀರು': 'water', 'ಮಣ್ಣು': 'soil', 'ಮಣ್ಣಿನ': 'soil', 'ಬಿತ್ತನೆ': 'plant', 'ನಾಟಿ': 'plant',
+    'ಯೋಜನೆ': 'scheme', 'ಸಬ್ಸಿಡಿ': 'subsidy', 'ಸಹಾಯಧನ': 'subsidy', 'ಸಾಲ': 'credit', 'ವಿಮೆ': 'insurance',
+    'ಬೆಳೆ': 'crop', 'ಚಿಕಿತ್ಸೆ': 'treat', 'ನಿಯಂತ್ರಣ': 'treat', 'ತಡೆಗಟ್ಟು': 'prevent', 'ತಡೆಯುವುದು': 'prevent',
+    'ಬ್ಲೈಟ್': 'blight', 'ಸಾವುಗಡ್ಡೆ': 'cassava', 'ಟೊಮೇಟೊ': 'tomato', 'ಕಲೆ': 'spot', 'ನೀಮ್': 'neem',
+    'ಬೇವು': 'neem', 'ಕಾಂಪೋಸ್ಟ್': 'compost', 'ಹನಿ': 'drip', 'ಮಳೆಗಾಲ': 'monsoon', 'ಬೇಸಿಗೆ': 'summer',
+    'ಚಳಿಗಾಲ': 'winter', 'ಸಮಯ': 'time', 'ಉತ್ತಮ': 'best', 'ವೈರಸ್': 'virus', 'ಫಂಗಸ್': 'fungus',
+}
+
+
+# Inflected forms ("ತಡೆಗಟ್ಟುವುದು") fold by their stem; short stems would over-match
+_KANNADA_STEMS = sorted((stem for stem in _KANNADA_FOLDS if len(stem) >= 4), key=len, reverse=True)
+
+
+def _fold_kannada(token):
+    folded = _KANNADA_FOLDS.get(token)
+    if folded:
+        return folded
+    for stem in _KANNADA_STEMS:
+        if token.startswith(stem):
+            return _KANNADA_FOLDS[stem]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for raw in _TOKEN_RE.findall(text or ''):
+        token = normalize_token(raw)
+        if not token:
+            continue
+        token = _fold_kannada(token) if _KANNADA_RE.search(token) else _ENGLISH_FOLDS.get(token, token)
+        if token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def detect_language(text: str) -> str:
+    return 'kn' if _KANNADA_RE.search(text or '') else 'en'
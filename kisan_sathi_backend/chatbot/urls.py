@@ -1,7 +1,10 @@
 from django.urls import path
+from .views import AnswerCacheStatsView, AskView, stream
 
 app_name = 'chatbot'
 
-urlpatterns = []
-
-
+urlpatterns = [
+    path('ask/', AskView.as_view(), name='ask'),
+    path('stream/', stream, name='stream'),
+    path('cache/', AnswerCacheStatsView.as_view(), name='cache-stats'),
+]
@@ -1,3 +1,130 @@
-from django.shortcuts import render
+import asyncio
+import json
+import re
+import weakref
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from .answer_cache import answer_cache
+from .answers import answer, respond
+from .sessions import new_session_id, valid_session_id
+
+
+MAX_QUESTION_LENGTH = 500
+
+# Answers are streamed a sentence (or line) at a time
+_SENTENCE_END = re.compile(r'(?<=[.!?।])\s+|\n+')
+
+
+class AskView(APIView):
+    """Answer a farming question from crop-doctor, tips and scheme content, in English or Kannada."""
+
+    def post(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        question = data.get('question')
+        question = question.strip() if isinstance(question, str) else ''
+        if not question or len(question) > MAX_QUESTION_LENGTH:
+            return Response({
+                'success': False,
+                'message': f'A question of up to {MAX_QUESTION_LENGTH} characters is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        language = data.get('language')
+        language = language if isinstance(language, str) else None
+        session = data.get('session')
+        if valid_session_id(session):
+            return Response({'success': True, 'data': respond(question, language, session)})
+        return Response({'success': True, 'data': answer(question, language)})
+
+
+class AnswerCacheStatsView(APIView):
+    """This worker's answer-cache hit rate and the compute time its hits saved."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'success': True, 'data': answer_cache.stats()})
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+# Streams open in this worker; each holds an event-loop slot and a socket
+_open_streams = 0
+
+
+class _Slot:
+    """One of this worker's CHATBOT_MAX_STREAMS; released once, however the stream ends."""
+
+    def __init__(self):
+        global _open_streams
+        _open_streams += 1
+        self.held = True
+
+    def release(self):
+        global _open_streams
+        if self.held:
+            self.held = False
+            _open_streams -= 1
+
+
+async def stream(request):
+    """
+    Server-sent events answering ``?q=<question>&session=<id>&language=kn``:
+    ``session`` (the id to send with follow-up questions), ``sources``,
+    one ``delta`` per sentence of the answer, then ``done``. Follow-up
+    questions in the same session are answered with the earlier ones as
+    context.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'success': False,
+            'message': 'Streamed answers are only served by the ASGI application'
+        }, status=501)
+
+    question = request.GET.get('q', '').strip()
+    if not question or len(question) > MAX_QUESTION_LENGTH:
+        return JsonResponse({
+            'success': False,
+            'message': f'A question of up to {MAX_QUESTION_LENGTH} characters is required'
+        }, status=400)
+    if _open_streams >= settings.CHATBOT_MAX_STREAMS:
+        response = JsonResponse({'success': False, 'message': 'The chatbot is busy, please retry'}, status=503)
+        response['Retry-After'] = '2'
+        return response
+
+    session = request.GET.get('session')
+    if not valid_session_id(session):
+        session = new_session_id()
+    language = request.GET.get('language')
+    slot = _Slot()
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        # A client too slow to take the answer in time gives up its slot
+        deadline = loop.time() + settings.CHATBOT_STREAM_TIMEOUT
+        try:
+            result = await sync_to_async(respond)(question, language, session)
+            yield _event('session', {'session': session, 'language': result['language']})
+            yield _event('sources', result['sources'])
+            for sentence in _SENTENCE_END.split(result['answer']):
+                if loop.time() >= deadline:
+                    return
+                if sentence:
+                    yield _event('delta', {'text': sentence})
+            yield _event('done', {})
+        finally:
+            slot.release()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    # A stream cancelled before its first chunk never runs the generator's finally
+    weakref.finalize(response, slot.release)
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
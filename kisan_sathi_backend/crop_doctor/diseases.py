@@ -0,0 +1,129 @@
+"""
+Bilingual disease metadata for crop-doctor model classes.
+
+Indexed by the model's output class; also the disease knowledge the
+chatbot answers from (see chatbot.knowledge).
+"""
+
+# TFHub cassava classifier (5 classes)
+CASSAVA_CLASS_MAP = {
+    0: {
+        "key": "cassava_bacterial_blight",
+        "disease": {"en": "Cassava Bacterial Blight (CBB)", "kn": "ಸಾವುಗಡ್ಡೆ ಬ್ಯಾಕ್ಟೀರಿಯಲ್ ಬ್ಲೈಟ್"},
+        "cause": {"en": "Xanthomonas axonopodis pv. manihotis infection.", "kn": "ಝಾಂಥೋಮೋನಾಸ್ ಬ್ಯಾಕ್ಟೀರಿಯಾ ಸೋಂಕು."},
+        "treatment": {
+            "immediate": {"en": ["Remove infected leaves"], "kn": ["ಬಾಧಿತ ಎಲೆಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
+            "chemical": {"en": ["Copper-based bactericides as per label"], "kn": ["ತಾಮ್ರ ಆಧಾರಿತ ಬ್ಯಾಕ್ಟಿರಿಸೈಡ್ (ಲೇಬಲ್ ಪ್ರಕಾರ)"]},
+            "organic": {"en": ["Sanitation and pruning"], "kn": ["ಸ್ವಚ್ಛತೆ ಮತ್ತು ಕತ್ತರಿಸುವಿಕೆ"]},
+        },
+        "prevention": {"en": ["Use clean planting material"], "kn": ["ಸ್ವಚ್ಛ ಬಿತ್ತನೆ ವಸ್ತು ಬಳಸಿ"]},
+        "severity": "high",
+    },
+    1: {
+        "key": "cassava_brown_streak_disease",
+        "disease": {"en": "Cassava Brown Streak Disease (CBSD)", "kn": "ಸಾವುಗಡ್ಡೆ ಬ್ರೌನ್ ಸ್ಟ್ರೀಕ್ ರೋಗ"},
+        "cause": {"en": "Ipomovirus infection spread by whiteflies.", "kn": "ವೈಟ್‌ಫ್ಲೈಗಳ ಮೂಲಕ ಹರಡುವ ಐಪೊಮೋವೈರಸ್ ಸೋಂಕು."},
+        "treatment": {
+            "immediate": {"en": ["Rogue and destroy infected plants"], "kn": ["ಬಾಧಿತ ಸಸಿಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
+            "chemical": {"en": ["Vector management as per IPM"], "kn": ["ವೈಕ್ಟರ್ ನಿರ್ವಹಣೆ (IPM) ಪ್ರಕಾರ"]},
+            "organic": {"en": ["Neem-based sprays"], "kn": ["ನೀಮ್ ಆಧಾರಿತ ಸಿಂಪಡಣೆ"]},
+        },
+        "prevention": {"en": ["Resistant varieties"], "kn": ["ರೋಗ ನಿರೋಧಕ ತಳಿಗಳು"]},
+        "severity": "high",
+    },
+    2: {
+        "key": "cassava_green_mottle",
+        "disease": {"en": "Cassava Green Mottle (CGM)", "kn": "ಸಾವುಗಡ್ಡೆ ಹಸಿರು ಮೋಟಲ್"},
+        "cause": {"en": "Viral disease causing mottling.", "kn": "ಮೋಟ್ಲಿಂಗ್ ಉಂಟುಮಾಡುವ ವೈರಸ್ ರೋಗ."},
+        "treatment": {
+            "immediate": {"en": ["Remove infected material"], "kn": ["ಬಾಧಿತ ವಸ್ತುವನ್ನು ತೆಗೆದುಹಾಕಿ"]},
+            "chemical": {"en": ["Vector control"], "kn": ["ವೈಕ್ಟರ್ ನಿಯಂತ್ರಣ"]},
+            "organic": {"en": ["Neem extracts"], "kn": ["ನೀಮ್ ಸಾರು"]},
+        },
+        "prevention": {"en": ["Use certified cuttings"], "kn": ["ಪ್ರಮಾಣಿತ ಕಟ್‌ಟಿಂಗ್ ಬಳಸಿ"]},
+        "severity": "medium",
+    },
+    3: {
+        "key": "cassava_mosaic_disease",
+        "disease": {"en": "Cassava Mosaic Disease (CMD)", "kn": "ಸಾವುಗಡ್ಡೆ ಮೊಸಾಯಿಕ್ ರೋಗ"},
+        "cause": {"en": "Begomovirus transmitted by whiteflies.", "kn": "ವೈಟ್‌ಫ್ಲೈಗಳಿಂದ ಹರಡುವ ಬೇಗೊಮೋವೈರಸ್."},
+        "treatment": {
+            "immediate": {"en": ["Remove and destroy infected plants"], "kn": ["ಬಾಧಿತ ಸಸಿಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
+            "chemical": {"en": ["Vector management"], "kn": ["ವೈಕ್ಟರ್ ನಿರ್ವಹಣೆ"]},
+            "organic": {"en": ["Neem oil applications"], "kn": ["ನೀಮ್ ಎಣ್ಣೆ ಬಳಕೆ"]},
+        },
+        "prevention": {"en": ["Plant resistant varieties"], "kn": ["ರೋಗ ನಿರೋಧಕ ತಳಿಗಳನ್ನು ನೆಡಿ"]},
+        "severity": "high",
+    },
+    4: {
+        "key": "healthy",
+        "disease": {"en": "Healthy", "kn": "ಆರೋಗ್ಯಕರ"},
+        "cause": {"en": "No disease detected.", "kn": "ಯಾವುದೇ ರೋಗ ಪತ್ತೆಯಾಗಿಲ್ಲ."},
+        "treatment": {
+            "immediate": {"en": ["No action needed"], "kn": ["ಯಾವುದೇ ಕ್ರಮ ಬೇಕಿಲ್ಲ"]},
+            "chemical": {"en": [], "kn": []},
+            "organic": {"en": [], "kn": []},
+        },
+        "prevention": {"en": ["Continue good agronomy"], "kn": ["ಉತ್ತಮ ಕೃಷಿ ಕ್ರಮ ಮುಂದುವರಿಸಿ"]},
+        "severity": "low",
+    },
+}
+
+
+# Default 2-class example mapping
+DEFAULT_CLASS_MAP = {
+    0: {
+        "key": "tomato_late_blight",
+        "disease": {"en": "Tomato Late Blight", "kn": "ಟೊಮೇಟೊ ತಡವಾದ ಬ್ಲೈಟ್"},
+        "cause": {
+            "en": "Fungus Phytophthora infestans thrives in cool, wet weather; spreads via splashes.",
+            "kn": "ಫಂಗಸ್ ಫೈಟೋಫ್ತೋರಾ ಇನ್ಫೆಸ್ಟಾನ್ಸ್ ತಂಪು, ಒದ್ದೆ ಹವಾಮಾನದಲ್ಲಿ ವಿಕಸಿಸುತ್ತದೆ; ನೀರಿನ ಸಿಂಪಡಣೆಯಿಂದ ಹರಡುತ್ತದೆ.",
+        },
+        "treatment": {
+            "immediate": {
+                "en": ["Remove infected leaves/fruits", "Improve air circulation", "Reduce watering frequency"],
+                "kn": ["ಬಾಧಿತ ಎಲೆ/ಕಾಯಿಗಳನ್ನು ತೆಗೆದುಹಾಕಿ", "ಗಾಳಿಯ ಸಂಚಲನ ಹೆಚ್ಚಿಸಿ", "ನೀರಿನ ಪ್ರಮಾಣ ಕಡಿಮೆ ಮಾಡಿ"],
+            },
+            "chemical": {
+                "en": ["Mancozeb 75% WP (2g/L), every 7–10 days, evening spray"],
+                "kn": ["ಮ್ಯಾಂಕೋಜೆಬ್ 75% ಡಬ್ಲ್ಯೂಪಿ (2g/L), 7–10 ದಿನಗಳಿಗೆ ಒಮ್ಮೆ, ಸಂಜೆ ಸಿಂಪಡಣೆ"],
+            },
+            "organic": {
+                "en": ["Neem oil spray", "Copper-based fungicides", "Bordeaux mixture"],
+                "kn": ["ನೀಮ್ ಎಣ್ಣೆ ಸಿಂಪಡಣೆ", "ತಾಮ್ರ ಆಧಾರಿತ ಫಂಗಿಸೈಡ್ಸ್", "ಬೋರ್ಡೊ ಮಿಶ್ರಣ"],
+            },
+        },
+        "prevention": {
+            "en": ["Use resistant varieties", "Avoid overhead watering", "Maintain plant spacing", "Crop rotation"],
+            "kn": ["ರೋಗನಿರೋಧಕ ತಳಿಗಳನ್ನು ಬಳಸಿ", "ಮೇಲಿನಿಂದ ನೀರಿನ ಸಿಂಪಡಣೆ ತಪ್ಪಿಸಿ", "ಸಸಿಗಳಿಗೆ ಸಮರ್ಪಕ ಅಂತರ ನೀಡಿ", "ಬೆಳೆ ಪರಿವರ್ತನೆ"],
+        },
+        "severity": "high",
+    },
+    1: {
+        "key": "leaf_spot",
+        "disease": {"en": "Leaf Spot", "kn": "ಎಲೆ ಕಲೆ"},
+        "cause": {
+            "en": "Fungal or bacterial spots under humid conditions; spreads via wind and water.",
+            "kn": "ತೇವಾಂಶದಲ್ಲಿ ಹುಳು/ಬ್ಯಾಕ್ಟೀರಿಯಾ ಕಲೆಗಳು; ಗಾಳಿ ಮತ್ತು ನೀರಿನ ಮೂಲಕ ಹರಡುತ್ತವೆ.",
+        },
+        "treatment": {
+            "immediate": {"en": ["Remove affected leaves"], "kn": ["ಬಾಧಿತ ಎಲೆಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
+            "chemical": {"en": ["Chlorothalonil spray as per label"], "kn": ["ಲೇಬಲ್‌ ಪ್ರಕಾರ ಕ್ಲೊರೊಥಾಲೊನಿಲ್ ಸಿಂಪಡಣೆ"]},
+            "organic": {"en": ["Neem oil"], "kn": ["ನೀಮ್ ಎಣ್ಣೆ"]},
+        },
+        "prevention": {
+            "en": ["Sanitize tools", "Avoid leaf wetness"],
+            "kn": ["ಉಪಕರಣಗಳನ್ನು ಸ್ವಚ್ಛಗೊಳಿಸಿ", "ಎಲೆಗಳ ಮೇಲೆ ನೀರು ತಡೆಯಿರಿ"],
+        },
+        "severity": "medium",
+    },
+}
+
+
+def all_diseases():
+    """Every distinct disease entry across the class maps."""
+    seen = {}
+    for class_map in (DEFAULT_CLASS_MAP, CASSAVA_CLASS_MAP):
+        for meta in class_map.values():
+            seen.setdefault(meta['key'], meta)
+    return list(seen.values())
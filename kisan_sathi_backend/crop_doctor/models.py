@@ -11,6 +11,7 @@ class Analysis(models.Model):
     # Result JSON stores bilingual details: disease, confidence, cause, treatment, prevention
     result = models.JSONField(default=dict)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return f"Analysis {self.id} - {self.crop_type}"
@@ -1,3 +1,42 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TransactionTestCase
 
-# Create your tests here.
+from farmers.authentication import FarmerRefreshToken
+from farmers.tests import make_farmer
+
+from .models import Analysis
+
+
+class AnalysisDetailTests(TransactionTestCase):
+    # The detail view reads from the stand-in replica (see kisan_sathi/test_settings.py)
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.farmer = make_farmer()
+        self.analysis = Analysis.objects.create(farmer=self.farmer, crop_type='tomato', result={'items': []})
+
+    def detail(self, farmer, pk=None, **headers):
+        auth = f"Bearer {FarmerRefreshToken.for_user(farmer).access_token}"
+        return self.client.get(f'/api/crop-doctor/analyses/{pk or self.analysis.pk}/',
+                               HTTP_AUTHORIZATION=auth, **headers)
+
+    def test_unchanged_analysis_is_not_modified(self):
+        first = self.detail(self.farmer)
+        self.assertEqual(first.status_code, 200)
+        second = self.detail(self.farmer, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+    def test_another_farmers_analysis_reveals_no_validator(self):
+        etag = self.detail(self.farmer)['ETag']
+        other = make_farmer(phone='+919800000003', email='other@example.com')
+        response = self.detail(other, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_missing_analysis_is_not_found(self):
+        response = self.detail(self.farmer, pk=self.analysis.pk + 1000)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
@@ -1,10 +1,11 @@
 from django.urls import path
-from .views import AnalyzeView, ReportPDFView
+from .views import AnalysisDetailView, AnalyzeView, ReportPDFView
 
 app_name = 'crop_doctor'
 
 urlpatterns = [
     path('analyze/', AnalyzeView.as_view(), name='analyze'),
+    path('analyses/<int:pk>/', AnalysisDetailView.as_view(), name='analysis-detail'),
     path('report/<int:pk>/', ReportPDFView.as_view(), name='report-pdf'),
 ]
 
@@ -12,6 +12,11 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 
+from kisan_sathi.conditional import conditional
+from kisan_sathi.db_router import ReplicaReadMixin
+from kisan_sathi.metrics import INFERENCE, timer
+from live.events import analysis_completed
+from .diseases import CASSAVA_CLASS_MAP, DEFAULT_CLASS_MAP
 from .models import Analysis, AnalysisImage
 from .serializers import AnalysisSerializer
 
@@ -87,121 +92,9 @@ def _predict_with_tf(image_paths: List[str], crop_type: str):
         indices = probs.argmax(axis=1)
         confidences = probs.max(axis=1) * 100.0
 
-        # Class mapping with bilingual metadata
-        # If using TFHub cassava classifier, use 5-class mapping
+        # Class mapping with bilingual metadata; the TFHub cassava classifier has 5 classes
         hub_handle = os.environ.get("CROP_DOCTOR_TFHUB_HANDLE", "").lower()
-        if "cassava" in hub_handle:
-            CLASS_MAP = {
-                0: {
-                    "key": "cassava_bacterial_blight",
-                    "disease": {"en": "Cassava Bacterial Blight (CBB)", "kn": "ಸಾವುಗಡ್ಡೆ ಬ್ಯಾಕ್ಟೀರಿಯಲ್ ಬ್ಲೈಟ್"},
-                    "cause": {"en": "Xanthomonas axonopodis pv. manihotis infection.", "kn": "ಝಾಂಥೋಮೋನಾಸ್ ಬ್ಯಾಕ್ಟೀರಿಯಾ ಸೋಂಕು."},
-                    "treatment": {
-                        "immediate": {"en": ["Remove infected leaves"], "kn": ["ಬಾಧಿತ ಎಲೆಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
-                        "chemical": {"en": ["Copper-based bactericides as per label"], "kn": ["ತಾಮ್ರ ಆಧಾರಿತ ಬ್ಯಾಕ್ಟಿರಿಸೈಡ್ (ಲೇಬಲ್ ಪ್ರಕಾರ)"]},
-                        "organic": {"en": ["Sanitation and pruning"], "kn": ["ಸ್ವಚ್ಛತೆ ಮತ್ತು ಕತ್ತರಿಸುವಿಕೆ"]},
-                    },
-                    "prevention": {"en": ["Use clean planting material"], "kn": ["ಸ್ವಚ್ಛ ಬಿತ್ತನೆ ವಸ್ತು ಬಳಸಿ"]},
-                    "severity": "high",
-                },
-                1: {
-                    "key": "cassava_brown_streak_disease",
-                    "disease": {"en": "Cassava Brown Streak Disease (CBSD)", "kn": "ಸಾವುಗಡ್ಡೆ ಬ್ರೌನ್ ಸ್ಟ್ರೀಕ್ ರೋಗ"},
-                    "cause": {"en": "Ipomovirus infection spread by whiteflies.", "kn": "ವೈಟ್‌ಫ್ಲೈಗಳ ಮೂಲಕ ಹರಡುವ ಐಪೊಮೋವೈರಸ್ ಸೋಂಕು."},
-                    "treatment": {
-                        "immediate": {"en": ["Rogue and destroy infected plants"], "kn": ["ಬಾಧಿತ ಸಸಿಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
-                        "chemical": {"en": ["Vector management as per IPM"], "kn": ["ವೈಕ್ಟರ್ ನಿರ್ವಹಣೆ (IPM) ಪ್ರಕಾರ"]},
-                        "organic": {"en": ["Neem-based sprays"], "kn": ["ನೀಮ್ ಆಧಾರಿತ ಸಿಂಪಡಣೆ"]},
-                    },
-                    "prevention": {"en": ["Resistant varieties"], "kn": ["ರೋಗ ನಿರೋಧಕ ತಳಿಗಳು"]},
-                    "severity": "high",
-                },
-                2: {
-                    "key": "cassava_green_mottle",
-                    "disease": {"en": "Cassava Green Mottle (CGM)", "kn": "ಸಾವುಗಡ್ಡೆ ಹಸಿರು ಮೋಟಲ್"},
-                    "cause": {"en": "Viral disease causing mottling.", "kn": "ಮೋಟ್ಲಿಂಗ್ ಉಂಟುಮಾಡುವ ವೈರಸ್ ರೋಗ."},
-                    "treatment": {
-                        "immediate": {"en": ["Remove infected material"], "kn": ["ಬಾಧಿತ ವಸ್ತುವನ್ನು ತೆಗೆದುಹಾಕಿ"]},
-                        "chemical": {"en": ["Vector control"], "kn": ["ವೈಕ್ಟರ್ ನಿಯಂತ್ರಣ"]},
-                        "organic": {"en": ["Neem extracts"], "kn": ["ನೀಮ್ ಸಾರು"]},
-                    },
-                    "prevention": {"en": ["Use certified cuttings"], "kn": ["ಪ್ರಮಾಣಿತ ಕಟ್‌ಟಿಂಗ್ ಬಳಸಿ"]},
-                    "severity": "medium",
-                },
-                3: {
-                    "key": "cassava_mosaic_disease",
-                    "disease": {"en": "Cassava Mosaic Disease (CMD)", "kn": "ಸಾವುಗಡ್ಡೆ ಮೊಸಾಯಿಕ್ ರೋಗ"},
-                    "cause": {"en": "Begomovirus transmitted by whiteflies.", "kn": "ವೈಟ್‌ಫ್ಲೈಗಳಿಂದ ಹರಡುವ ಬೇಗೊಮೋವೈರಸ್."},
-                    "treatment": {
-                        "immediate": {"en": ["Remove and destroy infected plants"], "kn": ["ಬಾಧಿತ ಸಸಿಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
-                        "chemical": {"en": ["Vector management"], "kn": ["ವೈಕ್ಟರ್ ನಿರ್ವಹಣೆ"]},
-                        "organic": {"en": ["Neem oil applications"], "kn": ["ನೀಮ್ ಎಣ್ಣೆ ಬಳಕೆ"]},
-                    },
-                    "prevention": {"en": ["Plant resistant varieties"], "kn": ["ರೋಗ ನಿರೋಧಕ ತಳಿಗಳನ್ನು ನೆಡಿ"]},
-                    "severity": "high",
-                },
-                4: {
-                    "key": "healthy",
-                    "disease": {"en": "Healthy", "kn": "ಆರೋಗ್ಯಕರ"},
-                    "cause": {"en": "No disease detected.", "kn": "ಯಾವುದೇ ರೋಗ ಪತ್ತೆಯಾಗಿಲ್ಲ."},
-                    "treatment": {
-                        "immediate": {"en": ["No action needed"], "kn": ["ಯಾವುದೇ ಕ್ರಮ ಬೇಕಿಲ್ಲ"]},
-                        "chemical": {"en": [], "kn": []},
-                        "organic": {"en": [], "kn": []},
-                    },
-                    "prevention": {"en": ["Continue good agronomy"], "kn": ["ಉತ್ತಮ ಕೃಷಿ ಕ್ರಮ ಮುಂದುವರಿಸಿ"]},
-                    "severity": "low",
-                },
-            }
-        else:
-            # Default 2-class example mapping
-            CLASS_MAP = {
-            0: {
-                "key": "tomato_late_blight",
-                "disease": {"en": "Tomato Late Blight", "kn": "ಟೊಮೇಟೊ ತಡವಾದ ಬ್ಲೈಟ್"},
-                "cause": {
-                    "en": "Fungus Phytophthora infestans thrives in cool, wet weather; spreads via splashes.",
-                    "kn": "ಫಂಗಸ್ ಫೈಟೋಫ್ತೋರಾ ಇನ್ಫೆಸ್ಟಾನ್ಸ್ ತಂಪು, ಒದ್ದೆ ಹವಾಮಾನದಲ್ಲಿ ವಿಕಸಿಸುತ್ತದೆ; ನೀರಿನ ಸಿಂಪಡಣೆಯಿಂದ ಹರಡುತ್ತದೆ.",
-                },
-                "treatment": {
-                    "immediate": {
-                        "en": ["Remove infected leaves/fruits", "Improve air circulation", "Reduce watering frequency"],
-                        "kn": ["ಬಾಧಿತ ಎಲೆ/ಕಾಯಿಗಳನ್ನು ತೆಗೆದುಹಾಕಿ", "ಗಾಳಿಯ ಸಂಚಲನ ಹೆಚ್ಚಿಸಿ", "ನೀರಿನ ಪ್ರಮಾಣ ಕಡಿಮೆ ಮಾಡಿ"],
-                    },
-                    "chemical": {
-                        "en": ["Mancozeb 75% WP (2g/L), every 7–10 days, evening spray"],
-                        "kn": ["ಮ್ಯಾಂಕೋಜೆಬ್ 75% ಡಬ್ಲ್ಯೂಪಿ (2g/L), 7–10 ದಿನಗಳಿಗೆ ಒಮ್ಮೆ, ಸಂಜೆ ಸಿಂಪಡಣೆ"],
-                    },
-                    "organic": {
-                        "en": ["Neem oil spray", "Copper-based fungicides", "Bordeaux mixture"],
-                        "kn": ["ನೀಮ್ ಎಣ್ಣೆ ಸಿಂಪಡಣೆ", "ತಾಮ್ರ ಆಧಾರಿತ ಫಂಗಿಸೈಡ್ಸ್", "ಬೋರ್ಡೊ ಮಿಶ್ರಣ"],
-                    },
-                },
-                "prevention": {
-                    "en": ["Use resistant varieties", "Avoid overhead watering", "Maintain plant spacing", "Crop rotation"],
-                    "kn": ["ರೋಗನಿರೋಧಕ ತಳಿಗಳನ್ನು ಬಳಸಿ", "ಮೇಲಿನಿಂದ ನೀರಿನ ಸಿಂಪಡಣೆ ತಪ್ಪಿಸಿ", "ಸಸಿಗಳಿಗೆ ಸಮರ್ಪಕ ಅಂತರ ನೀಡಿ", "ಬೆಳೆ ಪರಿವರ್ತನೆ"],
-                },
-                "severity": "high",
-            },
-            1: {
-                "key": "leaf_spot",
-                "disease": {"en": "Leaf Spot", "kn": "ಎಲೆ ಕಲೆ"},
-                "cause": {
-                    "en": "Fungal or bacterial spots under humid conditions; spreads via wind and water.",
-                    "kn": "ತೇವಾಂಶದಲ್ಲಿ ಹುಳು/ಬ್ಯಾಕ್ಟೀರಿಯಾ ಕಲೆಗಳು; ಗಾಳಿ ಮತ್ತು ನೀರಿನ ಮೂಲಕ ಹರಡುತ್ತವೆ.",
-                },
-                "treatment": {
-                    "immediate": {"en": ["Remove affected leaves"], "kn": ["ಬಾಧಿತ ಎಲೆಗಳನ್ನು ತೆಗೆದುಹಾಕಿ"]},
-                    "chemical": {"en": ["Chlorothalonil spray as per label"], "kn": ["ಲೇಬಲ್‌ ಪ್ರಕಾರ ಕ್ಲೊರೊಥಾಲೊನಿಲ್ ಸಿಂಪಡಣೆ"]},
-                    "organic": {"en": ["Neem oil"], "kn": ["ನೀಮ್ ಎಣ್ಣೆ"]},
-                },
-                "prevention": {
-                    "en": ["Sanitize tools", "Avoid leaf wetness"],
-                    "kn": ["ಉಪಕರಣಗಳನ್ನು ಸ್ವಚ್ಛಗೊಳಿಸಿ", "ಎಲೆಗಳ ಮೇಲೆ ನೀರು ತಡೆಯಿರಿ"],
-                },
-                "severity": "medium",
-            },
-            }
+        CLASS_MAP = CASSAVA_CLASS_MAP if "cassava" in hub_handle else DEFAULT_CLASS_MAP
 
         results: List[dict] = []
         for idx, conf in zip(indices.tolist(), confidences.tolist()):
@@ -304,17 +197,45 @@ class AnalyzeView(APIView):
         for img in analysis.images.order_by("index").all():
             image_paths.append(img.image.path)
 
-        predictions = _predict_with_tf(image_paths, crop_type)
-        if predictions is None:
-            predictions = _mock_model_predict(len(files), crop_type)
+        with timer(INFERENCE, 'crop_doctor'):
+            predictions = _predict_with_tf(image_paths, crop_type)
+            if predictions is None:
+                predictions = _mock_model_predict(len(files), crop_type)
         analysis.result = {"items": predictions}
         analysis.save()
+        analysis_completed(analysis)
+
+        data = AnalysisSerializer(analysis).data
+        return Response({"success": True, "analysis": data}, status=status.HTTP_200_OK)
+
 
+def _may_view(request, farmer_id) -> bool:
+    """Anonymous analyses are open to anyone with the id; a farmer's only to them (and staff)."""
+    if farmer_id is None:
+        return True
+    user = request.user
+    return bool(user and user.is_authenticated and (user.pk == farmer_id or user.is_staff))
+
+
+def _analysis_validators(view, request, pk):
+    row = Analysis.objects.filter(pk=pk).values_list("farmer_id", "updated_at").first()
+    if row is None or not _may_view(request, row[0]):
+        # Let the view answer 404 rather than reveal a validator
+        return None
+    return f"analysis-{pk}-{row[1].timestamp()}", row[1]
+
+
+class AnalysisDetailView(ReplicaReadMixin, APIView):
+    @conditional(_analysis_validators)
+    def get(self, request, pk: int):
+        analysis = Analysis.objects.prefetch_related("images").filter(pk=pk).first()
+        if analysis is None or not _may_view(request, analysis.farmer_id):
+            return Response({"success": False, "message": "Analysis not found"}, status=status.HTTP_404_NOT_FOUND)
         data = AnalysisSerializer(analysis).data
         return Response({"success": True, "analysis": data}, status=status.HTTP_200_OK)
 
 
-class ReportPDFView(APIView):
+class ReportPDFView(ReplicaReadMixin, APIView):
     def get(self, request, pk: int):
         try:
             analysis = Analysis.objects.get(pk=pk)
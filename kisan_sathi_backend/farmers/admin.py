@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import Farmer
+from .search import search_farmers
 
 
 @admin.register(Farmer)
@@ -10,6 +11,10 @@ class FarmerAdmin(UserAdmin):
     search_fields = ['phone', 'email', 'first_name', 'last_name']
     ordering = ['-created_at']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the FTS5/trigram index instead of icontains scans over search_fields
+        return search_farmers(search_term, queryset), False
+
     fieldsets = (
         (None, {'fields': ('phone', 'username', 'password')}),
         ('Personal', {'fields': ('first_name', 'last_name', 'email', 'profile_picture')}),
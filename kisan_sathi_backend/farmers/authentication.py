@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+TOKEN_VERSION_CLAIM = 'ver'
+
+
+def _user_cache_key(user_id, version):
+    return f"farmers:auth-user:{user_id}:{version}"
+
+
+def invalidate_cached_user(farmer):
+    """Drop the cached auth entry for the farmer's current token version."""
+    cache.delete(_user_cache_key(farmer.pk, farmer.token_version))
+
+
+class FarmerRefreshToken(RefreshToken):
+    """Refresh token carrying the farmer's token version (copied to access tokens)."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the farmer from a short-TTL cache keyed by
+    user id and token version, so authenticated requests skip the farmers
+    table lookup. Every Farmer save drops its entry (farmers/signals.py);
+    bumping ``Farmer.token_version`` (password change) orphans the old entry
+    and rejects tokens issued before the change.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+        key = _user_cache_key(user_id, version)
+        user = cache.get(key)
+
+        if user is None:
+            user = super().get_user(validated_token)
+            if user.token_version != version:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+            cache.set(key, user, settings.FARMER_AUTH_CACHE_TTL)
+        elif not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -0,0 +1,208 @@
+"""
+Streaming bulk import of farmers from cooperative CSV/Excel sheets.
+
+Rows are parsed lazily, validated and normalised a chunk at a time,
+passwords are hashed in a process pool and each chunk is written with a
+single ``bulk_create``. Memory stays bounded by the chunk size.
+"""
+import csv
+import io
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import phonenumbers
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from stats.counters import FARMERS_TOTAL, increment
+
+from .models import Farmer
+
+
+REQUIRED_COLUMNS = ('phone', 'email', 'first_name', 'district', 'taluk', 'village')
+LANGUAGES = {'en', 'kn'}
+
+
+@dataclass
+class ImportResult:
+    processed: int = 0
+    created: int = 0
+    errors: List[Tuple[int, str, str]] = field(default_factory=list)  # (row number, phone, message)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+
+def iter_csv_rows(stream) -> Iterator[Dict[str, str]]:
+    """Yield dict rows from a binary or text CSV stream without loading it whole."""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(stream):
+        yield {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+
+
+def iter_excel_rows(stream) -> Iterator[Dict[str, str]]:
+    """Yield dict rows from the first sheet of an .xlsx file in read-only mode."""
+    try:
+        from openpyxl import load_workbook  # type: ignore
+    except ImportError:
+        raise ValueError("Excel import requires openpyxl (pip install openpyxl)")
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(h or '').strip().lower() for h in next(rows, ())]
+        for values in rows:
+            yield {k: ('' if v is None else str(v).strip()) for k, v in zip(header, values)}
+    finally:
+        workbook.close()
+
+
+def iter_rows(stream, filename: str) -> Iterator[Dict[str, str]]:
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_excel_rows(stream)
+    return iter_csv_rows(stream)
+
+
+def _init_worker():
+    # Spawned (non-forked) workers need the app registry for make_password
+    import django
+    django.setup()
+
+
+def _parse_row(row: Dict[str, str]) -> Tuple[Optional[Farmer], Optional[str]]:
+    missing = [c for c in REQUIRED_COLUMNS if not row.get(c)]
+    if missing:
+        return None, f"Missing {', '.join(missing)}"
+
+    try:
+        number = phonenumbers.parse(row['phone'], 'IN')
+    except phonenumbers.NumberParseException:
+        return None, "Invalid phone"
+    if not phonenumbers.is_valid_number(number):
+        return None, "Invalid phone"
+    phone = phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+    email = row['email'].lower()
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None, "Invalid email"
+
+    land_size = None
+    if row.get('land_size'):
+        try:
+            land_size = Decimal(row['land_size']).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            return None, "Invalid land_size"
+
+    language = (row.get('preferred_language') or 'kn').lower()
+    if language not in LANGUAGES:
+        return None, "Invalid preferred_language"
+
+    crops = [c.strip() for c in (row.get('crops_grown') or '').split(';') if c.strip()]
+
+    farmer = Farmer(
+        phone=phone,
+        username=phone.replace('+', ''),
+        email=email,
+        first_name=row['first_name'],
+        last_name=row.get('last_name', ''),
+        district=row['district'],
+        taluk=row['taluk'],
+        village=row['village'],
+        land_size=land_size,
+        crops_grown=crops,
+        preferred_language=language,
+        is_active=True,
+        is_verified=False,
+    )
+    # Raw password is replaced by its hash before insert
+    farmer.password = row.get('password', '')
+    return farmer, None
+
+
+def _import_chunk(chunk: List[Tuple[int, Dict[str, str]]], executor: Optional[ProcessPoolExecutor], result: ImportResult):
+    parsed: List[Tuple[int, Farmer]] = []
+    seen_phones, seen_emails = set(), set()
+    for line_no, row in chunk:
+        farmer, error = _parse_row(row)
+        if error:
+            result.errors.append((line_no, row.get('phone', ''), error))
+            continue
+        phone = str(farmer.phone)
+        if phone in seen_phones or farmer.email in seen_emails:
+            result.errors.append((line_no, phone, "Duplicate phone/email in file"))
+            continue
+        seen_phones.add(phone)
+        seen_emails.add(farmer.email)
+        parsed.append((line_no, farmer))
+
+    existing = Farmer.objects.filter(phone__in=seen_phones).values_list('phone', flat=True)
+    existing_phones = {str(p) for p in existing}
+    existing_emails = set(Farmer.objects.filter(email__in=seen_emails).values_list('email', flat=True))
+
+    batch: List[Tuple[int, Farmer]] = []
+    for line_no, farmer in parsed:
+        if str(farmer.phone) in existing_phones or farmer.email in existing_emails:
+            result.errors.append((line_no, str(farmer.phone), "Phone or email already registered"))
+        else:
+            batch.append((line_no, farmer))
+    if not batch:
+        return
+
+    raw_passwords = [f.password or None for _, f in batch]
+    if executor is not None:
+        hashes = executor.map(make_password, raw_passwords, chunksize=max(1, len(batch) // 32))
+    else:
+        hashes = map(make_password, raw_passwords)
+    for (_, farmer), hashed in zip(batch, hashes):
+        farmer.password = hashed
+
+    with transaction.atomic():
+        # Conflicts can only come from concurrent signups since the pre-check
+        Farmer.objects.bulk_create([f for _, f in batch], ignore_conflicts=True)
+        # ignore_conflicts reports nothing back; our rows are the ones holding
+        # the hashes just made (salted, so no other row can have them)
+        stored = Farmer.objects.filter(phone__in=[f.phone for _, f in batch]).values_list('phone', 'password')
+        inserted = {(str(phone), password) for phone, password in stored}
+        created = 0
+        for line_no, farmer in batch:
+            if (str(farmer.phone), farmer.password) in inserted:
+                created += 1
+            else:
+                result.errors.append((line_no, str(farmer.phone), "Phone or email already registered"))
+        if created:
+            # bulk_create skips post_save
+            increment(FARMERS_TOTAL, created)
+    result.created += created
+
+
+def import_farmers(rows: Iterable[Dict[str, str]], chunk_size: int = 2000, workers: Optional[int] = None) -> ImportResult:
+    """
+    Import farmer rows. ``workers`` is the password-hashing process count
+    (None = CPU count, 0 = hash in-process). Rows without a password get an
+    unusable one, so those farmers cannot log in until a password is set.
+    """
+    result = ImportResult()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers != 0 else None
+    try:
+        chunk: List[Tuple[int, Dict[str, str]]] = []
+        # Row 1 is the header
+        for line_no, row in enumerate(rows, start=2):
+            chunk.append((line_no, row))
+            if len(chunk) >= chunk_size:
+                _import_chunk(chunk, executor, result)
+                result.processed += len(chunk)
+                chunk = []
+        if chunk:
+            _import_chunk(chunk, executor, result)
+            result.processed += len(chunk)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return result
@@ -0,0 +1,43 @@
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from farmers.importer import import_farmers, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import farmers from a cooperative CSV or Excel (.xlsx) sheet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or .xlsx file")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Password hashing processes (default: CPU count, 0: in-process)")
+        parser.add_argument('--report', help="Write per-row errors to this CSV file (default: stderr)")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        started = time.monotonic()
+        try:
+            with open(path, 'rb') as stream:
+                result = import_farmers(iter_rows(stream, path), options['chunk_size'], options['workers'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - started
+
+        if result.errors:
+            out = open(options['report'], 'w', newline='') if options['report'] else sys.stderr
+            try:
+                writer = csv.writer(out)
+                writer.writerow(['row', 'phone', 'error'])
+                writer.writerows(result.errors)
+            finally:
+                if out is not sys.stderr:
+                    out.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {result.processed} rows in {elapsed:.1f}s: "
+            f"{result.created} created, {result.failed} failed"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farmer',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:01
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0002_farmer_token_version'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='farmer',
+            name='otp',
+        ),
+        migrations.RemoveField(
+            model_name='farmer',
+            name='otp_created_at',
+        ),
+    ]
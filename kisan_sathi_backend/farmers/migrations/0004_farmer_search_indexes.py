@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:04
+
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS farmers_search
+    USING fts5(first_name, last_name, phone, content='farmers', content_rowid='id', tokenize='trigram')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS farmers_search_ai AFTER INSERT ON farmers BEGIN
+        INSERT INTO farmers_search(rowid, first_name, last_name, phone)
+        VALUES (new.id, new.first_name, new.last_name, new.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS farmers_search_ad AFTER DELETE ON farmers BEGIN
+        INSERT INTO farmers_search(farmers_search, rowid, first_name, last_name, phone)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS farmers_search_au AFTER UPDATE OF first_name, last_name, phone ON farmers BEGIN
+        INSERT INTO farmers_search(farmers_search, rowid, first_name, last_name, phone)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.phone);
+        INSERT INTO farmers_search(rowid, first_name, last_name, phone)
+        VALUES (new.id, new.first_name, new.last_name, new.phone);
+    END
+    """,
+    "INSERT INTO farmers_search(farmers_search) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS farmers_search_ai",
+    "DROP TRIGGER IF EXISTS farmers_search_ad",
+    "DROP TRIGGER IF EXISTS farmers_search_au",
+    "DROP TABLE IF EXISTS farmers_search",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS farmers_first_name_trgm ON farmers USING gin (first_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS farmers_last_name_trgm ON farmers USING gin (last_name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS farmers_phone_trgm ON farmers USING gin (phone gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS farmers_first_name_trgm",
+    "DROP INDEX IF EXISTS farmers_last_name_trgm",
+    "DROP INDEX IF EXISTS farmers_phone_trgm",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farmers', '0003_move_otp_state_to_cache'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='farmer',
+            index=models.Index(fields=['district', 'taluk', 'village'], name='farmers_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='farmer',
+            index=models.Index(fields=['-created_at'], name='farmers_created_idx'),
+        ),
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
 
+from .authentication import invalidate_cached_user
+
 
 class Farmer(AbstractUser):
     username = models.CharField(max_length=150, unique=True, blank=True, null=True)
@@ -15,8 +17,8 @@ class Farmer(AbstractUser):
     preferred_language = models.CharField(max_length=2, choices=[('en', 'English'), ('kn', 'Kannada')], default='kn')
     profile_picture = models.ImageField(upload_to='profiles/', null=True, blank=True)
     is_verified = models.BooleanField(default=False)
-    otp = models.CharField(max_length=6, blank=True)
-    otp_created_at = models.DateTimeField(null=True, blank=True)
+    # Bumped on password change; embedded in JWTs and part of the auth cache key
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -25,10 +27,20 @@ class Farmer(AbstractUser):
 
     class Meta:
         db_table = 'farmers'
+        indexes = [
+            models.Index(fields=['district', 'taluk', 'village'], name='farmers_location_idx'),
+            models.Index(fields=['-created_at'], name='farmers_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.phone})"
 
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        if self.pk:
+            invalidate_cached_user(self)
+        self.token_version += 1
+
     def save(self, *args, **kwargs):
         if not self.username:
             self.username = str(self.phone).replace('+', '').replace(' ', '')
@@ -0,0 +1,88 @@
+"""
+Cache-backed OTP store.
+
+OTP codes, attempt counters and per-phone send counters live in the cache
+alias named by ``settings.OTP_CACHE_ALIAS`` (local memory by default, Redis
+when ``REDIS_URL`` is set) so OTP traffic never touches the farmers table.
+"""
+import hmac
+import secrets
+import string
+
+from django.conf import settings
+from django.core.cache import caches
+from phonenumber_field.phonenumber import PhoneNumber
+
+
+class OTPRateLimitExceeded(Exception):
+    pass
+
+
+def generate_otp():
+    return ''.join(secrets.choice(string.digits) for _ in range(6))
+
+
+def normalize_phone(phone):
+    """Return the E.164 form of ``phone`` (default region IN) or None if invalid."""
+    number = PhoneNumber.from_string(str(phone), region='IN') if phone else None
+    if number is None or not number.is_valid():
+        return None
+    return number.as_e164
+
+
+def _cache():
+    return caches[settings.OTP_CACHE_ALIAS]
+
+
+def _code_key(phone):
+    return f"otp:code:{phone}"
+
+
+def _attempts_key(phone):
+    return f"otp:attempts:{phone}"
+
+
+def _sends_key(phone):
+    return f"otp:sends:{phone}"
+
+
+def issue_otp(phone):
+    """Generate and store a fresh OTP for ``phone`` (E.164 string)."""
+    cache = _cache()
+    cache.add(_sends_key(phone), 0, settings.OTP_SEND_WINDOW)
+    try:
+        sends = cache.incr(_sends_key(phone))
+    except ValueError:
+        # Window expired between add() and incr()
+        cache.set(_sends_key(phone), 1, settings.OTP_SEND_WINDOW)
+        sends = 1
+    if sends > settings.OTP_SEND_LIMIT:
+        raise OTPRateLimitExceeded("Too many OTP requests. Try again later.")
+
+    otp = generate_otp()
+    cache.set_many({_code_key(phone): otp, _attempts_key(phone): 0}, settings.OTP_TTL)
+    return otp
+
+
+def check_otp(phone, otp):
+    """Return ``(is_valid, message)``; a code is consumed on success or after too many attempts."""
+    cache = _cache()
+    stored = cache.get(_code_key(phone))
+    if stored is None:
+        return False, "OTP expired or not requested"
+
+    try:
+        attempts = cache.incr(_attempts_key(phone))
+    except ValueError:
+        return False, "OTP expired or not requested"
+
+    if attempts > settings.OTP_MAX_ATTEMPTS:
+        cache.delete_many([_code_key(phone), _attempts_key(phone)])
+        return False, "Too many attempts. Request a new OTP."
+
+    # Bytes, since compare_digest rejects non-ASCII str (e.g. Devanagari digits)
+    if not hmac.compare_digest(stored.encode(), str(otp).encode()):
+        return False, "Invalid OTP"
+
+    cache.delete_many([_code_key(phone), _attempts_key(phone)])
+    return True, "Verified successfully"
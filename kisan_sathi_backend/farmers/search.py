@@ -0,0 +1,117 @@
+"""
+Indexed farmer search.
+
+Names are matched by prefix and phones by suffix. On SQLite the lookups run
+against the ``farmers_search`` FTS5 trigram table, on PostgreSQL against
+pg_trgm GIN indexes (both created in migration 0004). Facet counts group on
+the indexed (district, taluk, village) columns.
+"""
+import re
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.db.models import Count, F, Lookup, Q, QuerySet
+
+from .models import Farmer
+
+
+# \w misses Kannada vowel signs (combining marks), so include the whole block
+_TOKEN_RE = re.compile(r'(?:[^\W_]|[\u0c80-\u0cff])+')
+
+
+def _tokens(query: str):
+    names, digits = [], []
+    for token in _TOKEN_RE.findall(query or ''):
+        (digits if token.isdigit() else names).append(token)
+    return names, digits
+
+
+def _sqlite_match_ids(names: List[str], digits: List[str]) -> RawSQL:
+    # Trigram MATCH needs 3+ characters; shorter tokens fall back to LIKE,
+    # which FTS5 still answers from its own table rather than `farmers`
+    phrases, clauses, params = [], [], []
+    for name in names:
+        if len(name) >= 3:
+            phrases.append(f'{{first_name last_name}}: ^"{name}"')
+        else:
+            clauses.append("(first_name LIKE %s OR last_name LIKE %s)")
+            params += [f"{name}%", f"{name}%"]
+    for number in digits:
+        clauses.append("phone LIKE %s")
+        params.append(f"%{number}")
+    if phrases:
+        clauses.insert(0, "farmers_search MATCH %s")
+        params.insert(0, " AND ".join(phrases))
+    return RawSQL(f"SELECT rowid FROM farmers_search WHERE {' AND '.join(clauses)}", params)
+
+
+class _ILike(Lookup):
+    """
+    ``col ILIKE pattern`` on the bare column. Django's ``istartswith`` compiles
+    to ``UPPER(col) LIKE UPPER(...)``, which the gin_trgm_ops indexes on the
+    raw columns cannot serve; ILIKE they can.
+    """
+    lookup_name = 'ilike'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", [*lhs_params, *rhs_params]
+
+
+def _name_prefix(name: str) -> Q:
+    pattern = f"{connection.ops.prep_for_like_query(name)}%"
+    return Q(_ILike(F('first_name'), pattern)) | Q(_ILike(F('last_name'), pattern))
+
+
+def search_farmers(query: str, queryset: Optional[QuerySet] = None) -> QuerySet:
+    """Filter ``queryset`` (default all farmers) by name prefixes and phone suffixes in ``query``."""
+    queryset = Farmer.objects.all() if queryset is None else queryset
+    names, digits = _tokens(query)
+    if not names and not digits:
+        return queryset
+
+    if connection.vendor == 'sqlite':
+        return queryset.filter(id__in=_sqlite_match_ids(names, digits))
+
+    # PostgreSQL: ILIKE 'x%' and LIKE '%123' are served by the gin_trgm_ops indexes
+    for name in names:
+        queryset = queryset.filter(_name_prefix(name))
+    for number in digits:
+        queryset = queryset.filter(phone__endswith=number)
+    return queryset
+
+
+FACET_CACHE_TTL = 60
+
+
+def facet_counts(queryset: QuerySet, district: str = '', taluk: str = '') -> Dict[str, List[dict]]:
+    """
+    District counts for ``queryset``; taluk counts once a district is chosen
+    and village counts once a taluk is chosen, so every group-by runs on a
+    prefix of the (district, taluk, village) index.
+    """
+    facets = {'district': _count_by(queryset, 'district')}
+    if district:
+        queryset = queryset.filter(district=district)
+        facets['taluk'] = _count_by(queryset, 'taluk')
+        if taluk:
+            facets['village'] = _count_by(queryset.filter(taluk=taluk), 'village')
+    return facets
+
+
+def all_farmer_facets(district: str = '', taluk: str = '') -> Dict[str, List[dict]]:
+    """Facets over every farmer, cached briefly since each one is a full index scan."""
+    key = f"farmers:facets:{district}:{taluk}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = facet_counts(Farmer.objects.all(), district, taluk)
+        cache.set(key, facets, FACET_CACHE_TTL)
+    return facets
+
+
+def _count_by(queryset: QuerySet, column: str) -> List[dict]:
+    rows = queryset.order_by().values(column).annotate(count=Count('id')).order_by('-count', column)
+    return [{'value': row[column], 'count': row['count']} for row in rows]
@@ -1,7 +1,9 @@
 from rest_framework import serializers
+from django.contrib.auth.models import update_last_login
 from django.contrib.auth.password_validation import validate_password
+from stats.counters import FARMERS_ACTIVE, FARMERS_LOGINS, active_since, increment
 from .models import Farmer
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import FarmerRefreshToken
 
 
 class FarmerRegistrationSerializer(serializers.ModelSerializer):
@@ -46,7 +48,12 @@ class LoginSerializer(serializers.Serializer):
 
         # OTP verification disabled: do not block login on is_verified
 
-        refresh = RefreshToken.for_user(farmer)
+        if farmer.last_login is None or farmer.last_login < active_since():
+            increment(FARMERS_ACTIVE)
+        increment(FARMERS_LOGINS)
+        update_last_login(None, farmer)
+
+        refresh = FarmerRefreshToken.for_user(farmer)
 
         return {
             'farmer': farmer,
@@ -63,4 +70,12 @@ class FarmerProfileSerializer(serializers.ModelSerializer):
                   'profile_picture', 'is_verified', 'created_at']
         read_only_fields = ['phone', 'is_verified', 'created_at']
 
+    def update(self, instance, validated_data):
+        # request.user may come from the auth cache, so only write the changed
+        # columns instead of saving a possibly stale full row
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
 
@@ -0,0 +1,19 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import _user_cache_key
+from .models import Farmer
+
+
+@receiver(post_save, sender=Farmer)
+@receiver(post_delete, sender=Farmer)
+def invalidate_auth_cache(sender, instance, raw=False, **kwargs):
+    # Any write (profile, admin, verification, deactivation) must reach the
+    # next request's request.user, and the profile ETag built from it. Drop
+    # the entry after commit so a concurrent request cannot re-cache the old row.
+    if raw:
+        return
+    key = _user_cache_key(instance.pk, instance.token_version)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -1,3 +1,247 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from notifications.models import OutboxMessage
+from stats.counters import FARMERS_TOTAL, current
+
+from .authentication import FarmerRefreshToken
+from .importer import import_farmers
+from .models import Farmer
+from .otp import check_otp, issue_otp
+from .search import facet_counts, search_farmers
+from .utils import send_otp_email
+
+
+def make_farmer(phone='+919800000001', email='farmer@example.com', **fields):
+    fields = {
+        'first_name': 'Test', 'last_name': 'Farmer', 'district': 'Mandya', 'taluk': 'Maddur', 'village': 'Kestur',
+        **fields,
+    }
+    return Farmer.objects.create(phone=phone, email=email, password=make_password(None), **fields)
+
+
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.farmer = make_farmer()
+        self.auth = f"Bearer {FarmerRefreshToken.for_user(self.farmer).access_token}"
+
+    def profile(self, **headers):
+        return self.client.get('/api/auth/profile/', HTTP_AUTHORIZATION=self.auth, **headers)
+
+    def test_any_save_refreshes_the_cached_user(self):
+        first = self.profile()
+        self.assertEqual(first.json()['data']['village'], 'Kestur')
+
+        # An admin-style edit outside the profile serializer
+        time.sleep(0.01)
+        farmer = Farmer.objects.get(pk=self.farmer.pk)
+        farmer.village = 'Bharathinagara'
+        with self.captureOnCommitCallbacks(execute=True):
+            farmer.save()
+
+        second = self.profile(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['data']['village'], 'Bharathinagara')
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_deactivation_rejects_cached_tokens(self):
+        self.assertEqual(self.profile().status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            farmer = Farmer.objects.get(pk=self.farmer.pk)
+            farmer.is_active = False
+            farmer.save()
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_unchanged_profile_is_not_modified(self):
+        first = self.profile()
+        second = self.profile(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+    def test_profile_update_changes_the_validator(self):
+        first = self.profile()
+        time.sleep(0.01)
+        with self.captureOnCommitCallbacks(execute=True):
+            updated = self.client.put('/api/auth/profile/', data={'village': 'Bharathinagara'},
+                                      content_type='application/json', HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(updated.status_code, 200)
+        second = self.profile(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['data']['village'], 'Bharathinagara')
+
+    @override_settings(COMPRESSION_MIN_BYTES=0)
+    def test_weak_etag_of_a_gzipped_profile_is_accepted(self):
+        first = self.profile(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        second = self.profile(HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+
+class OTPTests(TestCase):
+    phone = '+919800000002'
+
+    def setUp(self):
+        caches[settings.OTP_CACHE_ALIAS].clear()
+
+    def test_correct_code_verifies_once(self):
+        otp = issue_otp(self.phone)
+        self.assertEqual(check_otp(self.phone, otp), (True, "Verified successfully"))
+        self.assertFalse(check_otp(self.phone, otp)[0])
+
+    def test_non_ascii_digits_are_an_invalid_code(self):
+        issue_otp(self.phone)
+        self.assertEqual(check_otp(self.phone, "\u0967\u0968\u0969\u096a\u096b\u096c"), (False, "Invalid OTP"))
+
+    def test_the_email_states_the_configured_lifetime(self):
+        for ttl, text in ((300, "Valid for 5 minutes."), (60, "Valid for 1 minute.")):
+            with self.subTest(ttl=ttl), override_settings(OTP_TTL=ttl):
+                send_otp_email('farmer@example.com', '123456', 'Ravi')
+                self.assertTrue(OutboxMessage.objects.latest('id').body.endswith(text))
+
+
+class ImportTests(TestCase):
+    def rows(self, count):
+        return [
+            {'phone': f'98000100{i:02d}', 'email': f'import{i}@example.com', 'first_name': 'Import',
+             'district': 'Mandya', 'taluk': 'Maddur', 'village': 'Kestur'}
+            for i in range(count)
+        ]
+
+    def test_counts_only_rows_that_were_inserted(self):
+        bulk_create = Farmer.objects.bulk_create
+
+        def racing_signup(objs, **kwargs):
+            # A signup lands between the duplicate pre-check and the insert
+            make_farmer(phone='+919800010001', email='someone@example.com')
+            make_farmer(phone='+919800099999', email='import2@example.com')
+            return bulk_create(objs, **kwargs)
+
+        before = current(FARMERS_TOTAL)
+        with mock.patch.object(Farmer.objects, 'bulk_create', side_effect=racing_signup):
+            result = import_farmers(self.rows(4), workers=0)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([(line, phone) for line, phone, _ in result.errors],
+                         [(3, '+919800010001'), (4, '+919800010002')])
+        # The two racing signups went through post_save, the import added two more
+        self.assertEqual(current(FARMERS_TOTAL) - before, 4)
+        self.assertEqual(Farmer.objects.count(), 4)
+
+
+class ImportViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = make_farmer(phone='+919800000009', email='admin@example.com', is_staff=True)
+        self.auth = f"Bearer {FarmerRefreshToken.for_user(admin).access_token}"
+
+    def upload(self, rows):
+        lines = ['phone,email,first_name,district,taluk,village'] + [
+            f'98000200{i:02d},upload{i}@example.com,Upload,Mandya,Maddur,Kestur' for i in range(rows)
+        ]
+        sheet = SimpleUploadedFile('farmers.csv', '\n'.join(lines).encode(), 'text/csv')
+        return self.client.post('/api/auth/import/', {'file': sheet}, HTTP_AUTHORIZATION=self.auth)
+
+    def test_imports_in_the_request_without_a_process_pool(self):
+        with mock.patch('farmers.importer.ProcessPoolExecutor') as pool:
+            response = self.upload(3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['created'], 3)
+        pool.assert_not_called()
+        self.assertTrue(Farmer.objects.filter(phone='+919800020002').exists())
+
+    @override_settings(FARMER_IMPORT_MAX_ROWS=2)
+    def test_large_sheets_are_left_to_the_command(self):
+        response = self.upload(3)
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Farmer.objects.filter(email__startswith='upload').exists())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.ravi = make_farmer(phone='+919800012345', email='ravi@example.com', first_name='Ravi', last_name='Kumar')
+        self.ravindra = make_farmer(phone='+919800067890', email='ravindra@example.com', first_name='Ravindra',
+                                    last_name='Gowda', district='Mysuru', taluk='Nanjangud', village='Hullahalli')
+        self.kannada = make_farmer(phone='+919800055555', email='kn@example.com', first_name='ಮಂಜುನಾಥ',
+                                   last_name='Gowda', taluk='Malavalli', village='Halagur')
+
+    def ids(self, query):
+        return set(search_farmers(query).values_list('id', flat=True))
+
+    def test_names_match_by_prefix_through_the_index(self):
+        self.assertEqual(self.ids('ravi'), {self.ravi.pk, self.ravindra.pk})
+        self.assertEqual(self.ids('Ravin'), {self.ravindra.pk})
+        self.assertEqual(self.ids('avi'), set())
+        self.assertEqual(self.ids('ravi gowda'), {self.ravindra.pk})
+        self.assertEqual(self.ids('ಮಂಜು'), {self.kannada.pk})
+
+    def test_short_names_and_phones(self):
+        self.assertEqual(self.ids('Ra'), {self.ravi.pk, self.ravindra.pk})
+        self.assertEqual(self.ids('12345'), {self.ravi.pk})
+        self.assertEqual(self.ids('gowda 55'), {self.kannada.pk})
+        # Phones match by suffix only
+        self.assertEqual(self.ids('98000'), set())
+
+    def test_the_index_follows_edits_and_deletes(self):
+        self.ravi.first_name = 'Shankar'
+        self.ravi.save()
+        self.assertEqual(self.ids('ravi'), {self.ravindra.pk})
+        self.assertEqual(self.ids('shank'), {self.ravi.pk})
+        self.ravindra.delete()
+        self.assertEqual(self.ids('ravi'), set())
+
+    def test_punctuation_is_not_fts_syntax(self):
+        self.assertEqual(self.ids('"ravi*'), {self.ravi.pk, self.ravindra.pk})
+        # A name to match, not an operator
+        self.assertEqual(self.ids('ravi OR kumar'), set())
+        self.assertEqual(self.ids('  '), {self.ravi.pk, self.ravindra.pk, self.kannada.pk})
+
+    def test_facets_drill_down_the_location_index(self):
+        self.assertEqual(facet_counts(Farmer.objects.all()), {
+            'district': [{'value': 'Mandya', 'count': 2}, {'value': 'Mysuru', 'count': 1}],
+        })
+        self.assertEqual(facet_counts(search_farmers('gowda'), 'Mandya', 'Malavalli'), {
+            'district': [{'value': 'Mandya', 'count': 1}, {'value': 'Mysuru', 'count': 1}],
+            'taluk': [{'value': 'Malavalli', 'count': 1}],
+            'village': [{'value': 'Halagur', 'count': 1}],
+        })
+
+
+class SearchViewTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        admin = make_farmer(first_name='Admin', last_name='User', is_staff=True)
+        self.auth = f"Bearer {FarmerRefreshToken.for_user(admin).access_token}"
+        make_farmer(phone='+919800000002', email='ravi@example.com', first_name='Ravi', last_name='Kumar')
+        make_farmer(phone='+919800000003', email='ravindra@example.com', first_name='Ravindra', last_name='Gowda',
+                    district='Mysuru', taluk='Nanjangud')
+
+    def search(self, **params):
+        return self.client.get('/api/auth/farmers/search/', params, HTTP_AUTHORIZATION=self.auth)
+
+    def test_results_and_facets_for_a_query(self):
+        data = self.search(q='ravi').json()['data']
+        self.assertEqual([row['name'] for row in data['results']], ['Ravindra Gowda', 'Ravi Kumar'])
+        self.assertEqual(data['facets'], {
+            'district': [{'value': 'Mandya', 'count': 1}, {'value': 'Mysuru', 'count': 1}],
+        })
+
+    def test_a_district_narrows_results_and_opens_taluk_facets(self):
+        data = self.search(q='ravi', district='Mysuru').json()['data']
+        self.assertEqual([row['name'] for row in data['results']], ['Ravindra Gowda'])
+        self.assertEqual(data['facets']['taluk'], [{'value': 'Nanjangud', 'count': 1}])
+
+    def test_facets_without_a_query_cover_every_farmer(self):
+        data = self.search(limit='x').json()['data']
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(data['facets']['district'], [{'value': 'Mandya', 'count': 2}, {'value': 'Mysuru', 'count': 1}])
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import SignupAPIView, VerifyOTPView, LoginAPIView, ProfileView
+from .views import SignupAPIView, SendOTPView, VerifyOTPView, LoginAPIView, ProfileView, FarmerImportView, FarmerSearchView
 
 
 app_name = 'farmers'
@@ -7,9 +7,12 @@ app_name = 'farmers'
 
 urlpatterns = [
     path('signup/', SignupAPIView.as_view(), name='signup'),
+    path('send-otp/', SendOTPView.as_view(), name='send-otp'),
     path('verify-otp/', VerifyOTPView.as_view(), name='verify-otp'),
     path('login/', LoginAPIView.as_view(), name='login'),
     path('profile/', ProfileView.as_view(), name='profile'),
+    path('farmers/search/', FarmerSearchView.as_view(), name='farmer-search'),
+    path('import/', FarmerImportView.as_view(), name='import'),
 ]
 
 
@@ -1,49 +1,38 @@
-import random
-import string
-from datetime import timedelta
-from django.utils import timezone
-from django.core.mail import send_mail
+from django.conf import settings
 
+from notifications.outbox import enqueue_email, enqueue_sms
+from stats.counters import FARMERS_VERIFIED, increment
 
-def generate_otp():
-    return ''.join(random.choices(string.digits, k=6))
+from .otp import check_otp
 
 
+# OTP messages are queued in the notification outbox and delivered by
+# `manage.py run_notification_worker`, so requests never wait on a gateway
+
 def send_otp_sms(phone, otp):
-    print(f"\n{'='*50}")
-    print(f"SMS to {phone}: Your OTP is {otp}")
-    print(f"{'='*50}\n")
-    return True
+    enqueue_sms(str(phone), f"Your Kisan Sathi OTP is {otp}")
 
 
 def send_otp_email(email, otp, farmer_name):
     subject = 'Kisan Sathi - OTP Verification'
-    message = f'Hello {farmer_name},\n\nYour OTP is: {otp}\n\nValid for 10 minutes.'
-    try:
-        send_mail(subject, message, 'noreply@kisansathi.com', [email])
-        return True
-    except:
-        return False
+    minutes = settings.OTP_TTL // 60
+    message = (
+        f'Hello {farmer_name},\n\nYour OTP is: {otp}\n\n'
+        f'Valid for {minutes} minute{"" if minutes == 1 else "s"}.'
+    )
+    enqueue_email(email, subject, message)
 
 
 def verify_otp(farmer, otp):
-    if not farmer.otp or not farmer.otp_created_at:
-        return False, "No OTP found"
-
-    if timezone.now() > farmer.otp_created_at + timedelta(minutes=10):
-        farmer.otp = ''
-        farmer.save()
-        return False, "OTP expired"
-
-    if farmer.otp != otp:
-        return False, "Invalid OTP"
-
-    farmer.is_verified = True
-    farmer.is_active = True
-    farmer.otp = ''
-    farmer.otp_created_at = None
-    farmer.save()
-
-    return True, "Verified successfully"
-
-
+    is_valid, message = check_otp(str(farmer.phone), otp)
+    if not is_valid:
+        return False, message
+
+    if not (farmer.is_verified and farmer.is_active):
+        if not farmer.is_verified:
+            increment(FARMERS_VERIFIED)
+        farmer.is_verified = True
+        farmer.is_active = True
+        farmer.save(update_fields=['is_verified', 'is_active', 'updated_at'])
+
+    return True, message
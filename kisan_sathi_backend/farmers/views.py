@@ -1,11 +1,19 @@
+from itertools import islice
+
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from kisan_sathi.conditional import conditional
+from kisan_sathi.db_router import ReplicaReadMixin
+from .importer import import_farmers, iter_rows
 from .models import Farmer
+from .otp import OTPRateLimitExceeded, issue_otp, normalize_phone
+from .search import all_farmer_facets, facet_counts, search_farmers
 from .serializers import FarmerRegistrationSerializer, LoginSerializer, FarmerProfileSerializer
-from .utils import generate_otp, send_otp_sms, send_otp_email, verify_otp
+from .utils import send_otp_sms, verify_otp
 
 
 class SignupAPIView(APIView):
@@ -26,9 +34,40 @@ class SignupAPIView(APIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+class SendOTPView(APIView):
+    def post(self, request):
+        phone = normalize_phone(request.data.get('phone'))
+
+        if not phone:
+            return Response({
+                'success': False,
+                'message': 'Valid phone required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not Farmer.objects.filter(phone=phone).exists():
+            return Response({
+                'success': False,
+                'message': 'Farmer not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            otp = issue_otp(phone)
+        except OTPRateLimitExceeded as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+        send_otp_sms(phone, otp)
+        return Response({
+            'success': True,
+            'message': 'OTP sent'
+        })
+
+
 class VerifyOTPView(APIView):
     def post(self, request):
-        phone = request.data.get('phone')
+        phone = normalize_phone(request.data.get('phone'))
         otp = request.data.get('otp')
 
         if not phone or not otp:
@@ -37,6 +76,27 @@ class VerifyOTPView(APIView):
                 'message': 'Phone and OTP required'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            farmer = Farmer.objects.get(phone=phone)
+        except Farmer.DoesNotExist:
+            return Response({
+                'success': False,
+                'message': 'Farmer not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        is_valid, message = verify_otp(farmer, otp)
+
+        if is_valid:
+            return Response({
+                'success': True,
+                'message': message
+            })
+        else:
+            return Response({
+                'success': False,
+                'message': message
+            }, status=status.HTTP_400_BAD_REQUEST)
+
 
 class LoginAPIView(APIView):
     def post(self, request):
@@ -70,9 +130,16 @@ class LoginAPIView(APIView):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _profile_validators(view, request):
+    # Every profile write bumps updated_at and refreshes the cached request.user
+    farmer = request.user
+    return f"farmer-{farmer.pk}-{farmer.updated_at.timestamp()}", farmer.updated_at
+
+
 class ProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional(_profile_validators)
     def get(self, request):
         serializer = FarmerProfileSerializer(request.user)
         return Response({
@@ -94,23 +161,96 @@ class ProfileView(APIView):
             'errors': serializer.errors
         }, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            farmer = Farmer.objects.get(phone=phone)
-        except Farmer.DoesNotExist:
-            return Response({
-                'success': False,
-                'message': 'Farmer not found'
-            }, status=status.HTTP_404_NOT_FOUND)
 
-        is_valid, message = verify_otp(farmer, otp)
+class FarmerImportView(APIView):
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
 
-        if is_valid:
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
             return Response({
-                'success': True,
-                'message': message
-            })
-        else:
+                'success': False,
+                'message': 'CSV or Excel file required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = settings.FARMER_IMPORT_MAX_ROWS
+        try:
+            rows = list(islice(iter_rows(upload, upload.name), limit + 1))
+            if len(rows) > limit:
+                return Response({
+                    'success': False,
+                    'message': f'Sheets over {limit} rows must be imported with `manage.py import_farmers`'
+                }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            # Hash in this worker: a process pool per request would take every CPU
+            result = import_farmers(rows, workers=0)
+        except ValueError as e:
             return Response({
                 'success': False,
-                'message': message
+                'message': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'data': {
+                'processed': result.processed,
+                'created': result.created,
+                'failed': result.failed,
+                # Full report is available through `manage.py import_farmers --report`
+                'errors': [
+                    {'row': row, 'phone': phone, 'error': error}
+                    for row, phone, error in result.errors[:100]
+                ],
+            }
+        })
+
+
+class FarmerSearchView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        district = params.get('district', '')
+        taluk = params.get('taluk', '')
+        village = params.get('village', '')
+        try:
+            limit = min(int(params.get('limit', 20)), 100)
+        except ValueError:
+            limit = 20
+
+        query = params.get('q', '')
+        matches = search_farmers(query)
+        facets = facet_counts(matches, district, taluk) if query.strip() else all_farmer_facets(district, taluk)
+
+        if district:
+            matches = matches.filter(district=district)
+        if taluk:
+            matches = matches.filter(taluk=taluk)
+        if village:
+            matches = matches.filter(village=village)
+
+        farmers = matches.order_by('-created_at').only(
+            'id', 'first_name', 'last_name', 'phone', 'email', 'district', 'taluk', 'village',
+            'is_active', 'created_at',
+        )[:limit]
+
+        return Response({
+            'success': True,
+            'data': {
+                'results': [
+                    {
+                        'id': farmer.id,
+                        'name': f"{farmer.first_name} {farmer.last_name}".strip(),
+                        'phone': str(farmer.phone),
+                        'email': farmer.email,
+                        'district': farmer.district,
+                        'taluk': farmer.taluk,
+                        'village': farmer.village,
+                        'joinDate': farmer.created_at.date().isoformat(),
+                        'status': 'active' if farmer.is_active else 'inactive',
+                    }
+                    for farmer in farmers
+                ],
+                'facets': facets,
+            }
+        })
@@ -1,3 +1,30 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Tip, TipBundle, TipTranslation
+
+
+class TipTranslationInline(admin.TabularInline):
+    model = TipTranslation
+    extra = 2
+    max_num = 2
+
+
+@admin.register(Tip)
+class TipAdmin(admin.ModelAdmin):
+    list_display = ['id', '__str__', 'category', 'season', 'difficulty', 'is_published', 'updated_at']
+    list_filter = ['category', 'season', 'is_published']
+    inlines = [TipTranslationInline]
+
+
+@admin.register(TipBundle)
+class TipBundleAdmin(admin.ModelAdmin):
+    list_display = ['language', 'category', 'season', 'tip_count', 'etag', 'built_at']
+    list_filter = ['language', 'category', 'season']
+    exclude = ['body']
+
+    # Built by farming_tips.bundles only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
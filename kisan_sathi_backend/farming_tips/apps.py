@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FarmingTipsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'farming_tips'
+
+    def ready(self):
+        from . import signals  # noqa: F401
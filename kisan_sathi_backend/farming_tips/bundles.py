@@ -0,0 +1,147 @@
+"""
+Pre-rendered farming-tips bundles.
+
+The tips page only ever asks for "published tips in language L, category
+C, season S", and there are few enough combinations to render them all
+ahead of time. ``build_bundles`` renders each combination to JSON, hashes
+it for the ETag and stores it gzip-compressed in ``TipBundle``; bundles
+whose content did not change are left alone. Editing a tip rebuilds only
+the bundles it can appear in (see ``affected_keys``).
+
+``get_bundle`` serves from a per-process copy of every bundle, reloaded
+when the tips version counter changes, so a request costs a dict lookup
+and no query or serialization.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from itertools import product
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from stats.counters import current, increment
+
+from .models import LANGUAGES, Tip, TipBundle
+
+
+TIPS_VERSION = 'farming_tips.version'
+ALL = 'all'
+LANGUAGE_CODES = [code for code, _ in LANGUAGES]
+CATEGORY_FILTERS = [ALL] + [code for code, _ in Tip.CATEGORIES]
+SEASON_FILTERS = [code for code, _ in Tip.SEASONS]
+DEFAULT_LANGUAGE = 'en'
+
+BundleKey = Tuple[str, str, str]
+
+
+def bundle_keys() -> Iterable[BundleKey]:
+    return product(LANGUAGE_CODES, CATEGORY_FILTERS, SEASON_FILTERS)
+
+
+def affected_keys(categories, seasons) -> Iterable[BundleKey]:
+    """Bundles that can contain a tip in any of ``categories`` and ``seasons``."""
+    category_filters = {ALL, *categories}
+    # An all-season tip is listed under every season filter
+    season_filters = SEASON_FILTERS if ALL in seasons else {ALL, *seasons}
+    return product(LANGUAGE_CODES, category_filters, season_filters)
+
+
+def _matches(tip, category, season):
+    return (category == ALL or tip.category == category) and (season == ALL or tip.season in (season, ALL))
+
+
+def tip_entry(tip, language) -> Optional[dict]:
+    """A tip as served to clients, in ``language`` or English; None without either translation."""
+    texts = {t.language: t for t in tip.translations.all()}
+    text = texts.get(language) or texts.get(DEFAULT_LANGUAGE)
+    if text is None:
+        return None
+    return {
+        'id': tip.pk,
+        'title': text.title,
+        'description': text.description,
+        'category': tip.category,
+        'season': tip.season,
+        'icon': tip.icon,
+        'difficulty': tip.difficulty,
+        'crops': tip.crops,
+        'districts': tip.districts,
+    }
+
+
+def _render(tips, language, category, season) -> Tuple[bytes, int]:
+    entries = [
+        entry for entry in (tip_entry(tip, language) for tip in tips if _matches(tip, category, season))
+        if entry is not None
+    ]
+    payload = {'language': language, 'category': category, 'season': season, 'tips': entries}
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode(), len(entries)
+
+
+def build_bundles(keys: Optional[Iterable[BundleKey]] = None) -> int:
+    """Re-render ``keys`` (default: every bundle); returns how many bundles changed."""
+    tips = list(Tip.objects.filter(is_published=True).prefetch_related('translations').order_by('id'))
+    etags = {
+        (language, category, season): etag
+        for language, category, season, etag in TipBundle.objects.values_list('language', 'category', 'season', 'etag')
+    }
+    written = 0
+    for key in set(keys if keys is not None else bundle_keys()):
+        raw, count = _render(tips, *key)
+        etag = hashlib.sha1(raw).hexdigest()
+        if etags.get(key) == etag:
+            continue
+        language, category, season = key
+        TipBundle.objects.update_or_create(language=language, category=category, season=season, defaults={
+            'etag': etag,
+            # mtime=0 keeps the compressed bytes a pure function of the content
+            'body': gzip.compress(raw, compresslevel=9, mtime=0),
+            'tip_count': count,
+        })
+        written += 1
+    if written:
+        increment(TIPS_VERSION)
+    return written
+
+
+class Bundle:
+    __slots__ = ('etag', 'gzipped', '_plain')
+
+    def __init__(self, etag, gzipped):
+        self.etag = etag
+        self.gzipped = gzipped
+        self._plain = None
+
+    @property
+    def plain(self) -> bytes:
+        # Only for the rare client that does not accept gzip
+        if self._plain is None:
+            self._plain = gzip.decompress(self.gzipped)
+        return self._plain
+
+
+_bundles: Dict[BundleKey, Bundle] = {}
+_version = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_bundle(language, category, season) -> Optional[Bundle]:
+    """This process's copy of one bundle, reloaded when the tips version changes."""
+    global _bundles, _version, _checked_at
+    now = time.monotonic()
+    if _version is None or now - _checked_at >= settings.TIPS_CHECK_SECONDS:
+        with _lock:
+            version = current(TIPS_VERSION)
+            if version != _version:
+                _bundles = {
+                    (language_, category_, season_): Bundle(etag, bytes(body))
+                    for language_, category_, season_, etag, body in TipBundle.objects.values_list(
+                        'language', 'category', 'season', 'etag', 'body')
+                }
+                _version = version
+            _checked_at = now
+    return _bundles.get((language, category, season))
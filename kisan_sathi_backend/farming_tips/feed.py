@@ -0,0 +1,175 @@
+"""
+Personalized tips feed.
+
+``FeedIndex`` turns every published tip into a row of tag weights once
+(crops, districts, season and whether it is restricted to some
+districts). A farmer becomes a profile vector over the same tags, so
+scoring every tip is one matrix-vector product followed by a top-k
+``argpartition``:
+
+- each crop the farmer grows that a tip is tagged with: +CROP_WEIGHT
+- the farmer's district, for a tip tagged with it: +DISTRICT_WEIGHT;
+  a tip restricted to other districts: -DISTRICT_WEIGHT
+- a tip for the current season: +SEASON_WEIGHT; for any season:
+  +ALL_SEASON_WEIGHT; for another season: -SEASON_WEIGHT
+
+Ties go to the newest tip. Crops and districts no tip is tagged with
+cannot change a score, so they are dropped from the profile before it is
+bucketed; farmers whose (crops, district, season, language) bucket is the
+same share one cached feed, keyed by the index version so it is
+recomputed only after tips change.
+"""
+import hashlib
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from stats.counters import current
+
+from .bundles import DEFAULT_LANGUAGE, LANGUAGE_CODES, TIPS_VERSION, tip_entry
+from .models import Tip
+
+
+CROP_WEIGHT = 3.0
+DISTRICT_WEIGHT = 2.0
+SEASON_WEIGHT = 2.0
+ALL_SEASON_WEIGHT = 0.5
+RESTRICTED = 'restricted'
+
+# Karnataka's seasons by month
+SEASON_BY_MONTH = {
+    1: 'winter', 2: 'winter', 3: 'summer', 4: 'summer', 5: 'summer', 6: 'monsoon',
+    7: 'monsoon', 8: 'monsoon', 9: 'monsoon', 10: 'winter', 11: 'winter', 12: 'winter',
+}
+
+
+def season_for(day: date) -> str:
+    return SEASON_BY_MONTH[day.month]
+
+
+class FeedIndex:
+    def __init__(self, tips, version=None):
+        self.version = version
+        tips = list(tips)
+        self.ids = np.array([tip.pk for tip in tips], dtype=np.int64)
+        self.entries: Dict[str, List[Optional[dict]]] = {
+            language: [tip_entry(tip, language) for tip in tips] for language in LANGUAGE_CODES
+        }
+        # Rows with no text in a language (or English) are never served in it
+        self.untranslated = {
+            language: np.array([row for row, entry in enumerate(entries) if entry is None], dtype=np.int64)
+            for language, entries in self.entries.items()
+        }
+        self.tags: Dict[str, int] = {}
+        for tip in tips:
+            for tag in self._tip_tags(tip):
+                self.tags.setdefault(tag, len(self.tags))
+        self.crops = frozenset(tag[len('crop:'):] for tag in self.tags if tag.startswith('crop:'))
+
+        self.matrix = np.zeros((len(tips), len(self.tags)), dtype=np.float32)
+        for row, tip in enumerate(tips):
+            self.matrix[row, [self.tags[tag] for tag in self._tip_tags(tip)]] = 1.0
+        # Newest first among equal scores; well below the smallest weight step
+        order = np.argsort(np.argsort(self.ids)).astype(np.float32)
+        self.recency = order / max(len(tips), 1) * 1e-3
+
+    @staticmethod
+    def _tip_tags(tip):
+        tags = [f'crop:{crop}' for crop in tip.crops] + [f'district:{d}' for d in tip.districts]
+        if tip.districts:
+            tags.append(RESTRICTED)
+        tags.append(f'season:{tip.season}')
+        return tags
+
+    @classmethod
+    def load(cls, version=None):
+        tips = Tip.objects.filter(is_published=True).prefetch_related('translations').order_by('id')
+        return cls(tips, version)
+
+    def bucket(self, crops, district, season, language):
+        """The profile with everything that cannot affect ranking removed."""
+        crops = tuple(sorted({c.strip().lower() for c in crops or ()} & self.crops))
+        district = (district or '').strip().lower()
+        if f'district:{district}' not in self.tags:
+            district = ''
+        language = language if language in LANGUAGE_CODES else DEFAULT_LANGUAGE
+        return crops, district, season, language
+
+    def _profile(self, crops, district, season):
+        vector = np.zeros(len(self.tags), dtype=np.float32)
+
+        def weight(tag, value):
+            column = self.tags.get(tag)
+            if column is not None:
+                vector[column] += value
+
+        for crop in crops:
+            weight(f'crop:{crop}', CROP_WEIGHT)
+        weight(RESTRICTED, -DISTRICT_WEIGHT)
+        if district:
+            # Cancels the restriction penalty, then rewards the match
+            weight(f'district:{district}', 2 * DISTRICT_WEIGHT)
+        for code, _ in Tip.SEASONS:
+            if code == season:
+                weight(f'season:{code}', SEASON_WEIGHT)
+            elif code == 'all':
+                weight(f'season:{code}', ALL_SEASON_WEIGHT)
+            else:
+                weight(f'season:{code}', -SEASON_WEIGHT)
+        return vector
+
+    def top(self, crops, district, season, language, limit) -> List[int]:
+        """Ids of the ``limit`` best tips for a bucket, best first."""
+        if not len(self.ids):
+            return []
+        scores = self.matrix @ self._profile(crops, district, season) + self.recency
+        scores[self.untranslated[language]] = -np.inf
+        limit = min(limit, len(scores))
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best])]
+        return [int(self.ids[row]) for row in best if np.isfinite(scores[row])]
+
+    def render(self, ids, language):
+        rows = np.searchsorted(self.ids, ids)
+        entries = self.entries[language]
+        return [entries[row] for row in rows]
+
+
+_index: Optional[FeedIndex] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_feed_index() -> FeedIndex:
+    """Process-wide index, rebuilt when the tips version changes."""
+    global _index, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < settings.TIPS_CHECK_SECONDS:
+        return _index
+    with _lock:
+        version = current(TIPS_VERSION)
+        if _index is None or version != _index.version:
+            _index = FeedIndex.load(version)
+        _checked_at = now
+    return _index
+
+
+def feed_for(farmer, limit=20, today: Optional[date] = None, language=None):
+    """The farmer's top ``limit`` tips, shared with every farmer in the same bucket."""
+    index = get_feed_index()
+    season = season_for(today or date.today())
+    crops, district, season, language = index.bucket(
+        farmer.crops_grown, farmer.district, season, language or farmer.preferred_language,
+    )
+    digest = hashlib.sha1(f"{','.join(crops)}|{district}|{season}|{language}".encode()).hexdigest()
+    key = f"tips:feed:{index.version}:{limit}:{digest}"
+    ids = cache.get(key)
+    if ids is None:
+        ids = index.top(crops, district, season, language, limit)
+        cache.set(key, ids, settings.TIPS_FEED_CACHE_TTL)
+    return season, index.render(ids, language)
@@ -0,0 +1,14 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from farming_tips.bundles import build_bundles
+
+
+class Command(BaseCommand):
+    help = "Render every farming-tips bundle (unchanged bundles are left alone)"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = build_bundles()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} bundles in {time.monotonic() - started:.2f}s"))
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('soil', 'Soil'), ('irrigation', 'Irrigation'), ('farming', 'Farming'), ('seasonal', 'Seasonal'), ('pest-management', 'Pest management')], max_length=20)),
+                ('season', models.CharField(choices=[('all', 'All seasons'), ('monsoon', 'Monsoon'), ('summer', 'Summer'), ('winter', 'Winter')], default='all', max_length=10)),
+                ('icon', models.CharField(blank=True, max_length=20)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='easy', max_length=10)),
+                ('is_published', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'farming_tips',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipBundle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('en', 'English'), ('kn', 'Kannada')], max_length=2)),
+                ('category', models.CharField(max_length=20)),
+                ('season', models.CharField(max_length=10)),
+                ('etag', models.CharField(max_length=40)),
+                ('body', models.BinaryField()),
+                ('tip_count', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'farming_tip_bundles',
+            },
+        ),
+        migrations.CreateModel(
+            name='TipTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('en', 'English'), ('kn', 'Kannada')], max_length=2)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('tip', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='farming_tips.tip')),
+            ],
+            options={
+                'db_table': 'farming_tip_translations',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='tipbundle',
+            constraint=models.UniqueConstraint(fields=('language', 'category', 'season'), name='farming_tip_bundle_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='tiptranslation',
+            constraint=models.UniqueConstraint(fields=('tip', 'language'), name='farming_tip_one_translation_per_language'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('farming_tips', '0001_tips_and_bundles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tip',
+            name='crops',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='tip',
+            name='districts',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
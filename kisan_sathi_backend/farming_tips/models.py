@@ -1,3 +1,84 @@
 from django.db import models
 
-# Create your models here.
+
+LANGUAGES = [('en', 'English'), ('kn', 'Kannada')]
+
+
+class Tip(models.Model):
+    CATEGORIES = [
+        ('soil', 'Soil'),
+        ('irrigation', 'Irrigation'),
+        ('farming', 'Farming'),
+        ('seasonal', 'Seasonal'),
+        ('pest-management', 'Pest management'),
+    ]
+    # "all" tips show under every season filter
+    SEASONS = [('all', 'All seasons'), ('monsoon', 'Monsoon'), ('summer', 'Summer'), ('winter', 'Winter')]
+    DIFFICULTIES = [('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')]
+
+    category = models.CharField(max_length=20, choices=CATEGORIES)
+    season = models.CharField(max_length=10, choices=SEASONS, default='all')
+    icon = models.CharField(max_length=20, blank=True)
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTIES, default='easy')
+    # Lowercased tags used to rank the personalized feed; empty means relevant everywhere
+    crops = models.JSONField(default=list, blank=True)
+    districts = models.JSONField(default=list, blank=True)
+    is_published = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'farming_tips'
+
+    def save(self, *args, **kwargs):
+        self.crops = sorted({c.strip().lower() for c in self.crops if c.strip()})
+        self.districts = sorted({d.strip().lower() for d in self.districts if d.strip()})
+        super().save(*args, **kwargs)
+
+    def __str__(self) -> str:
+        translation = self.translations.filter(language='en').first()
+        return translation.title if translation else f"Tip {self.pk}"
+
+
+class TipTranslation(models.Model):
+    """Tip text in one language; bundles fall back to English when a translation is missing."""
+
+    tip = models.ForeignKey(Tip, related_name='translations', on_delete=models.CASCADE)
+    language = models.CharField(max_length=2, choices=LANGUAGES)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+
+    class Meta:
+        db_table = 'farming_tip_translations'
+        constraints = [
+            models.UniqueConstraint(fields=['tip', 'language'], name='farming_tip_one_translation_per_language'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.title} ({self.language})"
+
+
+class TipBundle(models.Model):
+    """
+    Pre-rendered, gzip-compressed JSON of the published tips for one
+    (language, category, season) filter; built by farming_tips.bundles.
+    """
+
+    language = models.CharField(max_length=2, choices=LANGUAGES)
+    # "all" when unfiltered
+    category = models.CharField(max_length=20)
+    season = models.CharField(max_length=10)
+    # Hash of the uncompressed JSON
+    etag = models.CharField(max_length=40)
+    body = models.BinaryField()
+    tip_count = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'farming_tip_bundles'
+        constraints = [
+            models.UniqueConstraint(fields=['language', 'category', 'season'], name='farming_tip_bundle_unique'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.language}/{self.category}/{self.season}"
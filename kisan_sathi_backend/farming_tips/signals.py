@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .bundles import affected_keys, build_bundles
+from .models import Tip, TipTranslation
+
+
+def _rebuild(categories, seasons):
+    keys = list(affected_keys(categories, seasons))
+    transaction.on_commit(lambda: build_bundles(keys))
+
+
+@receiver(pre_save, sender=Tip)
+def remember_placement(sender, instance, raw=False, **kwargs):
+    # Bundles the tip is leaving need rebuilding too
+    instance._previous_placement = (
+        Tip.objects.filter(pk=instance.pk).values_list('category', 'season').first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Tip)
+@receiver(post_delete, sender=Tip)
+def rebuild_tip_bundles(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    categories, seasons = {instance.category}, {instance.season}
+    previous = getattr(instance, '_previous_placement', None)
+    if previous:
+        categories.add(previous[0])
+        seasons.add(previous[1])
+    _rebuild(categories, seasons)
+
+
+@receiver(post_save, sender=TipTranslation)
+@receiver(post_delete, sender=TipTranslation)
+def rebuild_translation_bundles(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    tip = Tip.objects.filter(pk=instance.tip_id).values_list('category', 'season').first()
+    if tip:
+        _rebuild({tip[0]}, {tip[1]})
@@ -1,3 +1,181 @@
-from django.test import TestCase
+import gzip
+import json
+from datetime import date
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from stats.counters import current
+
+from . import bundles, feed, signals
+from .feed import FeedIndex, feed_for
+from .models import Tip, TipBundle, TipTranslation
+
+
+def make_tip(title, kn_title=None, english=True, **fields):
+    tip = Tip.objects.create(**{'category': 'farming', **fields})
+    if english:
+        TipTranslation.objects.create(tip=tip, language='en', title=title, description=f"{title}.")
+    if kn_title:
+        TipTranslation.objects.create(tip=tip, language='kn', title=kn_title, description=f"{kn_title}.")
+    return tip
+
+
+def farmer(crops=(), district='', language='en'):
+    return SimpleNamespace(crops_grown=list(crops), district=district, preferred_language=language)
+
+
+MONSOON = date(2026, 7, 1)
+
+
+class TipsEncodingTests(TestCase):
+    def setUp(self):
+        bundles._version = None
+        bundles.build_bundles()
+
+    def tearDown(self):
+        bundles._version = None
+
+    def get(self, accept_encoding):
+        return self.client.get('/api/tips/', HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    def test_gzip_is_sent_when_accepted(self):
+        for header in ('gzip', 'br, gzip;q=0.5', 'identity, *'):
+            with self.subTest(header=header):
+                response = self.get(header)
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertTrue(gzip.decompress(response.content).startswith(b'{'))
+
+    def test_gzip_is_not_sent_when_refused(self):
+        for header in ('gzip;q=0', 'identity', 'gzip;q=0, *', 'gzip;q=0.0, identity;q=1'):
+            with self.subTest(header=header):
+                response = self.get(header)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertTrue(response.content.startswith(b'{'))
+
+
+class BundleTests(TestCase):
+    def setUp(self):
+        bundles._version = None
+        self.addCleanup(setattr, bundles, '_version', None)
+
+    def bundle_json(self, language, category, season):
+        return json.loads(gzip.decompress(TipBundle.objects.get(
+            language=language, category=category, season=season).body))
+
+    def test_every_filter_combination_is_built_once(self):
+        make_tip("Crop rotation", kn_title="ಬೆಳೆ ಸರದಿ", category='soil')
+        self.assertEqual(bundles.build_bundles(), len(list(bundles.bundle_keys())))
+        version = current(bundles.TIPS_VERSION)
+        self.assertEqual(bundles.build_bundles(), 0)
+        # Nothing changed, so processes keep their copies
+        self.assertEqual(current(bundles.TIPS_VERSION), version)
+        self.assertEqual(self.bundle_json('kn', 'soil', 'monsoon')['tips'][0]['title'], "ಬೆಳೆ ಸರದಿ")
+        self.assertEqual(self.bundle_json('en', 'irrigation', 'all')['tips'], [])
+
+    def test_affected_keys_cover_every_bundle_a_tip_can_appear_in(self):
+        self.assertEqual(
+            set(bundles.affected_keys({'soil'}, {'monsoon'})),
+            {(language, category, season) for language in ('en', 'kn')
+             for category in ('all', 'soil') for season in ('all', 'monsoon')},
+        )
+        # An all-season tip is listed under every season filter
+        self.assertEqual(
+            {season for _, _, season in bundles.affected_keys({'soil'}, {'all'})}, set(bundles.SEASON_FILTERS),
+        )
+
+    def test_an_edit_rebuilds_only_the_bundles_the_tip_leaves_and_joins(self):
+        tip = make_tip("Drip lines", category='irrigation', season='summer')
+        bundles.build_bundles()
+        with mock.patch.object(signals, 'build_bundles', wraps=bundles.build_bundles) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                tip.category = 'soil'
+                tip.save()
+        keys = set(build.call_args.args[0])
+        self.assertEqual(keys, set(bundles.affected_keys({'irrigation', 'soil'}, {'summer'})))
+        self.assertEqual(self.bundle_json('en', 'irrigation', 'summer')['tips'], [])
+        self.assertEqual(self.bundle_json('en', 'soil', 'summer')['tips'][0]['title'], "Drip lines")
+
+    def test_a_translation_edit_is_served_after_the_version_changes(self):
+        tip = make_tip("Drip lines", category='irrigation')
+        bundles.build_bundles()
+        self.assertIn(b"Drip lines", bundles.get_bundle('en', 'all', 'all').plain)
+        with self.captureOnCommitCallbacks(execute=True):
+            tip.translations.filter(language='en').update(title="Drip irrigation")
+            TipTranslation.objects.get(tip=tip, language='en').save()
+        with override_settings(TIPS_CHECK_SECONDS=0):
+            self.assertIn(b"Drip irrigation", bundles.get_bundle('en', 'all', 'all').plain)
+
+
+@override_settings(TIPS_CHECK_SECONDS=0)
+class FeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        feed._index = None
+        self.addCleanup(setattr, feed, '_index', None)
+
+    def titles(self, who, today=MONSOON, **kwargs):
+        season, tips = feed_for(who, today=today, **kwargs)
+        return [tip['title'] for tip in tips]
+
+    def test_crops_the_farmer_grows_come_first(self):
+        make_tip("Tomato staking", crops=['Tomato'])
+        make_tip("Mulching")
+        self.assertEqual(self.titles(farmer(crops=['tomato'])), ["Tomato staking", "Mulching"])
+        # Equal scores: newest first
+        self.assertEqual(self.titles(farmer(crops=['ragi'])), ["Mulching", "Tomato staking"])
+
+    def test_tips_for_other_districts_sink(self):
+        make_tip("Mandya canals", districts=['Mandya'])
+        make_tip("Mysuru tanks", districts=['Mysuru'])
+        make_tip("Everywhere")
+        self.assertEqual(self.titles(farmer(district='Mandya ')), ["Mandya canals", "Everywhere", "Mysuru tanks"])
+        self.assertEqual(self.titles(farmer(district='Kolar')), ["Everywhere", "Mysuru tanks", "Mandya canals"])
+
+    def test_the_current_season_beats_all_seasons_beats_another_season(self):
+        make_tip("Monsoon drainage", season='monsoon')
+        make_tip("Summer shade", season='summer')
+        make_tip("Soil testing", season='all')
+        self.assertEqual(self.titles(farmer()), ["Monsoon drainage", "Soil testing", "Summer shade"])
+        self.assertEqual(
+            self.titles(farmer(), today=date(2026, 4, 1)), ["Summer shade", "Soil testing", "Monsoon drainage"],
+        )
+
+    def test_tips_without_text_in_the_language_or_english_are_left_out(self):
+        make_tip("Crop rotation", kn_title="ಬೆಳೆ ಸರದಿ")
+        make_tip(None, kn_title="ಕನ್ನಡ ಮಾತ್ರ", english=False)
+        make_tip("English only")
+        self.assertEqual(self.titles(farmer(language='en')), ["English only", "Crop rotation"])
+        self.assertEqual(self.titles(farmer(language='kn')), ["English only", "ಕನ್ನಡ ಮಾತ್ರ", "ಬೆಳೆ ಸರದಿ"])
+
+    def test_the_limit_is_applied_after_ranking(self):
+        make_tip("Tomato staking", crops=['tomato'])
+        for n in range(3):
+            make_tip(f"General {n}")
+        self.assertEqual(self.titles(farmer(crops=['tomato']), limit=2), ["Tomato staking", "General 2"])
+
+    def test_farmers_who_rank_tips_alike_share_a_bucket(self):
+        make_tip("Tomato staking", crops=['tomato'], districts=['mandya'])
+        index = FeedIndex.load()
+        # No tip is tagged with ragi or Kolar, so they cannot change the ranking
+        self.assertEqual(
+            index.bucket(['Tomato', 'ragi'], 'Kolar', 'monsoon', 'xx'),
+            index.bucket(['tomato'], '', 'monsoon', 'en'),
+        )
+        self.titles(farmer(crops=['tomato', 'ragi'], district='Kolar'))
+        with mock.patch.object(FeedIndex, 'top') as top:
+            self.assertEqual(self.titles(farmer(crops=['Tomato'], district='Hassan')), ["Tomato staking"])
+        top.assert_not_called()
+
+    def test_a_tip_edit_moves_buckets_to_the_new_ranking(self):
+        make_tip("Mulching")
+        with self.captureOnCommitCallbacks(execute=True):
+            make_tip("Staking")
+        self.assertEqual(self.titles(farmer(crops=['tomato'])), ["Staking", "Mulching"])
+        with self.captureOnCommitCallbacks(execute=True):
+            tip = Tip.objects.get(translations__title="Mulching")
+            tip.crops = ['tomato']
+            tip.save()
+        self.assertEqual(self.titles(farmer(crops=['tomato'])), ["Mulching", "Staking"])
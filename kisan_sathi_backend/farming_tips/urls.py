@@ -1,7 +1,10 @@
 from django.urls import path
+from .views import TipFeedView, bundle, tips
 
 app_name = 'farming_tips'
 
-urlpatterns = []
-
-
+urlpatterns = [
+    path('', tips, name='tips'),
+    path('feed/', TipFeedView.as_view(), name='feed'),
+    path('bundles/<str:language>/<str:category>/<str:season>/<str:etag>.json', bundle, name='bundle'),
+]
@@ -1,3 +1,74 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from kisan_sathi.compression import accepted_encodings
+
+from .bundles import ALL, CATEGORY_FILTERS, DEFAULT_LANGUAGE, LANGUAGE_CODES, SEASON_FILTERS, get_bundle
+from .feed import feed_for
+
+
+MAX_FEED_SIZE = 50
+
+
+def _serve(request, bundle, cache_control):
+    etag = f'"{bundle.etag}"'
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponse(status=304)
+    elif 'gzip' in accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        response = HttpResponse(bundle.gzipped, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(bundle.plain, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+@require_GET
+def tips(request):
+    """
+    Published tips for ``language``, ``category`` and ``season`` (each
+    defaulting to all), served from a pre-built bundle. ``Content-Location``
+    points at the bundle's content-addressed URL, which never changes and
+    can be cached indefinitely.
+    """
+    params = request.GET
+    language = params.get('language', DEFAULT_LANGUAGE)
+    category = params.get('category', ALL)
+    season = params.get('season', ALL)
+    if language not in LANGUAGE_CODES or category not in CATEGORY_FILTERS or season not in SEASON_FILTERS:
+        return JsonResponse({'success': False, 'message': 'Invalid language, category or season'}, status=400)
+
+    bundle = get_bundle(language, category, season)
+    if bundle is None:
+        return JsonResponse({'success': False, 'message': 'Tips are not available yet'}, status=503)
+    response = _serve(request, bundle, f'public, max-age={settings.TIPS_BUNDLE_MAX_AGE}')
+    response['Content-Location'] = reverse('farming_tips:bundle', args=[language, category, season, bundle.etag])
+    return response
+
+
+@require_GET
+def bundle(request, language, category, season, etag):
+    current = get_bundle(language, category, season)
+    if current is None or current.etag != etag:
+        raise Http404("Bundle has been rebuilt")
+    return _serve(request, current, 'public, max-age=31536000, immutable')
+
+
+class TipFeedView(APIView):
+    """The signed-in farmer's tips, ranked by their crops, district and the current season."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), MAX_FEED_SIZE))
+        except ValueError:
+            limit = 20
+        season, tips = feed_for(request.user, limit, language=request.query_params.get('language'))
+        return Response({'success': True, 'season': season, 'data': tips})
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kisan_sathi.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from live.asgi import StreamDisconnectMiddleware  # noqa: E402  (needs settings configured)
+
+# Live event streams (/api/live/) and streamed chatbot answers need the ASGI
+# server; the WSGI app answers them with 501
+application = StreamDisconnectMiddleware(
+    django_application, prefixes=('/api/live/', '/api/chatbot/stream/'), send_timeout=settings.STREAM_SEND_TIMEOUT,
+)
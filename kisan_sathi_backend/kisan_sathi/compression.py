@@ -0,0 +1,82 @@
+"""
+Response compression negotiated through ``Accept-Encoding``.
+
+Brotli when the client accepts it and the ``brotli`` package is installed,
+else gzip. Only textual responses of at least ``COMPRESSION_MIN_BYTES`` are
+compressed: below that the saving does not pay for the CPU, and images and
+PDFs are already compressed. Streaming responses (server-sent events) and
+responses that are already encoded, like the pre-gzipped tips bundles,
+pass through untouched.
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'image/svg+xml')
+
+
+def accepted_encodings(header):
+    """
+    Encodings the client accepts with a non-zero quality (``Accept-Encoding:
+    br;q=0`` refuses br). ``*`` stands for gzip and br unless they are listed.
+    """
+    qualities = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name.strip().lower()] = quality
+    accepted = {name for name, quality in qualities.items() if quality > 0 and name != '*'}
+    if qualities.get('*', 0) > 0:
+        accepted |= {name for name in ('gzip', 'br') if name not in qualities}
+    return accepted
+
+
+def compress(content: bytes, accepted) -> tuple:
+    """``(encoding, body)`` for the best encoding in ``accepted``, or ``(None, content)``."""
+    if brotli is not None and 'br' in accepted:
+        return 'br', brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    if 'gzip' in accepted:
+        return 'gzip', gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+    return None, content
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or response.has_header('Content-Encoding')
+                or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)):
+            return response
+        # Whether or not this one is compressed, the same URL may be for another client
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.COMPRESSION_MIN_BYTES:
+            return response
+
+        encoding, body = compress(response.content, accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        if encoding is None or len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # The compressed bytes differ from the original; keep the validator but mark it weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,54 @@
+"""
+Conditional GET for DRF views.
+
+``@conditional(validators)`` on an APIView handler answers
+``If-None-Match`` / ``If-Modified-Since`` with 304 Not Modified before the
+handler runs, so an unchanged resource costs neither serialization nor the
+response body. ``validators(view, request, *args, **kwargs)`` returns
+``(etag, last_modified)`` and must be cheap: build them from an
+``updated_at`` column, a version counter or a cache entry, never by
+rendering the response. It returns None (or Nones) when it cannot tell, e.g.
+the object does not exist, and the handler then runs as usual.
+
+Authentication and permissions have already run when the handler is
+called, so a 304 is only ever sent to a client allowed to see the body.
+Responses carry ``Cache-Control: private, no-cache``: clients may keep the
+body but revalidate it on every use.
+"""
+from datetime import datetime
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def _http_validators(validators, view, request, args, kwargs):
+    tag, modified = validators(view, request, *args, **kwargs) or (None, None)
+    return (
+        quote_etag(tag) if tag else None,
+        int(modified.timestamp()) if isinstance(modified, datetime) else None,
+    )
+
+
+def conditional(validators):
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            tag, modified = _http_validators(validators, view, request, args, kwargs)
+            response = None
+            if tag or modified:
+                response = get_conditional_response(request, etag=tag, last_modified=modified)
+            if response is None:
+                response = handler(view, request, *args, **kwargs)
+                if response.status_code == 200 and not (tag or modified):
+                    # Nothing to validate against until the handler ran (e.g. it filled a cache)
+                    tag, modified = _http_validators(validators, view, request, args, kwargs)
+            if response.status_code in (200, 304):
+                if tag and not response.has_header('ETag'):
+                    response['ETag'] = tag
+                if modified and not response.has_header('Last-Modified'):
+                    response['Last-Modified'] = http_date(modified)
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
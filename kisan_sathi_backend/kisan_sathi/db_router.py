@@ -0,0 +1,83 @@
+"""
+Primary/replica database routing.
+
+Writes and migrations always go to ``default``. Reads go to a replica only
+inside views that opt in with ``ReplicaReadMixin`` and only for safe
+methods, and a user who has just written is pinned to the primary for
+``REPLICA_PIN_SECONDS`` so they always read their own writes.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+
+_use_replica: ContextVar[bool] = ContextVar('use_replica', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != 'default']
+
+
+def _pin_key(user_id):
+    return f"db:pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    cache.set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """APIView mixin routing safe-method ORM reads to a replica unless the user is pinned."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request.user):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaPinMiddleware:
+    """Pin users to the primary after any successful write request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and user is not None and user.is_authenticated and replica_aliases()):
+            pin_to_primary(user.pk)
+        return response
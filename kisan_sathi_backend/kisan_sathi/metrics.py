@@ -0,0 +1,347 @@
+"""
+In-process request metrics, exported in the Prometheus text format.
+
+``MetricsMiddleware`` times every request and attributes to its route
+(``api/marketplace/listings/<int:pk>/``, not the concrete path, so the
+label set stays small):
+
+- latency, as a histogram, and responses by status
+- database queries and the time spent in them, on every connection
+- cache hits and misses on the Django caches (their backends are the
+  instrumented subclasses below)
+- time spent calling upstream services and running model inference,
+  recorded by wrapping those calls in ``timer(UPSTREAM, ...)`` or
+  ``timer(INFERENCE, ...)``
+
+Each update is a few dict lookups and additions under one lock; nothing is
+written anywhere until ``/metrics`` is scraped. Every process keeps its
+own aggregates, so scrape each worker (or sum them in Prometheus).
+
+With ``METRICS_PROFILE_RATE`` above zero, that fraction of requests also
+runs under a profiler (cProfile, or pyinstrument when
+``METRICS_PROFILER = 'pyinstrument'`` and it is installed) and those
+slower than ``METRICS_PROFILE_SLOW_SECONDS`` leave a trace in
+``METRICS_PROFILE_DIR``.
+"""
+import bisect
+import cProfile
+import hmac
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+from django.http import HttpResponse
+
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM = 'upstream'
+INFERENCE = 'inference'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requests outside any route (404s) and work outside any request
+UNMATCHED = '<unmatched>'
+BACKGROUND = '<background>'
+
+
+class Histogram:
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+
+
+class RequestStats:
+    """What one request spent, filled in while it runs."""
+    __slots__ = ('db_queries', 'db_seconds', 'cache_hits', 'cache_misses', 'upstream_seconds', 'inference_seconds')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.upstream_seconds = 0.0
+        self.inference_seconds = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, str, int], int] = {}
+        # Per route: queries, query seconds, cache hits, cache misses, upstream seconds, inference seconds
+        self.totals: Dict[str, list] = {}
+        # Per (kind, name), e.g. (UPSTREAM, 'openweather')
+        self.calls: Dict[Tuple[str, str], Histogram] = {}
+
+    def _totals(self, route):
+        totals = self.totals.get(route)
+        if totals is None:
+            totals = self.totals[route] = [0, 0.0, 0, 0, 0.0, 0.0]
+        return totals
+
+    def record_request(self, route, method, status, seconds, stats: RequestStats):
+        with self.lock:
+            histogram = self.latency.get((route, method))
+            if histogram is None:
+                histogram = self.latency[(route, method)] = Histogram()
+            histogram.observe(seconds)
+            key = (route, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            totals = self._totals(route)
+            totals[0] += stats.db_queries
+            totals[1] += stats.db_seconds
+            totals[2] += stats.cache_hits
+            totals[3] += stats.cache_misses
+            totals[4] += stats.upstream_seconds
+            totals[5] += stats.inference_seconds
+
+    def record_call(self, kind, name, seconds):
+        with self.lock:
+            histogram = self.calls.get((kind, name))
+            if histogram is None:
+                histogram = self.calls[(kind, name)] = Histogram()
+            histogram.observe(seconds)
+
+    def record_background_cache(self, hit):
+        with self.lock:
+            self._totals(BACKGROUND)[2 if hit else 3] += 1
+
+    def clear(self):
+        with self.lock:
+            self.latency.clear()
+            self.responses.clear()
+            self.totals.clear()
+            self.calls.clear()
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, labels, value: Histogram):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, value.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += value.counts[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {value.sum:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {cumulative}')
+
+        with self.lock:
+            family('kisan_request_duration_seconds', 'histogram', "Request latency by route and method.")
+            for (route, method), value in sorted(self.latency.items()):
+                histogram('kisan_request_duration_seconds', f'route="{_escape(route)}",method="{method}"', value)
+
+            family('kisan_responses_total', 'counter', "Responses by route, method and status code.")
+            for (route, method, status), count in sorted(self.responses.items()):
+                lines.append(f'kisan_responses_total{{route="{_escape(route)}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            per_route = [
+                ('kisan_db_queries_total', "Database queries run by requests to the route.", 0, '{}'),
+                ('kisan_db_query_seconds_total', "Time spent in database queries.", 1, '{:.6f}'),
+                ('kisan_cache_hits_total', "Django cache reads that found a value.", 2, '{}'),
+                ('kisan_cache_misses_total', "Django cache reads that found nothing.", 3, '{}'),
+                ('kisan_upstream_seconds_total', "Time spent waiting on upstream services.", 4, '{:.6f}'),
+                ('kisan_inference_seconds_total', "Time spent in model inference.", 5, '{:.6f}'),
+            ]
+            for name, help_text, column, fmt in per_route:
+                family(name, 'counter', help_text)
+                for route, totals in sorted(self.totals.items()):
+                    lines.append(f'{name}{{route="{_escape(route)}"}} {fmt.format(totals[column])}')
+
+            family('kisan_call_duration_seconds', 'histogram', "Duration of upstream calls and model inference.")
+            for (kind, name), value in sorted(self.calls.items()):
+                histogram('kisan_call_duration_seconds', f'kind="{kind}",name="{_escape(name)}"', value)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+_current: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+
+@contextmanager
+def timer(kind, name):
+    """Time an upstream call (``UPSTREAM``) or model inference (``INFERENCE``) under ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        registry.record_call(kind, name, seconds)
+        stats = _current.get()
+        if stats is not None:
+            if kind == UPSTREAM:
+                stats.upstream_seconds += seconds
+            else:
+                stats.inference_seconds += seconds
+
+
+def _record_cache(hit):
+    stats = _current.get()
+    if stats is None:
+        registry.record_background_cache(hit)
+    elif hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+_MISSING = object()
+
+
+class _CacheMetricsMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        _record_cache(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super().get_many(keys, version)
+        for _ in values:
+            _record_cache(True)
+        for _ in range(len(keys) - len(values)):
+            _record_cache(False)
+        return values
+
+
+class InstrumentedLocMemCache(_CacheMetricsMixin, LocMemCache):
+    pass
+
+
+class InstrumentedRedisCache(_CacheMetricsMixin, RedisCache):
+    pass
+
+
+def _count_queries(stats):
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats.db_queries += 1
+            stats.db_seconds += time.perf_counter() - started
+    return wrapper
+
+
+class _Profile:
+    """One sampled request's profiler; ``save`` keeps the trace only if the request was slow."""
+
+    def __init__(self):
+        self.profiler = None
+        if settings.METRICS_PROFILER == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler  # type: ignore
+                self.profiler = Profiler()
+            except ImportError:
+                pass
+        self.sampling = self.profiler is not None
+        if not self.sampling:
+            self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        try:
+            if self.sampling:
+                self.profiler.start()
+            else:
+                self.profiler.enable()
+        except (ValueError, RuntimeError):
+            # Another profiler is already running on this thread
+            self.profiler = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is None:
+            return
+        if self.sampling:
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+
+    def save(self, route, method, seconds):
+        if self.profiler is None:
+            return
+        directory = Path(settings.METRICS_PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', f"{method} {route}").strip('-')
+        stem = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{int(seconds * 1000)}ms-{slug}"
+        if self.sampling:
+            Path(f"{stem}.html").write_text(self.profiler.output_html(), encoding='utf-8')
+        else:
+            self.profiler.dump_stats(f"{stem}.prof")
+
+
+class MetricsMiddleware:
+    """
+    Records latency, queries, cache reads, upstream and inference time per
+    route. A streamed response is timed up to its first byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        profile = _Profile() if random.random() < settings.METRICS_PROFILE_RATE else None
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_count_queries(stats)))
+                if profile is not None:
+                    stack.enter_context(profile)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        seconds = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None else UNMATCHED
+        registry.record_request(route, request.method, response.status_code, seconds, stats)
+        if profile is not None and seconds >= settings.METRICS_PROFILE_SLOW_SECONDS:
+            try:
+                profile.save(route, request.method, seconds)
+            except OSError:
+                logger.warning("Could not save profile of a slow %s %s", request.method, route, exc_info=True)
+        return response
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, for ``Authorization: Bearer <METRICS_TOKEN>``,
+    a signed-in staff user, or anyone while DEBUG is on.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    if not (settings.DEBUG or request.user.is_staff
+            or (token and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()))):
+        if request.user.is_authenticated:
+            return HttpResponse(status=403)
+        response = HttpResponse(status=401)
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
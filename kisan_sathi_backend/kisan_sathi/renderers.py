@@ -0,0 +1,64 @@
+"""
+orjson-backed JSON rendering and parsing for DRF.
+
+Output matches DRF's ``JSONRenderer`` for compact responses: datetimes,
+decimals, lazy strings and anything else orjson does not handle natively go
+through DRF's own encoder, and U+2028/U+2029 are escaped the same way.
+DRF's renderer takes over where orjson would differ: indented output
+(``Accept: application/json; indent=4``, the browsable API), floats written
+with an exponent (orjson writes ``1e16`` where Python writes ``1e+16``),
+NaN and infinity (orjson writes ``null``; DRF refuses them under
+``STRICT_JSON``) and integers beyond 64 bits (orjson refuses them).
+"""
+import math
+import re
+
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+_LINE_SEPARATOR = '\u2028'.encode()
+_PARAGRAPH_SEPARATOR = '\u2029'.encode()
+# A number with an exponent; a string that happens to look like one only costs a fallback
+_EXPONENT = re.compile(rb'(?:^|[:\[,])-?\d+(?:\.\d+)?e-?\d+(?=[,\]}]|$)')
+
+
+def _has_non_finite(data) -> bool:
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(_has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(value) for value in data)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _EXPONENT.search(ret) or (b'null' in ret and _has_non_finite(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+        if _LINE_SEPARATOR in ret or _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b'\\u2028').replace(_PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
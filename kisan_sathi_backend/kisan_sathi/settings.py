@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import Csv, config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -53,9 +55,15 @@ INSTALLED_APPS = [
     'crop_doctor.apps.CropDoctorConfig',
     'chatbot.apps.ChatbotConfig',
     'farming_tips.apps.FarmingTipsConfig',
+    'notifications.apps.NotificationsConfig',
+    'stats.apps.StatsConfig',
+    'live.apps.LiveConfig',
+    'loadtest.apps.LoadtestConfig',
 ]
 
 MIDDLEWARE = [
+    'kisan_sathi.metrics.MetricsMiddleware',
+    'kisan_sathi.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -64,6 +72,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'kisan_sathi.db_router.ReplicaPinMiddleware',
 ]
 
 ROOT_URLCONF = 'kisan_sathi.urls'
@@ -92,11 +101,61 @@ WSGI_APPLICATION = 'kisan_sathi.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': config('DB_ENGINE', default='django.db.backends.sqlite3'),
+        'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'USER': config('DB_USER', default=''),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default=''),
+        'PORT': config('DB_PORT', default=''),
+        # Persistent connections: seconds to keep a connection open (0 = per request)
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=False, cast=bool),
     }
 }
 
+# Read replicas: comma-separated hosts (PostgreSQL) or database files (SQLite),
+# sharing the primary's other settings
+DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+for _index, _replica in enumerate(DATABASE_REPLICAS, start=1):
+    _key = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+    DATABASES[f'replica{_index}'] = {**DATABASES['default'], _key: _replica, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['kisan_sathi.db_router.PrimaryReplicaRouter']
+
+# Seconds a user reads from the primary after writing
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+
+# Cache
+# Local memory by default; set REDIS_URL to share cache and OTP state across workers
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'kisan_sathi.metrics.InstrumentedRedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'kisan',
+        },
+        'otp': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'kisan-otp',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'kisan_sathi.metrics.InstrumentedLocMemCache',
+            'LOCATION': 'kisan-default',
+        },
+        'otp': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'kisan-otp',
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -141,10 +200,124 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # DRF / JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'farmers.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'kisan_sathi.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'kisan_sathi.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
 }
 
+# Response compression (see kisan_sathi/compression.py); brotli needs the
+# optional "brotli" package, otherwise clients get gzip
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Seconds an authenticated farmer is served from cache instead of the DB
+FARMER_AUTH_CACHE_TTL = config('FARMER_AUTH_CACHE_TTL', default=60, cast=int)
+
+# Largest sheet the admin upload endpoint imports within the request; bigger
+# ones go through `manage.py import_farmers`, which hashes in a process pool
+FARMER_IMPORT_MAX_ROWS = config('FARMER_IMPORT_MAX_ROWS', default=500, cast=int)
+
+# OTP (see farmers/otp.py)
+OTP_CACHE_ALIAS = 'otp'
+OTP_TTL = config('OTP_TTL', default=600, cast=int)
+OTP_MAX_ATTEMPTS = config('OTP_MAX_ATTEMPTS', default=5, cast=int)
+OTP_SEND_LIMIT = config('OTP_SEND_LIMIT', default=3, cast=int)
+OTP_SEND_WINDOW = config('OTP_SEND_WINDOW', default=900, cast=int)
+
+# Notifications (see notifications/outbox.py)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = 'noreply@kisansathi.com'
+SMS_BACKEND = config('SMS_BACKEND', default='notifications.backends.ConsoleSMSBackend')
+SMS_FILE_PATH = config('SMS_FILE_PATH', default=str(BASE_DIR / 'sms.log'))
+NOTIFICATION_BATCH_SIZE = config('NOTIFICATION_BATCH_SIZE', default=100, cast=int)
+NOTIFICATION_LEASE_SECONDS = 60
+NOTIFICATION_MAX_ATTEMPTS = config('NOTIFICATION_MAX_ATTEMPTS', default=6, cast=int)
+NOTIFICATION_RETRY_BASE_SECONDS = 30
+NOTIFICATION_RETRY_MAX_SECONDS = 3600
+
+# Admin dashboard counters (see stats/counters.py)
+STATS_CACHE_TTL = config('STATS_CACHE_TTL', default=30, cast=int)
+STATS_ACTIVE_DAYS = 30
+
+# OpenWeather (see weather/views.py); the base URL can point at a local stand-in
+OPENWEATHER_API_KEY = config('OPENWEATHER_API_KEY', default='')
+OPENWEATHER_BASE_URL = config('OPENWEATHER_BASE_URL', default='https://api.openweathermap.org/data/2.5')
+# Seconds a city's summary is served from cache (and revalidated with 304s) before refetching
+WEATHER_CACHE_TTL = config('WEATHER_CACHE_TTL', default=600, cast=int)
+
+# Nearest-mandi lookups (see mandi/spatial.py)
+MANDI_NEARBY_MAX_AGE_DAYS = 7
+MANDI_INDEX_CHECK_SECONDS = 30
+
+# Marketplace search (see marketplace/search.py): how often each process checks
+# for listing writes from other processes, how far back it re-reads, and how
+# long deleted listings are remembered (a process further behind rebuilds)
+MARKETPLACE_SEARCH_CHECK_SECONDS = 5
+MARKETPLACE_SEARCH_SYNC_SLACK = 30
+MARKETPLACE_SEARCH_TOMBSTONE_HOURS = 24
+
+# Seconds an unconfirmed marketplace order holds its stock (see marketplace/orders.py)
+MARKETPLACE_HOLD_SECONDS = config('MARKETPLACE_HOLD_SECONDS', default=600, cast=int)
+
+# Scheme eligibility (see schemes/matching.py): how often each process checks
+# for scheme edits, and how long a profile's matches stay cached
+SCHEMES_CHECK_SECONDS = 30
+SCHEMES_MATCH_CACHE_TTL = 3600
+
+# Farming-tips bundles (see farming_tips/bundles.py): how often each process
+# checks for rebuilt bundles, and how long clients may reuse one unrevalidated
+TIPS_CHECK_SECONDS = 30
+TIPS_BUNDLE_MAX_AGE = 300
+# Seconds a personalized feed (see farming_tips/feed.py) is shared by its profile bucket
+TIPS_FEED_CACHE_TTL = 3600
+
+# Chatbot knowledge index (see chatbot/index.py): where built indexes are
+# memory-mapped from, and how often each process checks for content changes
+CHATBOT_INDEX_DIR = config('CHATBOT_INDEX_DIR', default=str(BASE_DIR / 'chatbot_index'))
+CHATBOT_INDEX_CHECK_SECONDS = 30
+# Streamed answers (see chatbot/views.py): questions remembered per session and
+# for how long after the last one, streams each ASGI worker serves at once, and
+# the longest a stream may take before it is cut off
+CHATBOT_CONTEXT_TURNS = 4
+CHATBOT_SESSION_TTL = 1800
+CHATBOT_MAX_STREAMS = config('CHATBOT_MAX_STREAMS', default=200, cast=int)
+CHATBOT_STREAM_TIMEOUT = 30
+# Answers cached per process by normalized question (see chatbot/answer_cache.py),
+# and whether a miss may reuse the answer to a near-duplicate question
+CHATBOT_ANSWER_CACHE_SIZE = 10000
+CHATBOT_NEAR_DUPLICATES = config('CHATBOT_NEAR_DUPLICATES', default=False, cast=bool)
+CHATBOT_NEAR_DUPLICATE_THRESHOLD = 0.8
+
+# Live event streams (see live/layer.py). "memory" only reaches connections in
+# the publishing process; "redis" fans out across processes via REDIS_URL
+LIVE_CHANNEL_LAYER = config('LIVE_CHANNEL_LAYER', default='redis' if REDIS_URL else 'memory')
+LIVE_QUEUE_SIZE = 100
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_MAX_STREAM_SECONDS = 900
+# Lifetime of the query-string tickets that authenticate browser streams
+LIVE_TICKET_SECONDS = 60
+# Longest a live or chatbot stream waits for its client to take one write
+# before the response is ended (see live/asgi.py)
+STREAM_SEND_TIMEOUT = 10
+
+# Request metrics (see kisan_sathi/metrics.py). /metrics answers scrapers that
+# send METRICS_TOKEN, staff and, with DEBUG on, anyone; a METRICS_PROFILE_RATE fraction of requests is profiled
+# and the slow ones saved to METRICS_PROFILE_DIR ("cprofile" or "pyinstrument")
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_PROFILE_RATE = config('METRICS_PROFILE_RATE', default=0.0, cast=float)
+METRICS_PROFILE_SLOW_SECONDS = config('METRICS_PROFILE_SLOW_SECONDS', default=1.0, cast=float)
+METRICS_PROFILER = config('METRICS_PROFILER', default='cprofile')
+METRICS_PROFILE_DIR = config('METRICS_PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 
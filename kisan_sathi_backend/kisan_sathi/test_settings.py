@@ -0,0 +1,22 @@
+"""
+Settings for the test suite: ``manage.py test`` uses them unless
+DJANGO_SETTINGS_MODULE says otherwise; point other runners (e.g.
+pytest-django) at ``kisan_sathi.test_settings``.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        # SQLite's shared in-memory database fails concurrent writers with
+        # "table is locked" instead of waiting; the threaded tests need a file
+        'TEST': (
+            {'NAME': str(BASE_DIR / 'test_db.sqlite3')}
+            if DATABASES['default']['ENGINE'].endswith('sqlite3') else {}
+        ),
+    },
+    # One stand-in replica on the test database, whatever DATABASE_REPLICAS
+    # says; tests that exercise ReplicaReadMixin views list it in ``databases``
+    'replica': {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}},
+}
@@ -0,0 +1,274 @@
+import gzip
+import re
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from django.test.utils import CaptureQueriesContext
+
+from crop_doctor.models import Analysis
+from farmers.authentication import FarmerRefreshToken
+from farmers.tests import make_farmer
+from loadtest.standins import OpenWeatherStandIn
+
+from .compression import CompressionMiddleware
+from .metrics import LATENCY_BUCKETS, registry
+from .renderers import ORJSONRenderer
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    # ``replica`` is the stand-in replica from test_settings.py,
+    # mirrored onto the test database so both aliases see the same rows.
+    # Transactional, since a replica connection cannot read rows another
+    # connection holds in an open transaction.
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.farmer = make_farmer()
+        self.analysis = Analysis.objects.create(farmer=self.farmer, crop_type='tomato', result={'items': []})
+        self.auth = f"Bearer {FarmerRefreshToken.for_user(self.farmer).access_token}"
+
+    def request(self, method, path, **kwargs):
+        """Send a request; return the response and the SQL run on each alias."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(path, HTTP_AUTHORIZATION=self.auth, **kwargs)
+        return response, [q['sql'] for q in primary], [q['sql'] for q in replica]
+
+    def read_analysis(self):
+        return self.request('get', f'/api/crop-doctor/analyses/{self.analysis.pk}/')
+
+    @staticmethod
+    def touches(queries, table):
+        return any(f'"{table}"' in sql for sql in queries)
+
+    def test_safe_requests_read_from_the_replica(self):
+        response, primary, replica = self.read_analysis()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.touches(replica, 'crop_doctor_analysis'))
+        self.assertFalse(self.touches(primary, 'crop_doctor_analysis'))
+
+    def test_writes_go_to_the_primary(self):
+        response, primary, replica = self.request(
+            'put', '/api/auth/profile/', data={'village': 'Bharathinagara'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any(sql.startswith('UPDATE "farmers"') for sql in primary))
+        self.assertEqual(replica, [])
+
+    def test_reads_after_a_write_are_pinned_to_the_primary(self):
+        self.request('put', '/api/auth/profile/', data={'village': 'Bharathinagara'}, content_type='application/json')
+
+        response, primary, replica = self.read_analysis()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.touches(primary, 'crop_doctor_analysis'))
+        self.assertEqual(replica, [])
+
+        # Once the pin expires reads return to the replica
+        cache.clear()
+        _, _, replica = self.read_analysis()
+        self.assertTrue(self.touches(replica, 'crop_doctor_analysis'))
+
+    def test_failed_writes_do_not_pin(self):
+        response, _, _ = self.request('put', '/api/auth/profile/', data={'land_size': 'lots'},
+                                      content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        _, _, replica = self.read_analysis()
+        self.assertTrue(self.touches(replica, 'crop_doctor_analysis'))
+
+
+class ConditionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        weather = OpenWeatherStandIn()
+        weather.__enter__()
+        self.addCleanup(weather.__exit__)
+        overridden = override_settings(OPENWEATHER_BASE_URL=weather.base_url, OPENWEATHER_API_KEY='stand-in')
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+    def summary(self, **headers):
+        return self.client.get('/api/weather/summary/', {'city': 'Mandya'}, **headers)
+
+    def test_validators_are_read_again_after_the_handler_fills_the_cache(self):
+        response = self.summary()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertEqual(set(response['Cache-Control'].split(', ')), {'private', 'no-cache'})
+
+    def test_unchanged_resources_are_not_modified(self):
+        first = self.summary()
+        for headers in ({'HTTP_IF_NONE_MATCH': first['ETag']}, {'HTTP_IF_MODIFIED_SINCE': first['Last-Modified']}):
+            with self.subTest(headers=headers):
+                response = self.summary(**headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], first['ETag'])
+                self.assertIn('private', response['Cache-Control'])
+
+    def test_a_stale_validator_gets_the_body(self):
+        first = self.summary()
+        cache.clear()
+        response = self.summary(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+
+class MetricsAccessTests(TestCase):
+    def scrape(self, **headers):
+        return self.client.get('/metrics', **headers)
+
+    def test_closed_without_a_token(self):
+        response = self.scrape()
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_open_to_the_token(self):
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer guess').status_code, 401)
+
+    def test_open_to_staff_only(self):
+        farmer = make_farmer()
+        self.client.force_login(farmer)
+        self.assertEqual(self.scrape().status_code, 403)
+        farmer.is_staff = True
+        farmer.save()
+        self.assertEqual(self.scrape().status_code, 200)
+
+    @override_settings(DEBUG=True)
+    def test_open_while_debugging(self):
+        self.assertEqual(self.scrape().status_code, 200)
+
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{((?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*",?)*)\})? (\S+)$')
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\.)*)"')
+
+
+def parse_exposition(text):
+    """Samples in Prometheus text format as {(name, labels): value}; fails on anything malformed."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            assert kind in ('counter', 'gauge', 'histogram', 'summary', 'untyped'), line
+            assert name not in types, f"{name} declared twice"
+            types[name] = kind
+            continue
+        match = _SAMPLE.match(line)
+        assert match, f"Malformed sample: {line!r}"
+        name, labels, value = match.groups()
+        family = re.sub(r'_(bucket|sum|count)$', '', name) if name not in types else name
+        assert family in types, f"{name} has no TYPE"
+        samples[(name, frozenset(_LABEL.findall(labels or '')))] = float(value)
+    return samples
+
+
+class MetricsScrapeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.addCleanup(registry.clear)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_a_request_is_recorded_by_route_and_scraped_as_valid_exposition(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/mandi/prices/', {'district': 'all'}).status_code, 200)
+        self.assertEqual(self.client.get('/api/mandi/forecast/', {'commodity': 'none'}).status_code, 404)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        samples = parse_exposition(response.content.decode())
+
+        route = frozenset({('route', 'api/mandi/prices/')})
+        get = route | {('method', 'GET')}
+        self.assertEqual(samples[('kisan_responses_total', get | {('status', '200')})], 2)
+        self.assertEqual(samples[('kisan_request_duration_seconds_count', get)], 2)
+        buckets = [samples[('kisan_request_duration_seconds_bucket', get | {('le', str(bound))})]
+                   for bound in LATENCY_BUCKETS]
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertEqual(samples[('kisan_request_duration_seconds_bucket', get | {('le', '+Inf')})], 2)
+        # The first request reads the rollup version and the prices; the second is served from the cache
+        self.assertGreaterEqual(samples[('kisan_db_queries_total', route)], 3)
+        self.assertEqual(samples[('kisan_cache_misses_total', route)], 1)
+        self.assertEqual(samples[('kisan_cache_hits_total', route)], 1)
+
+        missing = frozenset({('route', 'api/mandi/forecast/'), ('method', 'GET'), ('status', '404')})
+        self.assertEqual(samples[('kisan_responses_total', missing)], 1)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertSameAsDRF(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_drf(self):
+        for data in (
+            {'when': datetime(2026, 10, 19, 6, 30, tzinfo=timezone.utc), 'day': date(2026, 10, 19),
+             'price': Decimal('2150.50'), 'id': uuid.UUID(int=7), 'label': gettext_lazy('Tomato'),
+             'text': 'line\u2028break\u2029', 'kn': 'ಟೊಮ್ಯಾಟೊ', 'none': None, 'nested': [{'a': (1, 2)}]},
+            {'a': 1e16, 'b': 1e-7, 'c': [1.5e300, -2.5e-12], 'd': 0.1},
+            1e22,
+            {'big': 2 ** 70, 'negative': -(2 ** 64)},
+            {'text': 'x,1e5,y'},
+        ):
+            with self.subTest(data=data):
+                self.assertSameAsDRF(data)
+
+    def test_non_finite_floats_are_refused_like_drf(self):
+        for data in ({'a': float('nan')}, [1.0, float('inf')], float('-inf')):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(data)
+                with self.assertRaises(ValueError):
+                    ORJSONRenderer().render(data)
+
+
+@override_settings(COMPRESSION_MIN_BYTES=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"crop": "tomato", "advice": "' + b'water at the root, not the leaves; ' * 20 + b'"}'
+
+    def respond(self, response, accept='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compresses_large_text_and_weakens_the_etag(self):
+        original = HttpResponse(self.body, content_type='application/json')
+        original['ETag'] = '"v1"'
+        response = self.respond(original)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_responses_vary_but_stay_uncompressed(self):
+        response = self.respond(HttpResponse(b'{"ok": true}', content_type='application/json'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_clients_without_gzip_get_identity(self):
+        response = self.respond(HttpResponse(self.body, content_type='application/json'), accept='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.body)
+
+    def test_streaming_encoded_and_binary_responses_pass_through(self):
+        encoded = HttpResponse(gzip.compress(self.body), content_type='application/json')
+        encoded['Content-Encoding'] = 'gzip'
+        for original in (
+            StreamingHttpResponse(iter([self.body]), content_type='text/event-stream'),
+            encoded,
+            HttpResponse(self.body, content_type='application/pdf'),
+        ):
+            with self.subTest(content_type=original['Content-Type']):
+                response = self.respond(original)
+                self.assertIs(response, original)
+                self.assertFalse(response.has_header('Vary'))
@@ -3,6 +3,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metrics import metrics_view
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,6 +16,9 @@ urlpatterns = [
     path('api/crop-doctor/', include('crop_doctor.urls')),
     path('api/chatbot/', include('chatbot.urls')),
     path('api/tips/', include('farming_tips.urls')),
+    path('api/admin/', include('stats.urls')),
+    path('api/live/', include('live.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import suppress
+
+
+class _Stalled(Exception):
+    """The client stopped reading for longer than ``send_timeout``."""
+
+
+class StreamDisconnectMiddleware:
+    """
+    Cancels long-lived responses under any of ``prefixes`` when the client disconnects.
+
+    Django 4.2 keeps iterating a streaming response after the client has
+    gone, so an idle SSE stream would never end. This reads the request
+    body itself, hands Django a replay of it, and then watches ``receive``
+    for ``http.disconnect`` to cancel the response task.
+
+    A client that stays connected but stops reading blocks the response in
+    ``send`` instead, where no deadline inside the stream can see it; with
+    ``send_timeout`` set, a write that waits longer ends the response as a
+    disconnect would.
+    """
+
+    def __init__(self, app, prefixes, send_timeout=None):
+        self.app = app
+        self.prefixes = tuple(prefixes)
+        self.send_timeout = send_timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.prefixes):
+            return await self.app(scope, receive, send)
+
+        messages = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            messages.append(message)
+            if not message.get('more_body'):
+                break
+        disconnected = asyncio.Event()
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def bounded_send(message):
+            try:
+                await asyncio.wait_for(send(message), self.send_timeout)
+            except asyncio.TimeoutError:
+                raise _Stalled from None
+
+        response = asyncio.ensure_future(self.app(scope, replay, bounded_send))
+        watcher = asyncio.ensure_future(receive())
+        try:
+            done, _ = await asyncio.wait({response, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # The server is cancelling us (e.g. shutting down); take the response down too
+            watcher.cancel()
+            response.cancel()
+            raise
+        if response in done:
+            watcher.cancel()
+            with suppress(_Stalled):
+                response.result()
+            return
+        disconnected.set()
+        response.cancel()
+        with suppress(asyncio.CancelledError):
+            await response
@@ -0,0 +1,63 @@
+"""
+Events pushed to live streams. Each is published only after the current
+transaction commits, so clients never see rolled-back writes.
+"""
+from django.db import transaction
+
+from .layer import publish
+
+
+LISTINGS = 'listings'
+
+
+def mandi_group(commodity_id):
+    return f"mandi.{commodity_id}"
+
+
+def user_group(user_id):
+    return f"user.{user_id}"
+
+
+def _on_commit(group, event, data):
+    transaction.on_commit(lambda: publish(group, event, data))
+
+
+def listing_changed(listing):
+    _on_commit(LISTINGS, 'listing', {
+        'id': listing.pk,
+        'type': listing.listing_type,
+        'name': listing.name,
+        'crop': listing.crop,
+        'price': listing.price,
+        'quantity': listing.quantity,
+        'district': listing.district,
+        'isActive': listing.is_active,
+    })
+
+
+def listing_stock(listing_id, quantity):
+    _on_commit(LISTINGS, 'listing.stock', {'id': listing_id, 'quantity': quantity})
+
+
+def listing_removed(listing_id):
+    _on_commit(LISTINGS, 'listing.removed', {'id': listing_id})
+
+
+def mandi_prices_updated(commodities, since, version):
+    """``commodities`` maps commodity id to name; ``since`` maps id to the earliest changed date."""
+    for commodity_id, name in commodities.items():
+        _on_commit(mandi_group(commodity_id), 'mandi.prices', {
+            'commodityId': commodity_id,
+            'crop': name,
+            'since': since.get(commodity_id),
+            # Matches the version in /api/mandi/prices/ ETags, so clients refetch only on change
+            'version': version,
+        })
+
+
+def analysis_completed(analysis):
+    if analysis.farmer_id:
+        _on_commit(user_group(analysis.farmer_id), 'crop_doctor.completed', {
+            'analysisId': analysis.pk,
+            'cropType': analysis.crop_type,
+        })
@@ -0,0 +1,187 @@
+"""
+Pub/sub channel layer for server-sent events.
+
+Subscribers are SSE connections served on the process's ASGI event loop;
+each gets a bounded queue per connection. ``publish`` may be called from
+any thread (sync views, signals): the event is encoded to an SSE frame
+once and handed to the loop, which appends the same bytes object to every
+subscriber queue in the group. A subscriber whose queue fills up is cut
+off rather than buffered without limit; its client reconnects and
+refetches state over REST.
+
+``InMemoryChannelLayer`` only reaches connections in the publishing
+process. ``RedisChannelLayer`` publishes through Redis pub/sub, and each
+web process relays messages from Redis into its local fan-out, so
+management commands and other workers reach every connection.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of a frame to tell the stream to close
+CLOSE = None
+# SSE comment that keeps idle connections (and proxies) from timing out
+PING = b": ping\n\n"
+
+
+class Subscription:
+    def __init__(self, groups, maxsize):
+        self.groups = tuple(groups)
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def offer(self, frame):
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Make room for the close marker; the stream ends on it
+            self.queue.get_nowait()
+            self.queue.put_nowait(CLOSE)
+
+    async def next_chunk(self) -> bytes:
+        """
+        Wait for a frame, then take everything else already queued with it,
+        so a burst costs the stream one write rather than one per frame.
+        Sets ``closed`` once the close marker is reached.
+        """
+        frames = [await self.queue.get()]
+        while frames[-1] is not CLOSE and not self.queue.empty():
+            frames.append(self.queue.get_nowait())
+        if frames[-1] is CLOSE:
+            self.closed = True
+            frames.pop()
+        return b"".join(frames)
+
+
+class InMemoryChannelLayer:
+    def __init__(self):
+        self.groups = defaultdict(set)
+        self.subscriptions = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self._heartbeat = None
+
+    @property
+    def connections(self):
+        return len(self.subscriptions)
+
+    def subscribe(self, groups: Iterable[str]) -> Subscription:
+        """Register a subscriber; must run on the event loop that serves it."""
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(groups, settings.LIVE_QUEUE_SIZE)
+        self.subscriptions.add(subscription)
+        for group in subscription.groups:
+            self.groups[group].add(subscription)
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = self.loop.create_task(self._ping())
+        return subscription
+
+    async def _ping(self):
+        # One timer for every connection instead of a timeout per stream read
+        while self.subscriptions:
+            await asyncio.sleep(settings.LIVE_HEARTBEAT_SECONDS)
+            for subscription in tuple(self.subscriptions):
+                if subscription.queue.empty():
+                    subscription.offer(PING)
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+        for group in subscription.groups:
+            members = self.groups.get(group)
+            if members is not None:
+                members.discard(subscription)
+                if not members:
+                    del self.groups[group]
+
+    def encode(self, event, data) -> bytes:
+        payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return f"id: {next(self._ids)}\nevent: {event}\ndata: {payload}\n\n".encode()
+
+    def publish(self, group, event, data):
+        if group in self.groups:
+            self.dispatch(group, self.encode(event, data))
+
+    def dispatch(self, group, frame: bytes):
+        loop = self.loop
+        if loop is None or loop.is_closed() or group not in self.groups:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fanout(group, frame)
+        else:
+            loop.call_soon_threadsafe(self._fanout, group, frame)
+
+    def _fanout(self, group, frame):
+        for subscription in tuple(self.groups.get(group, ())):
+            subscription.offer(frame)
+
+
+class RedisChannelLayer(InMemoryChannelLayer):
+    def __init__(self, url, prefix='kisan-live:'):
+        super().__init__()
+        import redis
+
+        self.url = url
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self._listener = None
+
+    def subscribe(self, groups):
+        subscription = super().subscribe(groups)
+        if self._listener is None or self._listener.done():
+            self._listener = self.loop.create_task(self._listen())
+        return subscription
+
+    def publish(self, group, event, data):
+        try:
+            self.client.publish(f"{self.prefix}{group}", self.encode(event, data))
+        except Exception:
+            logger.exception("Could not publish live event to %s", group)
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.psubscribe(f"{self.prefix}*")
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'pmessage':
+                    group = message['channel'].decode()[len(self.prefix):]
+                    self._fanout(group, message['data'])
+        finally:
+            await pubsub.close()
+            await client.close()
+
+
+_layer = None
+_lock = threading.Lock()
+
+
+def get_channel_layer():
+    global _layer
+    if _layer is None:
+        with _lock:
+            if _layer is None:
+                if settings.LIVE_CHANNEL_LAYER == 'redis':
+                    _layer = RedisChannelLayer(settings.REDIS_URL)
+                else:
+                    _layer = InMemoryChannelLayer()
+    return _layer
+
+
+def publish(group, event, data):
+    get_channel_layer().publish(group, event, data)
@@ -0,0 +1,127 @@
+import asyncio
+import re
+import resource
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kisan_sathi.asgi import application
+from live.events import LISTINGS
+from live.layer import InMemoryChannelLayer, get_channel_layer
+
+
+SEQ = re.compile(rb'"seq":(\d+)')
+
+
+class Connection:
+    """An in-process ASGI client holding one /api/live/stream/ request open."""
+
+    def __init__(self, path, query):
+        self.scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        self.status = None
+        self.received = []
+        self.events = 0
+        self.connected = asyncio.Event()
+        self.closed = asyncio.Event()
+        self._requested = False
+
+    async def receive(self):
+        if not self._requested:
+            self._requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.closed.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message['type'] == 'http.response.body':
+            body = message.get('body', b'')
+            if body.startswith(b'retry:'):
+                self.connected.set()
+            elif body:
+                # One write may carry several queued frames
+                self.received.append((time.perf_counter(), body))
+                self.events += body.count(b'\nevent: ')
+            if not message.get('more_body'):
+                # Refused (e.g. 4xx/5xx) rather than streamed
+                self.connected.set()
+
+
+class Command(BaseCommand):
+    help = "Hold many live SSE connections open in-process and time event fan-out to all of them"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=10000)
+        parser.add_argument('--messages', type=int, default=20)
+        parser.add_argument('--interval', type=float, default=0.5, help="Seconds between published events")
+
+    def handle(self, *args, **options):
+        if type(get_channel_layer()) is not InMemoryChannelLayer:
+            raise CommandError("Run with LIVE_CHANNEL_LAYER=memory to measure in-process fan-out")
+        asyncio.run(self._run(options['connections'], options['messages'], options['interval']))
+
+    async def _run(self, count, messages, interval):
+        layer = get_channel_layer()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        started = time.perf_counter()
+        connections = [Connection('/api/live/stream/', 'topics=listings') for _ in range(count)]
+        tasks = [asyncio.ensure_future(application(c.scope, c.receive, c.send)) for c in connections]
+        await asyncio.gather(*(c.connected.wait() for c in connections))
+        opened = time.perf_counter() - started
+        refused = sum(1 for c in connections if c.status != 200)
+        if refused:
+            raise CommandError(f"{refused} connections were refused (status {connections[0].status})")
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(f"Opened {count} streams in {opened:.1f}s; {layer.connections} subscribed, "
+                          f"~{(rss_after - rss_before) * 1024 / count / 1024:.1f} KB per connection")
+
+        sent = {}
+
+        def publisher():
+            for seq in range(messages):
+                sent[seq] = time.perf_counter()
+                layer.publish(LISTINGS, 'listing.stock', {'id': 1, 'quantity': seq, 'seq': seq})
+                time.sleep(interval)
+
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and any(c.events < messages for c in connections):
+            await asyncio.sleep(0.05)
+
+        latencies, last = [], {}
+        for connection in connections:
+            for at, body in connection.received:
+                for match in SEQ.finditer(body):
+                    seq = int(match.group(1))
+                    latencies.append(at - sent[seq])
+                    last[seq] = max(last.get(seq, 0), at)
+        delivered = len(latencies)
+        expected = count * messages
+        latencies.sort()
+        self.stdout.write(
+            f"Delivered {delivered}/{expected} events: "
+            f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms per connection; "
+            f"last connection reached after {statistics.median(last[s] - sent[s] for s in last) * 1000:.1f} ms (median)"
+        )
+
+        started = time.perf_counter()
+        for connection in connections:
+            connection.closed.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.stdout.write(f"Disconnected in {time.perf_counter() - started:.1f}s; "
+                          f"{layer.connections} subscriptions left, {len(layer.groups)} groups left")
+        if layer.connections or delivered != expected:
+            raise CommandError("Fan-out lost events or leaked subscriptions")
+        self.stdout.write(self.style.SUCCESS("OK"))
@@ -0,0 +1,245 @@
+import asyncio
+import gc
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from farmers.authentication import FarmerRefreshToken
+from farmers.tests import make_farmer
+
+from . import events, layer
+from .asgi import StreamDisconnectMiddleware
+from .layer import PING, InMemoryChannelLayer, RedisChannelLayer
+from .views import StreamTicket, _authenticate
+
+
+class InMemoryChannelLayerTests(SimpleTestCase):
+    async def test_publish_reaches_only_the_group(self):
+        channels = InMemoryChannelLayer()
+        listings = channels.subscribe(['listings'])
+        mandi = channels.subscribe(['mandi.1'])
+        channels.publish('listings', 'listing.stock', {'id': 7, 'quantity': 3})
+        self.assertEqual(
+            await listings.next_chunk(),
+            b'id: 1\nevent: listing.stock\ndata: {"id":7,"quantity":3}\n\n',
+        )
+        self.assertTrue(mandi.queue.empty())
+
+    async def test_a_burst_is_one_chunk(self):
+        channels = InMemoryChannelLayer()
+        subscription = channels.subscribe(['listings'])
+        for pk in range(3):
+            channels.publish('listings', 'listing.removed', {'id': pk})
+        self.assertEqual((await subscription.next_chunk()).count(b'event: listing.removed'), 3)
+
+    async def test_publish_from_another_thread(self):
+        channels = InMemoryChannelLayer()
+        subscription = channels.subscribe(['listings'])
+        thread = threading.Thread(target=channels.publish, args=('listings', 'listing.removed', {'id': 1}))
+        thread.start()
+        thread.join()
+        chunk = await asyncio.wait_for(subscription.next_chunk(), 1)
+        self.assertIn(b'event: listing.removed', chunk)
+
+    @override_settings(LIVE_QUEUE_SIZE=2)
+    async def test_a_subscriber_that_falls_behind_is_closed(self):
+        channels = InMemoryChannelLayer()
+        subscription = channels.subscribe(['listings'])
+        for pk in range(3):
+            channels.publish('listings', 'listing.removed', {'id': pk})
+        chunk = await subscription.next_chunk()
+        self.assertEqual(chunk.count(b'event: listing.removed'), 1)
+        self.assertTrue(subscription.closed)
+
+    async def test_unsubscribe_drops_empty_groups(self):
+        channels = InMemoryChannelLayer()
+        first = channels.subscribe(['listings', 'user.1'])
+        second = channels.subscribe(['listings'])
+        channels.unsubscribe(first)
+        self.assertEqual(set(channels.groups), {'listings'})
+        channels.unsubscribe(second)
+        self.assertEqual((channels.groups, channels.connections), ({}, 0))
+        # Nobody is listening: nothing is encoded or queued
+        with mock.patch.object(channels, 'encode') as encode:
+            channels.publish('listings', 'listing.removed', {'id': 1})
+        encode.assert_not_called()
+
+    @override_settings(LIVE_HEARTBEAT_SECONDS=0.01)
+    async def test_idle_subscribers_get_heartbeats(self):
+        channels = InMemoryChannelLayer()
+        subscription = channels.subscribe(['listings'])
+        self.assertEqual(await asyncio.wait_for(subscription.next_chunk(), 1), PING)
+        channels.unsubscribe(subscription)
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.patterns = []
+        self.closed = False
+
+    async def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        # Stay subscribed, as a live connection would
+        await asyncio.Event().wait()
+
+    async def close(self):
+        self.closed = True
+
+
+class RedisChannelLayerTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('redis.Redis.from_url')
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def test_publish_goes_through_redis(self):
+        channels = RedisChannelLayer('redis://cache:6379/0')
+        channels.publish('mandi.4', 'mandi.prices', {'commodityId': 4})
+        channel, frame = self.client.publish.call_args.args
+        self.assertEqual(channel, 'kisan-live:mandi.4')
+        self.assertIn(b'event: mandi.prices', frame)
+
+    def test_a_redis_outage_does_not_fail_the_write(self):
+        self.client.publish.side_effect = ConnectionError("Connection refused")
+        channels = RedisChannelLayer('redis://cache:6379/0')
+        with self.assertLogs('live.layer', 'ERROR'):
+            channels.publish('listings', 'listing.removed', {'id': 1})
+
+    async def test_messages_from_redis_reach_local_subscribers(self):
+        pubsub = FakePubSub([
+            {'type': 'psubscribe', 'channel': b'kisan-live:*', 'data': 1},
+            {'type': 'pmessage', 'channel': b'kisan-live:listings', 'data': b'event: listing\n\n'},
+            {'type': 'pmessage', 'channel': b'kisan-live:user.9', 'data': b'event: crop_doctor.completed\n\n'},
+        ])
+        with mock.patch('redis.asyncio.Redis.from_url') as from_url:
+            from_url.return_value.pubsub = mock.Mock(return_value=pubsub)
+            from_url.return_value.close = mock.AsyncMock()
+            channels = RedisChannelLayer('redis://cache:6379/0')
+            subscription = channels.subscribe(['listings'])
+            self.assertEqual(await asyncio.wait_for(subscription.next_chunk(), 1), b'event: listing\n\n')
+            # One listener per process, however many streams subscribe
+            channels.subscribe(['listings'])
+            self.assertEqual(from_url.call_count, 1)
+            channels._listener.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await channels._listener
+        self.assertEqual(pubsub.patterns, ['kisan-live:*'])
+        self.assertTrue(pubsub.closed)
+
+
+class EventsTests(TestCase):
+    def test_events_are_published_only_after_commit(self):
+        with mock.patch.object(events, 'publish') as publish:
+            with self.captureOnCommitCallbacks() as callbacks:
+                events.listing_stock(3, 12)
+            publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+        publish.assert_called_once_with(events.LISTINGS, 'listing.stock', {'id': 3, 'quantity': 12})
+
+    def test_analyses_without_a_farmer_are_not_published(self):
+        with mock.patch.object(events, 'publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            events.analysis_completed(mock.Mock(farmer_id=None))
+            events.analysis_completed(mock.Mock(farmer_id=5, pk=2, crop_type='tomato'))
+        publish.assert_called_once_with(
+            events.user_group(5), 'crop_doctor.completed', {'analysisId': 2, 'cropType': 'tomato'},
+        )
+
+
+class StreamTicketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.farmer = make_farmer()
+        self.access = FarmerRefreshToken.for_user(self.farmer).access_token
+
+    def authenticate(self, **query):
+        return _authenticate(RequestFactory().get('/api/live/stream/', query))
+
+    def test_a_signed_in_farmer_gets_a_ticket(self):
+        self.assertEqual(self.client.post('/api/live/ticket/').status_code, 401)
+        response = self.client.post('/api/live/ticket/', HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.authenticate(ticket=response.json()['data']['ticket']), self.farmer)
+
+    def test_access_tokens_are_not_accepted_in_the_query_string(self):
+        self.assertIsNone(self.authenticate(ticket=str(self.access)))
+        self.assertIsNone(self.authenticate(token=str(self.access)))
+
+    def test_tickets_do_not_authenticate_api_requests(self):
+        ticket = StreamTicket.for_user(self.farmer)
+        response = self.client.get('/api/auth/profile/', HTTP_AUTHORIZATION=f"Bearer {ticket}")
+        self.assertEqual(response.status_code, 401)
+
+    def test_expired_and_revoked_tickets_are_refused(self):
+        expired = StreamTicket.for_user(self.farmer)
+        expired.set_exp(lifetime=-timedelta(seconds=1))
+        self.assertIsNone(self.authenticate(ticket=str(expired)))
+
+        ticket = str(StreamTicket.for_user(self.farmer))
+        self.farmer.set_password('a new password')
+        self.farmer.save()
+        self.assertIsNone(self.authenticate(ticket=ticket))
+
+
+def http_scope(path, query=b''):
+    return {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query, 'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 5000), 'server': ('testserver', 80),
+    }
+
+
+@override_settings(LIVE_CHANNEL_LAYER='memory')
+class StreamDisconnectTests(TestCase):
+    def setUp(self):
+        layer._layer = None
+        self.addCleanup(setattr, layer, '_layer', None)
+        # As the test client does, keep the handler off the test transaction's connection
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        self.app = StreamDisconnectMiddleware(get_asgi_application(), prefixes=('/api/live/',))
+
+    async def test_a_disconnect_ends_the_stream_and_its_subscription(self):
+        connected = asyncio.Event()
+        requested = False
+        sent = []
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b''}
+            await connected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+            if message['type'] == 'http.response.body' and b'connected' in message.get('body', b''):
+                self.assertEqual(layer.get_channel_layer().connections, 1)
+                connected.set()
+
+        await asyncio.wait_for(self.app(http_scope('/api/live/stream/', b'topics=listings'), receive, send), 5)
+        gc.collect()
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertTrue(connected.is_set())
+        self.assertEqual(layer.get_channel_layer().connections, 0)
+
+    async def test_other_paths_are_passed_through(self):
+        app = mock.AsyncMock()
+        receive, send = mock.AsyncMock(), mock.AsyncMock()
+        await StreamDisconnectMiddleware(app, prefixes=('/api/live/',))(http_scope('/api/mandi/prices/'), receive, send)
+        app.assert_awaited_once_with(mock.ANY, receive, send)
+        receive.assert_not_awaited()
@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import StreamTicketView, stream
+
+app_name = 'live'
+
+urlpatterns = [
+    path('stream/', stream, name='stream'),
+    path('ticket/', StreamTicketView.as_view(), name='ticket'),
+]
@@ -0,0 +1,127 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import Token
+
+from farmers.authentication import TOKEN_VERSION_CLAIM, CachedJWTAuthentication
+from mandi.models import Commodity
+
+from .events import LISTINGS, mandi_group, user_group
+from .layer import get_channel_layer
+
+
+MAX_COMMODITIES = 20
+
+
+class StreamTicket(Token):
+    """
+    A short-lived token that only opens live streams. Browsers' EventSource
+    cannot send headers, so it travels in the query string, where proxy and
+    access logs keep it; the farmer's access token never does. Carries the
+    token version, so a password change also voids outstanding tickets.
+    """
+
+    token_type = 'stream'
+    lifetime = timedelta(seconds=settings.LIVE_TICKET_SECONDS)
+
+    @classmethod
+    def for_user(cls, user):
+        ticket = super().for_user(user)
+        ticket[TOKEN_VERSION_CLAIM] = user.token_version
+        return ticket
+
+
+class StreamTicketView(APIView):
+    """A ticket for ``stream/?ticket=``; clients fetch a fresh one for every (re)connect."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            'success': True,
+            'data': {'ticket': str(StreamTicket.for_user(request.user)), 'expiresIn': settings.LIVE_TICKET_SECONDS},
+        })
+
+
+def _authenticate(request):
+    """Bearer header, or a ``?ticket=`` from StreamTicketView."""
+    auth = CachedJWTAuthentication()
+    try:
+        raw = request.GET.get('ticket')
+        if raw:
+            return auth.get_user(StreamTicket(raw))
+        result = auth.authenticate(request)
+        return result[0] if result else None
+    except (TokenError, InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _groups(topics, user):
+    groups, names = [], []
+    for topic in topics:
+        if topic == 'listings':
+            groups.append(LISTINGS)
+        elif topic == 'crop_doctor' and user is not None:
+            groups.append(user_group(user.pk))
+        elif topic.startswith('mandi:') and len(names) < MAX_COMMODITIES:
+            names.append(topic[len('mandi:'):].strip())
+    if names:
+        query = Q()
+        for name in names:
+            query |= Q(name__iexact=name)
+        groups += [mandi_group(pk) for pk in Commodity.objects.filter(query).values_list('pk', flat=True)]
+    return groups
+
+
+async def stream(request):
+    """
+    Server-sent events for ``?topics=listings,mandi:Tomato,crop_doctor``:
+    listing and stock changes, new mandi prices for followed commodities,
+    and the caller's completed crop-doctor analyses. Replaces polling the
+    REST endpoints; clients refetch over REST only when an event says
+    something changed.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'success': False,
+            'message': 'Live updates are only served by the ASGI application'
+        }, status=501)
+
+    topics = [t.strip() for t in request.GET.get('topics', '').split(',') if t.strip()]
+    user = await sync_to_async(_authenticate)(request)
+    groups = await sync_to_async(_groups)(topics, user)
+    if not groups:
+        return JsonResponse({'success': False, 'message': 'No valid topics'}, status=400)
+
+    layer = get_channel_layer()
+    subscription = layer.subscribe(groups)
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        # Bounded lifetime: the client reconnects, and anything leaked is reclaimed
+        deadline = loop.time() + settings.LIVE_MAX_STREAM_SECONDS
+        try:
+            yield b"retry: 5000\n: connected\n\n"
+            while not subscription.closed and loop.time() < deadline:
+                # Heartbeats are queued by the layer, so this wakes at least every LIVE_HEARTBEAT_SECONDS
+                chunk = await subscription.next_chunk()
+                if chunk:
+                    yield chunk
+        finally:
+            layer.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,82 @@
+import random
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework.renderers import JSONRenderer
+
+import crop_doctor.views
+from crop_doctor.diseases import DEFAULT_CLASS_MAP
+from farmers.authentication import FarmerRefreshToken
+from farmers.models import Farmer
+from kisan_sathi.compression import brotli, compress
+from kisan_sathi.renderers import ORJSONRenderer
+from loadtest.standins import StandInModel, ThrowawayDatabases, leaf_image
+
+
+class Command(BaseCommand):
+    help = ("Compare DRF's JSON renderer with orjson on the crop-doctor analyze and profile responses, "
+            "and the bytes each sends uncompressed, gzipped and brotli-compressed. Its farmer and analysis "
+            "live in a throwaway test database created for the run.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=2000)
+        parser.add_argument('--images', type=int, default=5)
+
+    def handle(self, *args, **options):
+        media = tempfile.mkdtemp(prefix='bench-media-')
+        previous = crop_doctor.views._TF_MODEL
+        crop_doctor.views._TF_MODEL = StandInModel(len(DEFAULT_CLASS_MAP))
+        try:
+            with ThrowawayDatabases(), override_settings(MEDIA_ROOT=media):
+                farmer = Farmer.objects.create(
+                    phone='+916100000001', email='bench@example.com', first_name='Bench', last_name='Farmer',
+                    district='Mandya', taluk='Maddur', village='Kestur', land_size=2.5,
+                    crops_grown=['rice', 'tomato', 'ragi'], preferred_language='kn', password=make_password(None),
+                )
+                self._run(farmer, options)
+        finally:
+            crop_doctor.views._TF_MODEL = previous
+            shutil.rmtree(media, ignore_errors=True)
+
+    def _run(self, farmer, options):
+        client = Client(HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING='gzip, br',
+                        HTTP_AUTHORIZATION=f"Bearer {FarmerRefreshToken.for_user(farmer).access_token}")
+        rng = random.Random(0)
+        files = [leaf_image(rng) for _ in range(options['images'])]
+        analyze = client.post('/api/crop-doctor/analyze/', {
+            'crop_type': 'tomato', 'language': 'kn',
+            'images': [SimpleUploadedFile(f'leaf{i}.jpg', body, 'image/jpeg') for i, body in enumerate(files)],
+        })
+        profile = client.get('/api/auth/profile/')
+        if analyze.status_code != 200 or profile.status_code != 200:
+            raise CommandError(f"Requests failed: analyze {analyze.status_code}, profile {profile.status_code}")
+
+        renders = options['renders']
+        for name, response in (('analyze', analyze), ('profile', profile)):
+            data = response.data
+            timings = {}
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                started = time.process_time()
+                for _ in range(renders):
+                    body = renderer.render(data)
+                timings[type(renderer).__name__] = (time.process_time() - started) / renders
+            if JSONRenderer().render(data) != body:
+                raise CommandError(f"{name}: orjson output differs from DRF's")
+
+            sizes = {'identity': len(body)}
+            for encoding in ('gzip', 'br'):
+                if encoding == 'br' and brotli is None:
+                    continue
+                sizes[encoding] = len(compress(body, {encoding})[1])
+            self.stdout.write(
+                f"{name}: render {timings['JSONRenderer'] * 1e6:.1f} us with DRF, "
+                f"{timings['ORJSONRenderer'] * 1e6:.1f} us with orjson "
+                f"({timings['JSONRenderer'] / timings['ORJSONRenderer']:.1f}x); "
+                + ", ".join(f"{encoding} {size} B" for encoding, size in sizes.items())
+                + f"; served {len(response.content)} B as {response.get('Content-Encoding', 'identity')}"
+            )
@@ -0,0 +1,114 @@
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.test import override_settings
+
+import crop_doctor.views
+from crop_doctor.diseases import DEFAULT_CLASS_MAP
+from loadtest.runner import Samples, VirtualUser, compare, summarize
+from loadtest.standins import OpenWeatherStandIn, StandInModel, ThrowawayDatabases
+
+
+BASELINE = Path(__file__).resolve().parents[2] / 'baseline.json'
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = ("Load-test signup, login, profile, weather, crop-doctor analysis and report download with "
+            "concurrent virtual users, then compare against the saved baseline. By default the API is "
+            "served in-process with local stand-ins for OpenWeather and the crop-doctor model, against a "
+            "throwaway test database created for the run.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to keep every user busy")
+        parser.add_argument('--url', help="Test an already running server instead (it needs its own stand-ins, "
+                                          "and keeps the farmers and analyses the run creates)")
+        parser.add_argument('--upstream-ms', type=float, default=80, help="Stand-in OpenWeather response time")
+        parser.add_argument('--inference-ms', type=float, default=40, help="Stand-in model time per image")
+        parser.add_argument('--baseline', default=str(BASELINE))
+        parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before failing")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        tag = random.Random(options['seed']).randint(100, 999)
+        with ExitStack() as stack:
+            base_url = options['url'] or self._serve(stack, options)
+            report, elapsed = self._run(base_url, tag, options)
+        self._print(report, elapsed, options)
+
+        path = Path(options['baseline'])
+        if options['save_baseline']:
+            path.write_text(json.dumps({'users': options['users'], 'endpoints': report}, indent=2) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Saved baseline to {path}"))
+            return
+        if not path.exists():
+            self.stdout.write(f"No baseline at {path}; run with --save-baseline to create one")
+            return
+        baseline = json.loads(path.read_text())
+        if baseline['users'] != options['users']:
+            raise CommandError(f"The baseline was recorded with {baseline['users']} users; rerun with that many")
+        regressions = compare(report, baseline['endpoints'], options['tolerance'])
+        if regressions:
+            raise CommandError("Slower than the baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"Within {options['tolerance']:.0%} of the baseline"))
+
+    def _serve(self, stack, options):
+        stack.enter_context(ThrowawayDatabases())
+        weather = stack.enter_context(OpenWeatherStandIn(latency=options['upstream_ms'] / 1000))
+        media = tempfile.mkdtemp(prefix='loadtest-media-')
+        stack.callback(shutil.rmtree, media, ignore_errors=True)
+        stack.enter_context(override_settings(
+            OPENWEATHER_BASE_URL=weather.base_url, OPENWEATHER_API_KEY='stand-in', MEDIA_ROOT=media,
+        ))
+
+        model = StandInModel(len(DEFAULT_CLASS_MAP), latency=options['inference_ms'] / 1000, seed=options['seed'])
+        previous = crop_doctor.views._TF_MODEL
+        crop_doctor.views._TF_MODEL = model
+        stack.callback(setattr, crop_doctor.views, '_TF_MODEL', previous)
+
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+        server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        stack.callback(server.server_close)
+        stack.callback(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    def _run(self, base_url, tag, options):
+        samples = Samples()
+        deadline = time.monotonic() + options['duration']
+        users = [
+            VirtualUser(base_url, tag, i, samples, random.Random(options['seed'] * 100003 + i))
+            for i in range(options['users'])
+        ]
+        threads = [threading.Thread(target=user.run, args=(deadline,)) for user in users]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return summarize(samples, elapsed), elapsed
+
+    def _print(self, report, elapsed, options):
+        self.stdout.write(f"{options['users']} users for {elapsed:.1f}s")
+        self.stdout.write(f"{'endpoint':<10}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+                          f"{'p99 ms':>9}{'errors':>9}")
+        for endpoint, row in report.items():
+            self.stdout.write(
+                f"{endpoint:<10}{row['requests']:>10}{row['throughput']:>9.1f}{row['p50_ms']:>9.1f}"
+                f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['error_rate']:>9.2%}"
+            )
@@ -0,0 +1,139 @@
+"""
+A virtual-user load generator for the HTTP API and its report.
+
+Each virtual user signs up and logs in once, then until the deadline keeps
+picking a weighted random action: view their profile, load the weather
+summary, upload leaf photos for analysis, download the report for their
+last analysis or log in again. Every request is timed under its endpoint
+name; ``summarize`` turns the samples into throughput, latency percentiles
+and error rates, and ``compare`` checks them against a saved baseline.
+"""
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from .standins import leaf_image
+
+
+PASSWORD = 'Loadtest!2024'
+# Apps keep their token, so logging in again is rare
+ACTIONS = [('profile', 8), ('weather', 6), ('analyze', 2), ('report', 2), ('login', 0.25)]
+# Ignore latency regressions smaller than this; they are timer noise
+MIN_REGRESSION_MS = 5.0
+
+
+class Samples:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_endpoint: Dict[str, List[Tuple[float, bool]]] = {}
+
+    def add(self, endpoint, seconds, ok):
+        with self.lock:
+            self.by_endpoint.setdefault(endpoint, []).append((seconds, ok))
+
+
+class VirtualUser:
+    def __init__(self, base_url, tag, number, samples: Samples, rng: random.Random):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.samples = samples
+        self.rng = rng
+        self.phone = f"+916{tag:03d}{number:06d}"
+        self.email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+        self.analysis_id: Optional[int] = None
+
+    def _request(self, endpoint, method, path, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=30, **kwargs)
+        except requests.RequestException:
+            self.samples.add(endpoint, time.perf_counter() - started, False)
+            return None
+        self.samples.add(endpoint, time.perf_counter() - started, response.status_code in expected)
+        return response if response.status_code in expected else None
+
+    def signup(self):
+        return self._request('signup', 'POST', '/api/auth/signup/', expected=(201,), json={
+            'phone': self.phone, 'email': self.email, 'first_name': 'Load', 'last_name': 'Test',
+            'password': PASSWORD, 'password2': PASSWORD, 'district': 'Mandya', 'taluk': 'Maddur',
+            'village': 'Kestur', 'land_size': 2.5, 'crops_grown': ['rice', 'tomato'], 'preferred_language': 'kn',
+        }) is not None
+
+    def login(self):
+        response = self._request('login', 'POST', '/api/auth/login/', json={'phone': self.phone, 'password': PASSWORD})
+        if response is not None:
+            self.session.headers['Authorization'] = f"Bearer {response.json()['data']['access_token']}"
+
+    def profile(self):
+        self._request('profile', 'GET', '/api/auth/profile/')
+
+    def weather(self):
+        self._request('weather', 'GET', '/api/weather/summary/', params={'city': 'Mandya'})
+
+    def analyze(self):
+        files = [('images', (f'leaf{i}.jpg', leaf_image(self.rng), 'image/jpeg'))
+                 for i in range(self.rng.randint(1, 3))]
+        response = self._request('analyze', 'POST', '/api/crop-doctor/analyze/', files=files,
+                                 data={'crop_type': 'tomato', 'language': 'kn'})
+        if response is not None:
+            self.analysis_id = response.json()['analysis']['id']
+
+    def report(self):
+        if self.analysis_id is None:
+            return self.analyze()
+        self._request('report', 'GET', f'/api/crop-doctor/report/{self.analysis_id}/')
+
+    def run(self, deadline):
+        if not self.signup():
+            return
+        self.login()
+        names, weights = zip(*ACTIONS)
+        while time.monotonic() < deadline:
+            getattr(self, self.rng.choices(names, weights)[0])()
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def summarize(samples: Samples, elapsed) -> Dict[str, dict]:
+    report = {}
+    for endpoint, values in sorted(samples.by_endpoint.items()):
+        ordered = sorted(seconds for seconds, _ in values)
+        errors = sum(1 for _, ok in values if not ok)
+        report[endpoint] = {
+            'requests': len(values),
+            'throughput': round(len(values) / elapsed, 2),
+            'p50_ms': round(_percentile(ordered, 0.50) * 1000, 1),
+            'p95_ms': round(_percentile(ordered, 0.95) * 1000, 1),
+            'p99_ms': round(_percentile(ordered, 0.99) * 1000, 1),
+            'error_rate': round(errors / len(values), 4),
+        }
+    return report
+
+
+def compare(report: Dict[str, dict], baseline: Dict[str, dict], tolerance) -> List[str]:
+    """
+    Human-readable regressions of ``report`` against ``baseline``; empty when
+    there are none. Medians may slow by ``tolerance``, tails (noisier over a
+    short run) by twice that.
+    """
+    regressions = []
+    for endpoint, base in baseline.items():
+        current = report.get(endpoint)
+        if current is None:
+            regressions.append(f"{endpoint}: no requests completed")
+            continue
+        for key, allowed in (('p50_ms', tolerance), ('p95_ms', 2 * tolerance)):
+            if current[key] > base[key] * (1 + allowed) and current[key] - base[key] > MIN_REGRESSION_MS:
+                regressions.append(f"{endpoint}: {key[:3]} {current[key]} ms vs {base[key]} ms")
+        if current['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{endpoint}: {current['throughput']} req/s vs {base['throughput']} req/s")
+        if current['error_rate'] > base['error_rate'] + 0.01:
+            regressions.append(f"{endpoint}: error rate {current['error_rate']:.2%} vs {base['error_rate']:.2%}")
+    return regressions
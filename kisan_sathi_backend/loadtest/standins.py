@@ -0,0 +1,158 @@
+"""
+Offline stand-ins for the services the backend calls out to, so a load
+test measures this code and not the network or a GPU:
+
+- ``OpenWeatherStandIn``, a local HTTP server answering the two OpenWeather
+  endpoints the weather summary uses, after a configurable delay
+- ``StandInModel``, a crop-doctor model with the Keras ``predict`` interface
+  returning random class probabilities after a per-image delay
+- ``leaf_image``, a small synthetic JPEG to upload for analysis
+- ``ThrowawayDatabases``, test databases and cache keys of the run's own,
+  so the rows, counters and cached users it creates never reach real ones
+"""
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+from PIL import Image, ImageDraw
+
+
+def _current_weather(city):
+    return {
+        'name': city, 'sys': {'country': 'IN'},
+        'main': {'temp': 27.4, 'humidity': 68},
+        'weather': [{'main': 'Clouds', 'description': 'scattered clouds', 'icon': '03d'}],
+        'wind': {'speed': 3.6}, 'rain': {'1h': 0.4},
+    }
+
+
+def _forecast(city):
+    start = int(time.time()) // 10800 * 10800
+    return {
+        'city': {'name': city, 'country': 'IN'},
+        'list': [
+            {
+                'dt': start + 10800 * i,
+                'main': {'temp_max': 30 + i % 4, 'temp_min': 21 + i % 3},
+                'weather': [{'main': ('Clear', 'Clouds', 'Rain')[i % 3], 'icon': ('01d', '03d', '10d')[i % 3]}],
+                'rain': {'3h': (0, 0, 4.2)[i % 3]},
+            }
+            for i in range(40)
+        ],
+    }
+
+
+class OpenWeatherStandIn:
+    """``with OpenWeatherStandIn(latency=0.08) as server:`` serves at ``server.base_url``."""
+
+    def __init__(self, latency=0.0, host='127.0.0.1'):
+        latency_ = latency
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path
+                city = parse_qs(url.query).get('q', ['Bengaluru'])[0]
+                if path.endswith('/weather'):
+                    payload = _current_weather(city)
+                elif path.endswith('/forecast'):
+                    payload = _forecast(city)
+                else:
+                    self.send_error(404)
+                    return
+                time.sleep(latency_)
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_port}/data/2.5"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ThrowawayDatabases:
+    """
+    ``with ThrowawayDatabases():`` runs against freshly migrated test
+    databases, created as ``manage.py test`` would (replicas mirror the
+    primary) and dropped afterwards, with every cache under its own key
+    prefix. SQLite gets a temporary file rather than the shared in-memory
+    database, which fails concurrent writers instead of making them wait.
+    """
+
+    def __enter__(self):
+        for alias in connections:
+            connection = connections[alias]
+            if connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    tempfile.gettempdir(), f"throwaway-{alias}-{os.getpid()}.sqlite3"
+                )
+        self._caches = override_settings(CACHES={
+            alias: {**config, 'KEY_PREFIX': f"{config.get('KEY_PREFIX', '')}-throwaway"}
+            for alias, config in settings.CACHES.items()
+        })
+        self._caches.enable()
+        try:
+            self._old_config = setup_databases(verbosity=0, interactive=False)
+        except BaseException:
+            self._caches.disable()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            teardown_databases(self._old_config, verbosity=0)
+        finally:
+            self._caches.disable()
+
+
+class StandInModel:
+    """Keras-style model: ``predict`` sleeps ``latency`` per image and returns softmax rows."""
+
+    def __init__(self, classes, latency=0.0, seed=0):
+        self.classes = classes
+        self.latency = latency
+        self.rng = np.random.default_rng(seed)
+        self.input_shape = (None, 224, 224, 3)
+
+    def predict(self, x, verbose=0):
+        time.sleep(self.latency * len(x))
+        logits = self.rng.normal(size=(len(x), self.classes)).astype(np.float32)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def leaf_image(rng: random.Random, size=320) -> bytes:
+    """A green leaf-ish JPEG with a few brown lesions, different every call."""
+    image = Image.new('RGB', (size, size), (rng.randint(60, 100), rng.randint(130, 180), rng.randint(50, 90)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(3, 12)):
+        x, y, r = rng.randint(0, size), rng.randint(0, size), rng.randint(4, 24)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=(rng.randint(90, 140), rng.randint(60, 90), 30))
+    out = BytesIO()
+    image.save(out, format='JPEG', quality=80)
+    return out.getvalue()
@@ -1,3 +1,23 @@
 from django.contrib import admin
+from .models import Commodity, Market, MandiPrice
 
-# Register your models here.
+
+@admin.register(Commodity)
+class CommodityAdmin(admin.ModelAdmin):
+    search_fields = ['name']
+
+
+@admin.register(Market)
+class MarketAdmin(admin.ModelAdmin):
+    list_display = ['name', 'district', 'state']
+    list_filter = ['state']
+    search_fields = ['name']
+
+
+@admin.register(MandiPrice)
+class MandiPriceAdmin(admin.ModelAdmin):
+    list_display = ['commodity', 'market', 'date', 'min_price', 'max_price', 'modal_price']
+    list_filter = ['commodity']
+    date_hierarchy = 'date'
+    raw_id_fields = ['market', 'commodity']
+    list_select_related = ['market', 'commodity']
@@ -0,0 +1,223 @@
+"""
+Vectorized price forecasting and anomaly detection over every
+(commodity, market) series.
+
+All series are loaded into one (series x days) float matrix with NaN for
+missing days. Seasonal week-of-year factors, trailing rolling statistics,
+z-scores and a damped linear-trend forecast are then computed with array
+operations across all series at once; nothing loops per series.
+"""
+import time
+import warnings
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Tuple
+
+import numpy as np
+from django.db import connection, transaction
+
+from .models import PriceAnomaly, PriceForecast
+
+
+WINDOW = 28
+Z_THRESHOLD = 3.5
+ANOMALY_LOOKBACK = 30
+HORIZON = 7
+TREND_DAMPING = 0.5
+MIN_SEASONAL_YEARS = 2
+
+
+@dataclass
+class Signals:
+    last_price: np.ndarray      # (S,) last observed price
+    rolling_mean: np.ndarray    # (S,) mean of observed prices in the trailing window
+    rolling_std: np.ndarray     # (S,)
+    seasonal_factor: np.ndarray  # (S,) factor for the last day
+    zscores: np.ndarray         # (S, ANOMALY_LOOKBACK) NaN where unobserved or undefined
+    expected: np.ndarray        # (S, ANOMALY_LOOKBACK) seasonal-adjusted expectation
+    forecast: np.ndarray        # (S, HORIZON)
+
+
+def _week_of_year(start: date, days: int) -> np.ndarray:
+    dates = np.datetime64(start, 'D') + np.arange(days)
+    years = dates.astype('datetime64[Y]')
+    return np.minimum((dates - years.astype('datetime64[D]')).astype(np.int64) // 7, 51)
+
+
+def _seasonal_factors(values: np.ndarray, weeks: np.ndarray) -> np.ndarray:
+    """(S, 52) ratio of each week-of-year mean to the series mean; 1 where unknown."""
+    series_mean = np.nanmean(values, axis=1, keepdims=True)
+    factors = np.ones((values.shape[0], 52))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for week in range(52):
+            columns = values[:, weeks == week]
+            observed = (~np.isnan(columns)).sum(axis=1)
+            week_mean = np.nansum(columns, axis=1) / np.maximum(observed, 1)
+            factors[:, week] = np.where(observed > 0, week_mean / series_mean[:, 0], 1.0)
+    return np.where(np.isfinite(factors) & (factors > 0), factors, 1.0)
+
+
+def compute_signals(values: np.ndarray, start: date) -> Signals:
+    """``values`` is (series x days) modal prices starting at ``start`` with NaN gaps."""
+    series, days = values.shape
+    weeks = _week_of_year(start, days + HORIZON)
+    if days >= 365 * MIN_SEASONAL_YEARS:
+        factors = _seasonal_factors(values, weeks[:days])
+    else:
+        factors = np.ones((series, 52))
+    rows = np.arange(series)[:, None]
+
+    # Only the tail is needed for rolling statistics and the forecast
+    tail = min(days, WINDOW + ANOMALY_LOOKBACK)
+    raw = values[:, -tail:]
+    seasonal = factors[rows, weeks[days - tail:days]]
+    adjusted = raw / seasonal
+
+    observed = ~np.isnan(adjusted)
+    zero_filled = np.where(observed, adjusted, 0.0)
+    pad = np.zeros((series, 1))
+    csum = np.concatenate([pad, np.cumsum(zero_filled, axis=1)], axis=1)
+    csq = np.concatenate([pad, np.cumsum(zero_filled ** 2, axis=1)], axis=1)
+    ccount = np.concatenate([pad, np.cumsum(observed, axis=1)], axis=1)
+
+    # Trailing window (t - WINDOW, t - 1] for each of the last ANOMALY_LOOKBACK days
+    lookback = min(ANOMALY_LOOKBACK, tail)
+    ends = np.arange(tail - lookback, tail)
+    starts = np.maximum(ends - WINDOW, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        count = ccount[:, ends] - ccount[:, starts]
+        mean = (csum[:, ends] - csum[:, starts]) / count
+        var = (csq[:, ends] - csq[:, starts]) / count - mean ** 2
+        std = np.sqrt(np.maximum(var, 0.0))
+        zscores = (adjusted[:, ends] - mean) / std
+    zscores[(count < WINDOW // 2) | (std <= 0)] = np.nan
+    expected = mean * seasonal[:, ends]
+
+    # Last observation and forward-filled tail for the trend fit
+    last_index = np.where(observed, np.arange(tail), -1)
+    np.maximum.accumulate(last_index, axis=1, out=last_index)
+    filled = np.where(last_index >= 0, adjusted[rows, np.maximum(last_index, 0)], np.nan)
+    last_price = raw[rows[:, 0], np.maximum(last_index[:, -1], 0)]
+    last_price = np.where(last_index[:, -1] >= 0, last_price, np.nan)
+
+    window = filled[:, -WINDOW:]
+    valid = ~np.isnan(window)
+    t = np.arange(window.shape[1], dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n = valid.sum(axis=1)
+        t_mean = (valid * t).sum(axis=1) / n
+        x_mean = np.where(valid, window, 0.0).sum(axis=1) / n
+        dt = np.where(valid, t - t_mean[:, None], 0.0)
+        slope = (dt * np.where(valid, window - x_mean[:, None], 0.0)).sum(axis=1) / (dt ** 2).sum(axis=1)
+    slope = np.nan_to_num(slope)
+    # The fitted level today uses the full slope; only the extrapolation is damped
+    level = x_mean + slope * (t[-1] - t_mean)
+    steps = np.arange(1, HORIZON + 1)
+    forecast = (level[:, None] + slope[:, None] * TREND_DAMPING * steps) * factors[rows, weeks[days:days + HORIZON]]
+
+    raw_window = raw[:, -WINDOW:]
+    with warnings.catch_warnings():
+        # Series with no price in the window get NaN, dropped when stored
+        warnings.simplefilter('ignore', RuntimeWarning)
+        rolling_mean = np.nanmean(raw_window, axis=1)
+        rolling_std = np.nanstd(raw_window, axis=1)
+
+    return Signals(
+        last_price=last_price,
+        rolling_mean=rolling_mean,
+        rolling_std=rolling_std,
+        seasonal_factor=factors[:, weeks[days - 1]],
+        zscores=zscores,
+        expected=expected,
+        forecast=np.maximum(forecast, 0.0),
+    )
+
+
+def load_series(days: int) -> Tuple[List[Tuple[int, int]], np.ndarray, date]:
+    """Return series keys (commodity id, market id), the price matrix and its start date."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT MAX(date) FROM mandi_prices")
+        newest = cursor.fetchone()[0]
+        if newest is None:
+            return [], np.empty((0, 0)), date.today()
+        end = date.fromisoformat(str(newest))
+        start = end - timedelta(days=days - 1)
+        cursor.execute(
+            "SELECT DISTINCT commodity_id, market_id FROM mandi_prices WHERE date >= %s ORDER BY 1, 2",
+            [start.isoformat()],
+        )
+        keys = [tuple(row) for row in cursor.fetchall()]
+        position = {key: i for i, key in enumerate(keys)}
+        values = np.full((len(keys), days), np.nan)
+
+        columns = {}
+        cursor.execute(
+            "SELECT commodity_id, market_id, date, modal_price FROM mandi_prices WHERE date >= %s",
+            [start.isoformat()],
+        )
+        while True:
+            rows = cursor.fetchmany(50000)
+            if not rows:
+                break
+            index, column, price = [], [], []
+            for commodity_id, market_id, day, modal_price in rows:
+                if day not in columns:
+                    columns[day] = (date.fromisoformat(str(day)) - start).days
+                index.append(position[(commodity_id, market_id)])
+                column.append(columns[day])
+                price.append(modal_price)
+            values[index, column] = price
+    return keys, values, start
+
+
+def run_forecast_job(days: int = 3 * 365) -> dict:
+    """Recompute and store forecasts and recent anomalies for all series."""
+    timings = {}
+    started = time.perf_counter()
+    keys, values, start = load_series(days)
+    timings['load'] = time.perf_counter() - started
+    if not keys:
+        return {'series': 0, 'anomalies': 0, **timings}
+
+    started = time.perf_counter()
+    signals = compute_signals(values, start)
+    timings['compute'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    as_of = start + timedelta(days=days - 1)
+    has_data = ~np.isnan(signals.last_price)
+    forecasts = [
+        PriceForecast(
+            commodity_id=commodity_id, market_id=market_id, as_of=as_of,
+            last_price=int(signals.last_price[i]),
+            rolling_mean=float(np.nan_to_num(signals.rolling_mean[i])),
+            rolling_std=float(np.nan_to_num(signals.rolling_std[i])),
+            seasonal_factor=round(float(signals.seasonal_factor[i]), 4),
+            zscore=None if np.isnan(signals.zscores[i, -1]) else round(float(signals.zscores[i, -1]), 2),
+            forecast=[int(round(p)) for p in np.nan_to_num(signals.forecast[i])],
+        )
+        for i, (commodity_id, market_id) in enumerate(keys) if has_data[i]
+    ]
+
+    lookback = signals.zscores.shape[1]
+    series_index, offsets = np.nonzero(np.abs(np.nan_to_num(signals.zscores)) > Z_THRESHOLD)
+    tail_values = values[:, -lookback:]
+    anomalies = [
+        PriceAnomaly(
+            commodity_id=keys[i][0], market_id=keys[i][1],
+            date=as_of - timedelta(days=lookback - 1 - j),
+            price=int(tail_values[i, j]),
+            expected=round(float(signals.expected[i, j]), 1),
+            zscore=round(float(signals.zscores[i, j]), 2),
+            kind=PriceAnomaly.SPIKE if signals.zscores[i, j] > 0 else PriceAnomaly.CRASH,
+        )
+        for i, j in zip(series_index.tolist(), offsets.tolist())
+    ]
+
+    with transaction.atomic():
+        PriceForecast.objects.all().delete()
+        PriceForecast.objects.bulk_create(forecasts, batch_size=2000)
+        PriceAnomaly.objects.filter(date__gte=as_of - timedelta(days=lookback - 1)).delete()
+        PriceAnomaly.objects.bulk_create(anomalies, batch_size=2000)
+    timings['store'] = time.perf_counter() - started
+    return {'series': len(forecasts), 'anomalies': len(anomalies), **timings}
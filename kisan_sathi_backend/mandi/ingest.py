@@ -0,0 +1,216 @@
+"""
+Streaming ingest of Agmarknet-style daily price dumps.
+
+Accepts data.gov.in CSV exports, JSON Lines, and JSON documents that are
+an array or hold a ``records`` array (streamed with ijson when installed).
+Rows are parsed lazily, deduplicated on (market, commodity, date) within
+each batch and upserted with one ``INSERT ... ON CONFLICT DO UPDATE``
+executemany per batch (SQLite and PostgreSQL share the syntax), so memory
+stays constant regardless of file size and no model instances are built
+per row.
+"""
+import csv
+import io
+import json
+import math
+from itertools import chain
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import connection, transaction
+
+from .models import Commodity, Market
+
+
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d-%b-%Y')
+# Prices are PositiveIntegerFields
+MAX_PRICE = 2147483647
+
+
+@dataclass
+class IngestResult:
+    rows: int = 0
+    upserted: int = 0
+    skipped: int = 0
+    # (commodity_id, market_id) -> earliest date touched; used to refresh rollups
+    touched: Dict[Tuple[int, int], date] = field(default_factory=dict)
+
+    @property
+    def commodity_since(self) -> Dict[int, date]:
+        """Earliest touched date per commodity."""
+        since: Dict[int, date] = {}
+        for (commodity_id, _), day in self.touched.items():
+            if commodity_id not in since or day < since[commodity_id]:
+                since[commodity_id] = day
+        return since
+
+
+def _normalise_key(key: str) -> str:
+    return (key or '').strip().lower().replace('_x0020_', '_').replace(' ', '_')
+
+
+def _normalise(row: dict) -> Dict[str, str]:
+    return {_normalise_key(k): ('' if v is None else str(v).strip()) for k, v in row.items()}
+
+
+def iter_csv(stream) -> Iterator[Dict[str, str]]:
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(stream):
+        yield _normalise(row)
+
+
+def iter_jsonl(stream) -> Iterator[Dict[str, str]]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield _normalise(json.loads(line))
+
+
+def iter_json(stream) -> Iterator[Dict[str, str]]:
+    try:
+        import ijson  # type: ignore
+    except ImportError:
+        # Without ijson the document has to be loaded whole
+        payload = json.load(stream)
+        records = payload.get('records', []) if isinstance(payload, dict) else payload
+    else:
+        events = ijson.parse(stream)
+        first = next(events, None)
+        if first is None:
+            return
+        # A bare top-level array, or the data.gov.in {"records": [...]} envelope
+        prefix = 'item' if first[1] == 'start_array' else 'records.item'
+        records = ijson.items(chain([first], events), prefix)
+    for record in records:
+        yield _normalise(record)
+
+
+def iter_file(stream, filename: str) -> Iterator[Dict[str, str]]:
+    name = filename.lower()
+    if name.endswith('.jsonl'):
+        return iter_jsonl(io.TextIOWrapper(stream, encoding='utf-8'))
+    if name.endswith('.json'):
+        return iter_json(stream)
+    return iter_csv(stream)
+
+
+_DATE_CACHE: Dict[str, Optional[date]] = {}
+
+
+def _parse_date(value: str) -> Optional[date]:
+    # Dumps repeat a handful of dates thousands of times; strptime is slow
+    if value not in _DATE_CACHE:
+        if len(_DATE_CACHE) > 10000:
+            _DATE_CACHE.clear()
+        _DATE_CACHE[value] = _strptime(value)
+    return _DATE_CACHE[value]
+
+
+def _strptime(value: str) -> Optional[date]:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_price(value: str) -> Optional[int]:
+    try:
+        price = float(value)
+    except ValueError:
+        return None
+    # "inf"/"nan" parse as floats; negative or oversized prices would fail the
+    # column's constraint at insert and abort the whole batch
+    if not math.isfinite(price) or not 0 <= round(price) <= MAX_PRICE:
+        return None
+    return round(price)
+
+
+class _Lookups:
+    """Name -> id caches for the small commodity and market tables."""
+
+    def __init__(self):
+        self.commodities = dict(Commodity.objects.values_list('name', 'id'))
+        self.markets = {
+            (state, district, name): pk
+            for pk, state, district, name in Market.objects.values_list('id', 'state', 'district', 'name')
+        }
+
+    def commodity(self, name):
+        if name not in self.commodities:
+            self.commodities[name] = Commodity.objects.get_or_create(name=name)[0].id
+        return self.commodities[name]
+
+    def market(self, state, district, name):
+        key = (state, district, name)
+        if key not in self.markets:
+            self.markets[key] = Market.objects.get_or_create(state=state, district=district, name=name)[0].id
+        return self.markets[key]
+
+
+_UPSERT_SQL = (
+    "INSERT INTO mandi_prices (market_id, commodity_id, date, min_price, max_price, modal_price) "
+    "VALUES (%s, %s, %s, %s, %s, %s) "
+    "ON CONFLICT (market_id, commodity_id, date) DO UPDATE SET "
+    "min_price = excluded.min_price, max_price = excluded.max_price, modal_price = excluded.modal_price"
+)
+
+
+def _flush(batch: Dict[Tuple[int, int, date], List[int]], result: IngestResult):
+    if not batch:
+        return
+    params = [
+        (market_id, commodity_id, day.isoformat(), min_price, max_price, modal_price)
+        for (market_id, commodity_id, day), (min_price, max_price, modal_price, _) in batch.items()
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(_UPSERT_SQL, params)
+    result.upserted += len(batch)
+    for market_id, commodity_id, day in batch:
+        key = (commodity_id, market_id)
+        if key not in result.touched or day < result.touched[key]:
+            result.touched[key] = day
+    batch.clear()
+
+
+def ingest_rows(rows: Iterable[Dict[str, str]], batch_size: int = 10000) -> IngestResult:
+    """
+    Upsert price rows. Several varieties of one commodity reported by the
+    same market on the same day are merged: the widest min/max range and the
+    mean modal price.
+    """
+    result = IngestResult()
+    lookups = _Lookups()
+    # key -> [min, max, modal, varieties merged]
+    batch: Dict[Tuple[int, int, date], List[int]] = {}
+
+    for row in rows:
+        result.rows += 1
+        day = _parse_date(row.get('arrival_date', ''))
+        prices = [_parse_price(row.get(k, '')) for k in ('min_price', 'max_price', 'modal_price')]
+        if not (day and row.get('commodity') and row.get('market') and all(p is not None for p in prices)):
+            result.skipped += 1
+            continue
+
+        market_id = lookups.market(row.get('state', ''), row.get('district', ''), row['market'])
+        key = (market_id, lookups.commodity(row['commodity']), day)
+        min_price, max_price, modal_price = prices
+
+        existing = batch.get(key)
+        if existing is None:
+            batch[key] = [min_price, max_price, modal_price, 1]
+        else:
+            count = existing[3]
+            existing[0] = min(existing[0], min_price)
+            existing[1] = max(existing[1], max_price)
+            existing[2] = round((existing[2] * count + modal_price) / (count + 1))
+            existing[3] = count + 1
+
+        if len(batch) >= batch_size:
+            _flush(batch, result)
+
+    _flush(batch, result)
+    return result
@@ -0,0 +1,39 @@
+import time
+from datetime import date
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from mandi.forecast import Z_THRESHOLD, compute_signals
+
+
+class Command(BaseCommand):
+    help = "Time the forecast/anomaly computation on synthetic seasonal price series"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--series', type=int, default=10000)
+        parser.add_argument('--days', type=int, default=3 * 365)
+        parser.add_argument('--missing', type=float, default=0.3, help="Fraction of days without a report")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        series, days = options['series'], options['days']
+        t = np.arange(days)
+        base = rng.uniform(800, 8000, size=(series, 1))
+        season = 1 + rng.uniform(0.05, 0.3, size=(series, 1)) * np.sin(2 * np.pi * (t + rng.integers(0, 365, size=(series, 1))) / 365)
+        walk = np.cumsum(rng.normal(0, 0.005, size=(series, days)), axis=1)
+        noise = rng.normal(1, 0.03, size=(series, days))
+        values = np.round(base * season * np.exp(walk) * noise)
+        values[rng.random((series, days)) < options['missing']] = np.nan
+        shocks = rng.random((series, days)) < 0.001
+        values[shocks] *= rng.choice([0.4, 2.0], size=shocks.sum())
+
+        started = time.perf_counter()
+        signals = compute_signals(values, date(2022, 1, 1))
+        elapsed = time.perf_counter() - started
+        flagged = int((np.abs(np.nan_to_num(signals.zscores)) > Z_THRESHOLD).sum())
+        self.stdout.write(self.style.SUCCESS(
+            f"{series} series x {days} days: {elapsed:.2f}s ({flagged} anomalies in the last "
+            f"{signals.zscores.shape[1]} days)"
+        ))
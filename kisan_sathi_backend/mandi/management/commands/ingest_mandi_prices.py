@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from live.events import mandi_prices_updated
+from mandi.ingest import ingest_rows, iter_file
+from mandi.models import Commodity
+from mandi.rollups import refresh_rollups, rollup_version
+from mandi.spatial import DATA_VERSION
+from stats.counters import increment
+
+
+class Command(BaseCommand):
+    help = "Stream Agmarknet-style mandi price dumps (CSV, JSON or JSON Lines) into the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="Files to ingest, in order")
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--skip-rollups', action='store_true',
+                            help="Do not refresh price rollups (run rebuild_mandi_rollups later)")
+
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            started = time.monotonic()
+            try:
+                with open(path, 'rb') as stream:
+                    result = ingest_rows(iter_file(stream, path), options['batch_size'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"{path}: {e}")
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"{path}: {result.rows} rows in {elapsed:.1f}s "
+                f"({result.upserted} upserted, {result.skipped} skipped)"
+            ))
+
+            if not result.touched:
+                continue
+            increment(DATA_VERSION)
+            if not options['skip_rollups']:
+                started = time.monotonic()
+                written = refresh_rollups(result.commodity_since)
+                self.stdout.write(f"Refreshed {written} rollups in {time.monotonic() - started:.1f}s")
+            names = dict(Commodity.objects.filter(pk__in=result.commodity_since).values_list('pk', 'name'))
+            mandi_prices_updated(names, result.commodity_since, rollup_version())
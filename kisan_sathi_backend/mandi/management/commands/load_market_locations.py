@@ -0,0 +1,36 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mandi.models import Market
+from mandi.spatial import DATA_VERSION
+from stats.counters import increment
+
+
+class Command(BaseCommand):
+    help = "Load market coordinates from a CSV with state, district, market, latitude, longitude columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.DictReader(f))
+        except OSError as e:
+            raise CommandError(str(e))
+
+        updated = 0
+        for row in rows:
+            try:
+                lat, lon = float(row['latitude']), float(row['longitude'])
+            except (KeyError, ValueError):
+                self.stderr.write(f"Skipping {row.get('market')}: invalid coordinates")
+                continue
+            Market.objects.update_or_create(
+                state=row.get('state', ''), district=row.get('district', ''), name=row['market'],
+                defaults={'latitude': lat, 'longitude': lon},
+            )
+            updated += 1
+        increment(DATA_VERSION)
+        self.stdout.write(self.style.SUCCESS(f"Located {updated} markets"))
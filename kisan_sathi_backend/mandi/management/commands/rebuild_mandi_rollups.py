@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mandi.models import Commodity
+from mandi.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild mandi price rollups from scratch (all commodities or the ones named)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('commodities', nargs='*', help="Commodity names (default: all)")
+
+    def handle(self, *args, **options):
+        ids = None
+        if options['commodities']:
+            found = dict(Commodity.objects.filter(name__in=options['commodities']).values_list('name', 'id'))
+            unknown = [name for name in options['commodities'] if name not in found]
+            if unknown:
+                raise CommandError(f"Unknown commodities: {', '.join(unknown)}")
+            ids = list(found.values())
+        started = time.monotonic()
+        written = refresh_rollups(commodity_ids=ids)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollups in {time.monotonic() - started:.1f}s"))
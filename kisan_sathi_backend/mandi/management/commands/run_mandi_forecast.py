@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from mandi.forecast import run_forecast_job
+
+
+class Command(BaseCommand):
+    help = "Recompute mandi price forecasts and recent price anomalies for every commodity and market"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=3 * 365, help="History to load (default: 3 years)")
+
+    def handle(self, *args, **options):
+        result = run_forecast_job(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['series']} forecasts, {result['anomalies']} anomalies "
+            f"(load {result.get('load', 0):.1f}s, compute {result.get('compute', 0):.1f}s, "
+            f"store {result.get('store', 0):.1f}s)"
+        ))
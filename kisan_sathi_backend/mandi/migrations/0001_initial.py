@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Commodity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'commodities',
+                'db_table': 'mandi_commodities',
+            },
+        ),
+        migrations.CreateModel(
+            name='MandiPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('min_price', models.PositiveIntegerField()),
+                ('max_price', models.PositiveIntegerField()),
+                ('modal_price', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'mandi_prices',
+            },
+        ),
+        migrations.CreateModel(
+            name='Market',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(max_length=100)),
+                ('district', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=150)),
+            ],
+            options={
+                'db_table': 'mandi_markets',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='market',
+            constraint=models.UniqueConstraint(fields=('state', 'district', 'name'), name='mandi_market_unique'),
+        ),
+        migrations.AddField(
+            model_name='mandiprice',
+            name='commodity',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prices', to='mandi.commodity'),
+        ),
+        migrations.AddField(
+            model_name='mandiprice',
+            name='market',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prices', to='mandi.market'),
+        ),
+        migrations.AddIndex(
+            model_name='mandiprice',
+            index=models.Index(fields=['commodity', 'date'], name='mandi_price_commodity_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='mandiprice',
+            constraint=models.UniqueConstraint(fields=('market', 'commodity', 'date'), name='mandi_price_unique'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mandi', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('district', models.CharField(blank=True, max_length=100)),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('min_price', models.PositiveIntegerField()),
+                ('max_price', models.PositiveIntegerField()),
+                ('avg_price', models.PositiveIntegerField()),
+                ('samples', models.PositiveIntegerField()),
+                ('change_pct', models.FloatField(blank=True, null=True)),
+                ('trend', models.CharField(blank=True, max_length=6)),
+                ('commodity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='mandi.commodity')),
+                ('market', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='mandi.market')),
+            ],
+            options={
+                'db_table': 'mandi_price_rollups',
+                'indexes': [models.Index(fields=['period', 'district', 'market', 'commodity', 'period_start'], name='mandi_rollup_lookup'), models.Index(fields=['commodity', 'period', 'period_start'], name='mandi_rollup_refresh')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mandi', '0002_price_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='market',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='market',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mandi', '0003_market_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('last_price', models.PositiveIntegerField()),
+                ('rolling_mean', models.FloatField()),
+                ('rolling_std', models.FloatField()),
+                ('seasonal_factor', models.FloatField()),
+                ('zscore', models.FloatField(blank=True, null=True)),
+                ('forecast', models.JSONField(default=list)),
+                ('commodity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='mandi.commodity')),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='mandi.market')),
+            ],
+            options={
+                'db_table': 'mandi_price_forecasts',
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('price', models.PositiveIntegerField()),
+                ('expected', models.FloatField()),
+                ('zscore', models.FloatField()),
+                ('kind', models.CharField(choices=[('spike', 'Spike'), ('crash', 'Crash')], max_length=5)),
+                ('commodity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to='mandi.commodity')),
+                ('market', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomalies', to='mandi.market')),
+            ],
+            options={
+                'db_table': 'mandi_price_anomalies',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='priceforecast',
+            constraint=models.UniqueConstraint(fields=('commodity', 'market'), name='mandi_forecast_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='priceanomaly',
+            index=models.Index(fields=['commodity', '-date'], name='mandi_anomaly_recent'),
+        ),
+    ]
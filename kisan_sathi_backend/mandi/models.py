@@ -1,3 +1,137 @@
 from django.db import models
 
-# Create your models here.
+
+class Commodity(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        db_table = 'mandi_commodities'
+        verbose_name_plural = 'commodities'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Market(models.Model):
+    state = models.CharField(max_length=100)
+    district = models.CharField(max_length=100)
+    name = models.CharField(max_length=150)
+    # Loaded separately with `manage.py load_market_locations`
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'mandi_markets'
+        constraints = [
+            models.UniqueConstraint(fields=['state', 'district', 'name'], name='mandi_market_unique'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name}, {self.district}"
+
+
+class MandiPrice(models.Model):
+    """One row per market, commodity and day. Prices are whole rupees per quintal."""
+
+    market = models.ForeignKey(Market, related_name='prices', on_delete=models.CASCADE)
+    commodity = models.ForeignKey(Commodity, related_name='prices', on_delete=models.CASCADE)
+    date = models.DateField()
+    min_price = models.PositiveIntegerField()
+    max_price = models.PositiveIntegerField()
+    modal_price = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = 'mandi_prices'
+        constraints = [
+            models.UniqueConstraint(fields=['market', 'commodity', 'date'], name='mandi_price_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['commodity', 'date'], name='mandi_price_commodity_date'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.commodity_id}@{self.market_id} {self.date}: {self.modal_price}"
+
+
+class PriceRollup(models.Model):
+    """
+    Precomputed price summary for one commodity over a day, week or month.
+
+    Scope is a single market, a whole district (``market`` null) or every
+    market (``market`` null and ``district`` empty). Maintained by
+    ``mandi.rollups``; never written by request handlers.
+    """
+
+    DAY = 'day'
+    WEEK = 'week'
+    MONTH = 'month'
+    PERIODS = [(DAY, 'Day'), (WEEK, 'Week'), (MONTH, 'Month')]
+
+    commodity = models.ForeignKey(Commodity, related_name='rollups', on_delete=models.CASCADE)
+    district = models.CharField(max_length=100, blank=True)
+    market = models.ForeignKey(Market, related_name='rollups', on_delete=models.CASCADE, null=True, blank=True)
+    period = models.CharField(max_length=5, choices=PERIODS)
+    period_start = models.DateField()
+    min_price = models.PositiveIntegerField()
+    max_price = models.PositiveIntegerField()
+    avg_price = models.PositiveIntegerField()
+    samples = models.PositiveIntegerField()
+    change_pct = models.FloatField(null=True, blank=True)
+    trend = models.CharField(max_length=6, blank=True)
+
+    class Meta:
+        db_table = 'mandi_price_rollups'
+        indexes = [
+            models.Index(
+                fields=['period', 'district', 'market', 'commodity', 'period_start'],
+                name='mandi_rollup_lookup',
+            ),
+            models.Index(fields=['commodity', 'period', 'period_start'], name='mandi_rollup_refresh'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.commodity_id} {self.period} {self.period_start}: {self.avg_price}"
+
+
+class PriceForecast(models.Model):
+    """Latest rolling statistics, anomaly score and short-horizon forecast for one market's commodity series."""
+
+    commodity = models.ForeignKey(Commodity, related_name='forecasts', on_delete=models.CASCADE)
+    market = models.ForeignKey(Market, related_name='forecasts', on_delete=models.CASCADE)
+    as_of = models.DateField()
+    last_price = models.PositiveIntegerField()
+    rolling_mean = models.FloatField()
+    rolling_std = models.FloatField()
+    seasonal_factor = models.FloatField()
+    zscore = models.FloatField(null=True, blank=True)
+    # Modal price forecasts for as_of + 1 .. as_of + horizon days
+    forecast = models.JSONField(default=list)
+
+    class Meta:
+        db_table = 'mandi_price_forecasts'
+        constraints = [
+            models.UniqueConstraint(fields=['commodity', 'market'], name='mandi_forecast_unique'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.commodity_id}@{self.market_id} as of {self.as_of}"
+
+
+class PriceAnomaly(models.Model):
+    SPIKE = 'spike'
+    CRASH = 'crash'
+
+    commodity = models.ForeignKey(Commodity, related_name='anomalies', on_delete=models.CASCADE)
+    market = models.ForeignKey(Market, related_name='anomalies', on_delete=models.CASCADE)
+    date = models.DateField()
+    price = models.PositiveIntegerField()
+    expected = models.FloatField()
+    zscore = models.FloatField()
+    kind = models.CharField(max_length=5, choices=[(SPIKE, 'Spike'), (CRASH, 'Crash')])
+
+    class Meta:
+        db_table = 'mandi_price_anomalies'
+        indexes = [models.Index(fields=['commodity', '-date'], name='mandi_anomaly_recent')]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.commodity_id}@{self.market_id} {self.date}"
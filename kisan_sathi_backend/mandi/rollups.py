@@ -0,0 +1,179 @@
+"""
+Daily/weekly/monthly price rollups per commodity at market, district and
+all-market scope.
+
+``refresh_rollups`` recomputes only the periods touched by an ingest: it
+loads the affected raw rows of one commodity at a time into NumPy arrays,
+aggregates every (scope, period) group with ufunc reductions, derives the
+period-over-period percent change and trend for all series at once, and
+replaces the affected rollup rows in a single transaction.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from django.db import connection, transaction
+
+from stats.counters import current, increment
+
+from .models import Commodity, PriceRollup
+
+
+ROLLUP_VERSION = 'mandi.rollup_version'
+TREND_THRESHOLD_PCT = 1.0
+
+_ALL = -1  # district code / market id used for aggregate scopes
+
+_INSERT_SQL = (
+    "INSERT INTO mandi_price_rollups (commodity_id, district, market_id, period, period_start, "
+    "min_price, max_price, avg_price, samples, change_pct, trend) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+)
+
+
+def rollup_version() -> int:
+    """Bumped after every refresh; part of the mandi API's ETag."""
+    return current(ROLLUP_VERSION)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _period_starts(days: np.ndarray, period: str) -> np.ndarray:
+    if period == PriceRollup.DAY:
+        return days
+    if period == PriceRollup.WEEK:
+        # 1970-01-01 was a Thursday; shift so Monday is 0
+        ordinals = days.astype(np.int64)
+        return (ordinals - (ordinals + 3) % 7).astype('datetime64[D]')
+    return days.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def _load(commodity_id: int, floor: Optional[date]):
+    sql = (
+        "SELECT p.market_id, m.district, p.date, p.min_price, p.max_price, p.modal_price "
+        "FROM mandi_prices p JOIN mandi_markets m ON m.id = p.market_id WHERE p.commodity_id = %s"
+    )
+    params = [commodity_id]
+    if floor is not None:
+        sql += " AND p.date >= %s"
+        params.append(floor.isoformat())
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    if not rows:
+        return None
+    markets, districts, days, mins, maxs, modals = zip(*rows)
+    district_names, district_codes = np.unique(np.array(districts, dtype=object).astype(str), return_inverse=True)
+    return {
+        'market': np.array(markets, dtype=np.int64),
+        'district': district_codes.astype(np.int64),
+        'district_names': district_names,
+        'day': np.array([str(d) for d in days], dtype='datetime64[D]'),
+        'min': np.array(mins, dtype=np.int64),
+        'max': np.array(maxs, dtype=np.int64),
+        'modal': np.array(modals, dtype=np.float64),
+    }
+
+
+def _aggregate(data, period: str):
+    """Return sorted group keys (district, market, period start) and per-group stats for all scopes."""
+    starts = _period_starts(data['day'], period).astype(np.int64)
+    n = len(starts)
+    all_codes = np.full(n, _ALL, dtype=np.int64)
+    keys = np.concatenate([
+        np.column_stack([data['district'], data['market'], starts]),
+        np.column_stack([data['district'], all_codes, starts]),
+        np.column_stack([all_codes, all_codes, starts]),
+    ])
+    mins = np.tile(data['min'], 3)
+    maxs = np.tile(data['max'], 3)
+    modals = np.tile(data['modal'], 3)
+
+    groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    size = len(groups)
+    group_min = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(group_min, inverse, mins)
+    group_max = np.zeros(size, dtype=np.int64)
+    np.maximum.at(group_max, inverse, maxs)
+    samples = np.bincount(inverse, minlength=size)
+    avg = np.bincount(inverse, weights=modals, minlength=size) / samples
+
+    # Groups are sorted by (district, market, start), so each series is contiguous
+    change = np.full(size, np.nan)
+    same_series = (groups[1:, 0] == groups[:-1, 0]) & (groups[1:, 1] == groups[:-1, 1])
+    # A period after a zero average has no percent change
+    comparable = same_series & (avg[:-1] > 0)
+    previous, following = avg[:-1][comparable], avg[1:][comparable]
+    change[1:][comparable] = (following - previous) / previous * 100.0
+    trend = np.where(change > TREND_THRESHOLD_PCT, 'up', np.where(change < -TREND_THRESHOLD_PCT, 'down', 'stable'))
+    trend = np.where(np.isnan(change), '', trend)
+    return groups, group_min, group_max, np.rint(avg).astype(np.int64), samples, change, trend
+
+
+def _refresh_commodity(commodity_id: int, since: Optional[date]) -> int:
+    # Load one extra month so the first rewritten period has a predecessor
+    floor = None
+    if since is not None:
+        floor = _month_start(_month_start(since) - timedelta(days=1))
+    data = _load(commodity_id, floor)
+
+    cutoffs = {
+        PriceRollup.DAY: since,
+        PriceRollup.WEEK: since and _week_start(since),
+        PriceRollup.MONTH: since and _month_start(since),
+    }
+    written = 0
+    with transaction.atomic():
+        for period, cutoff in cutoffs.items():
+            stale = PriceRollup.objects.filter(commodity_id=commodity_id, period=period)
+            if cutoff is not None:
+                stale = stale.filter(period_start__gte=cutoff)
+            stale.delete()
+            if data is None:
+                continue
+
+            groups, mins, maxs, avgs, samples, change, trend = _aggregate(data, period)
+            keep = np.ones(len(groups), dtype=bool)
+            if cutoff is not None:
+                keep = groups[:, 2] >= np.datetime64(cutoff, 'D').astype(np.int64)
+            names = data['district_names']
+            params = [
+                (
+                    commodity_id,
+                    names[d] if d != _ALL else '',
+                    int(m) if m != _ALL else None,
+                    period,
+                    str(np.datetime64(int(start), 'D')),
+                    int(lo), int(hi), int(avg), int(count),
+                    None if np.isnan(pct) else round(float(pct), 2),
+                    str(direction),
+                )
+                for (d, m, start), lo, hi, avg, count, pct, direction in zip(
+                    groups[keep], mins[keep], maxs[keep], avgs[keep], samples[keep], change[keep], trend[keep]
+                )
+            ]
+            with connection.cursor() as cursor:
+                cursor.executemany(_INSERT_SQL, params)
+            written += len(params)
+    return written
+
+
+def refresh_rollups(touched: Dict[int, date] = None, commodity_ids: Iterable[int] = None) -> int:
+    """
+    Recompute rollups. ``touched`` maps commodity id to the earliest date
+    changed by an ingest; without it every commodity is rebuilt from scratch.
+    Returns the number of rollup rows written.
+    """
+    if touched is None:
+        ids = Commodity.objects.values_list('id', flat=True) if commodity_ids is None else commodity_ids
+        touched = {commodity_id: None for commodity_id in ids}
+    written = sum(_refresh_commodity(commodity_id, since) for commodity_id, since in touched.items())
+    increment(ROLLUP_VERSION)
+    return written
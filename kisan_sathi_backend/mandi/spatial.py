@@ -0,0 +1,153 @@
+"""
+In-memory spatial index over mandi markets for nearest best-price lookups.
+
+Markets are bucketed into a lat/lon grid so a radius query only computes
+distances for markets in the few cells overlapping its bounding box. The
+index also holds the latest modal price per (commodity, market). Each
+process rebuilds it lazily when the mandi data version changes (bumped by
+ingest and by ``load_market_locations``).
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from stats.counters import current
+
+from .models import Market
+
+
+DATA_VERSION = 'mandi.data_version'
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+class MarketIndex:
+    def __init__(self, cell_degrees: float = 0.25):
+        self.cell = cell_degrees
+        markets = list(
+            Market.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            .values_list('id', 'name', 'district', 'latitude', 'longitude')
+        )
+        self.ids = np.array([m[0] for m in markets], dtype=np.int64)
+        self.names = [(m[1], m[2]) for m in markets]
+        lat = np.array([m[3] for m in markets], dtype=np.float64)
+        lon = np.array([m[4] for m in markets], dtype=np.float64)
+        self.lat, self.lon = np.radians(lat), np.radians(lon)
+        self.position = {market_id: i for i, market_id in enumerate(self.ids.tolist())}
+
+        # District centre = mean position of its located markets
+        centres = defaultdict(list)
+        for (_, district), y, x in zip(self.names, lat, lon):
+            centres[district.strip().lower()].append((y, x))
+        self.district_centres = {
+            district: tuple(float(v) for v in np.mean(points, axis=0)) for district, points in centres.items()
+        }
+
+        buckets = defaultdict(list)
+        for i, (y, x) in enumerate(zip(lat, lon)):
+            buckets[self._cell(y, x)].append(i)
+        self.buckets = {cell: np.array(members, dtype=np.int64) for cell, members in buckets.items()}
+        self.prices = self._latest_prices()
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell)), int(math.floor(lon / self.cell))
+
+    def _latest_prices(self) -> Dict[int, tuple]:
+        """commodity id -> (modal price per market, nan when absent; price date per market)."""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT MAX(date) FROM mandi_prices")
+            newest = cursor.fetchone()[0]
+            if newest is None:
+                return {}
+            newest = np.datetime64(str(newest), 'D').astype(object)
+            cursor.execute(
+                "SELECT commodity_id, market_id, date, modal_price FROM mandi_prices WHERE date >= %s ORDER BY date",
+                [(newest - timedelta(days=settings.MANDI_NEARBY_MAX_AGE_DAYS)).isoformat()],
+            )
+            rows = cursor.fetchall()
+
+        prices: Dict[int, tuple] = {}
+        size = len(self.ids)
+        for commodity_id, market_id, day, modal in rows:
+            i = self.position.get(market_id)
+            if i is None:
+                continue
+            if commodity_id not in prices:
+                prices[commodity_id] = (np.full(size, np.nan), [None] * size)
+            # Rows are date-ordered, so later days overwrite earlier ones
+            prices[commodity_id][0][i] = modal
+            prices[commodity_id][1][i] = str(day)
+        return prices
+
+    def district_centre(self, district: str) -> Optional[tuple]:
+        """(lat, lon) in degrees, or None when the district has no located markets."""
+        return self.district_centres.get((district or '').strip().lower())
+
+    def best_prices(self, commodity_id: int, lat: float, lon: float, radius_km: float, limit: int) -> List[dict]:
+        if commodity_id not in self.prices:
+            return []
+        modal, days = self.prices[commodity_id]
+
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        low = self._cell(lat - dlat, lon - dlon)
+        high = self._cell(lat + dlat, lon + dlon)
+        cells = [
+            self.buckets[(y, x)]
+            for y in range(low[0], high[0] + 1)
+            for x in range(low[1], high[1] + 1)
+            if (y, x) in self.buckets
+        ]
+        if not cells:
+            return []
+        candidates = np.concatenate(cells)
+        candidates = candidates[~np.isnan(modal[candidates])]
+
+        # Haversine only for markets in the overlapping cells
+        lat0, lon0 = math.radians(lat), math.radians(lon)
+        a = (np.sin((self.lat[candidates] - lat0) / 2) ** 2
+             + math.cos(lat0) * np.cos(self.lat[candidates]) * np.sin((self.lon[candidates] - lon0) / 2) ** 2)
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+        within = distance <= radius_km
+        candidates, distance = candidates[within], distance[within]
+
+        order = np.lexsort((distance, -modal[candidates]))[:limit]
+        return [
+            {
+                'marketId': int(self.ids[i]),
+                'market': self.names[i][0],
+                'district': self.names[i][1],
+                'modalPrice': int(modal[i]),
+                'priceDate': days[i],
+                'distanceKm': round(float(d), 1),
+            }
+            for i, d in zip(candidates[order], distance[order])
+        ]
+
+
+_index: Optional[MarketIndex] = None
+_index_version = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_market_index() -> MarketIndex:
+    """Process-wide index, rebuilt when the mandi data version changes."""
+    global _index, _index_version, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < settings.MANDI_INDEX_CHECK_SECONDS:
+        return _index
+    with _lock:
+        version = current(DATA_VERSION)
+        if _index is None or version != _index_version:
+            _index = MarketIndex()
+            _index_version = version
+        _checked_at = now
+    return _index
@@ -1,3 +1,258 @@
+import importlib.util
+import io
+import json
+import sys
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
 from django.test import TestCase
 
-# Create your tests here.
+from . import spatial
+from .forecast import HORIZON, compute_signals, run_forecast_job
+from .ingest import ingest_rows, iter_json
+from .models import Commodity, MandiPrice, Market, PriceAnomaly, PriceForecast, PriceRollup
+from .rollups import refresh_rollups
+
+
+class IngestTests(TestCase):
+    def row(self, **prices):
+        return {
+            'state': 'Karnataka', 'district': 'Mandya', 'market': 'Maddur', 'commodity': 'Tomato',
+            'arrival_date': '19/10/2026', 'min_price': '1200', 'max_price': '1800', 'modal_price': '1500', **prices,
+        }
+
+    def test_unusable_prices_are_skipped_not_fatal(self):
+        rows = [
+            self.row(modal_price='inf'),
+            self.row(min_price='nan'),
+            self.row(min_price='-5'),
+            self.row(max_price='1e12'),
+            self.row(modal_price='n/a'),
+            self.row(),
+        ]
+        result = ingest_rows(rows)
+        self.assertEqual((result.rows, result.skipped, result.upserted), (6, 5, 1))
+        self.assertEqual(MandiPrice.objects.get().modal_price, 1500)
+
+    def documents(self):
+        rows = [self.row(), self.row(market='Mandya')]
+        return {'envelope': {'records': rows, 'total': 2}, 'array': rows}, rows
+
+    def assertReadsEveryRow(self):
+        documents, rows = self.documents()
+        for shape, document in documents.items():
+            with self.subTest(shape=shape):
+                records = list(iter_json(io.BytesIO(json.dumps(document).encode())))
+                self.assertEqual([record['market'] for record in records], [row['market'] for row in rows])
+
+    @skipUnless(importlib.util.find_spec('ijson'), "ijson is not installed")
+    def test_json_arrays_and_envelopes_are_streamed(self):
+        self.assertReadsEveryRow()
+
+    def test_json_arrays_and_envelopes_without_ijson(self):
+        with mock.patch.dict(sys.modules, {'ijson': None}):
+            self.assertReadsEveryRow()
+
+
+class NearbyMandiTests(TestCase):
+    def setUp(self):
+        spatial._index = None
+        market = Market.objects.create(state='Karnataka', district='Mandya', name='Maddur',
+                                       latitude=12.58, longitude=77.04)
+        self.commodity = Commodity.objects.create(name='Tomato')
+        # Names are only unique case-sensitively
+        Commodity.objects.create(name='TOMATO')
+        MandiPrice.objects.create(market=market, commodity=self.commodity, date=date(2026, 10, 19),
+                                  min_price=1200, max_price=1800, modal_price=1500)
+
+    def tearDown(self):
+        spatial._index = None
+
+    def nearby(self, **params):
+        return self.client.get('/api/mandi/nearby/', {'commodity': 'tomato', 'lat': 12.6, 'lon': 77.0, **params})
+
+    def test_case_insensitive_duplicates_resolve_to_one_commodity(self):
+        response = self.nearby()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['commodity'], 'Tomato')
+        self.assertEqual([row['market'] for row in response.json()['data']], ['Maddur'])
+
+    def test_bad_radius_and_coordinates_are_rejected(self):
+        for params in ({'radius_km': 'nan'}, {'radius_km': 'inf'}, {'radius_km': '-1'}, {'radius_km': '0'},
+                       {'limit': 'x'}, {'lat': 'nan'}, {'lon': 'inf'}):
+            with self.subTest(**params):
+                self.assertEqual(self.nearby(**params).status_code, 400)
+
+    def test_limit_is_clamped(self):
+        response = self.nearby(limit=-3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 1)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tomato = Commodity.objects.create(name='Tomato')
+        self.onion = Commodity.objects.create(name='Onion')
+        self.maddur = Market.objects.create(state='Karnataka', district='Mandya', name='Maddur')
+        self.mandya = Market.objects.create(state='Karnataka', district='Mandya', name='Mandya')
+        self.price(self.maddur, 18, 1000)
+        self.price(self.mandya, 18, 1400)
+        self.price(self.maddur, 19, 1320)
+        self.price(self.mandya, 19, 1320)
+
+    def price(self, market, day, modal, commodity=None):
+        MandiPrice.objects.update_or_create(
+            market=market, commodity=commodity or self.tomato, date=date(2026, 10, day),
+            defaults={'min_price': modal, 'max_price': modal + 200, 'modal_price': modal},
+        )
+
+    def district_day(self, day):
+        return PriceRollup.objects.get(commodity=self.tomato, period=PriceRollup.DAY, district='Mandya',
+                                       market=None, period_start=date(2026, 10, day))
+
+    def test_rolls_up_each_scope_with_change_and_trend(self):
+        refresh_rollups()
+        first, second = self.district_day(18), self.district_day(19)
+        self.assertEqual((first.min_price, first.max_price, first.avg_price, first.samples), (1000, 1600, 1200, 2))
+        self.assertIsNone(first.change_pct)
+        self.assertEqual((second.avg_price, second.change_pct, second.trend), (1320, 10.0, 'up'))
+        market = PriceRollup.objects.get(commodity=self.tomato, period=PriceRollup.DAY, market=self.mandya,
+                                         period_start=date(2026, 10, 19))
+        self.assertEqual((market.change_pct, market.trend), (-5.71, 'down'))
+        month = PriceRollup.objects.get(commodity=self.tomato, period=PriceRollup.MONTH, district='', market=None)
+        self.assertEqual((month.avg_price, month.samples), (1260, 4))
+
+    def test_no_change_after_a_zero_average(self):
+        self.price(self.maddur, 18, 0)
+        self.price(self.mandya, 18, 0)
+        refresh_rollups()
+        second = self.district_day(19)
+        self.assertIsNone(second.change_pct)
+        self.assertEqual(second.trend, '')
+
+    def test_incremental_refresh_rewrites_touched_periods(self):
+        refresh_rollups()
+        self.price(self.mandya, 19, 1520)
+        refresh_rollups({self.tomato.pk: date(2026, 10, 19)})
+        self.assertEqual(self.district_day(18).avg_price, 1200)
+        self.assertEqual((self.district_day(19).avg_price, self.district_day(19).change_pct), (1420, 18.33))
+
+    def test_rebuild_command_names_unknown_commodities(self):
+        with self.assertRaisesMessage(CommandError, 'Unknown commodities: Tomatoe'):
+            call_command('rebuild_mandi_rollups', 'Tomato', 'Tomatoe')
+        self.assertFalse(PriceRollup.objects.exists())
+
+    def test_an_empty_commodity_list_rebuilds_nothing(self):
+        self.assertEqual(refresh_rollups(commodity_ids=[]), 0)
+        self.assertFalse(PriceRollup.objects.exists())
+
+    def test_prices_are_not_modified_until_the_next_refresh(self):
+        refresh_rollups()
+        first = self.client.get('/api/mandi/prices/', {'district': 'Mandya'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([(row['crop'], row['avgPrice']) for row in first.json()['data']], [('Tomato', 1320)])
+
+        second = self.client.get('/api/mandi/prices/', {'district': 'Mandya'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+
+        self.price(self.mandya, 19, 1520)
+        refresh_rollups({self.tomato.pk: date(2026, 10, 19)})
+        third = self.client.get('/api/mandi/prices/', {'district': 'Mandya'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third['ETag'], first['ETag'])
+        self.assertEqual(third.json()['data'][0]['avgPrice'], 1420)
+
+
+DAYS = 60
+START = date(2026, 8, 1)
+SPIKE_DAY = 55
+
+
+def trend_series():
+    """Rs 10 a day up from Rs 1000."""
+    return 1000.0 + 10 * np.arange(DAYS)
+
+
+def steady_series():
+    """Rs 1000/1020 on alternate days, with a Rs 2000 spike on SPIKE_DAY."""
+    values = 1000.0 + 20 * (np.arange(DAYS) % 2)
+    values[SPIKE_DAY] = 2000
+    return values
+
+
+class ComputeSignalsTests(TestCase):
+    def setUp(self):
+        gappy = np.full(DAYS, np.nan)
+        gappy[:10] = 800
+        self.signals = compute_signals(
+            np.vstack([trend_series(), steady_series(), gappy, np.full(DAYS, np.nan)]), START,
+        )
+
+    def test_a_trend_is_continued_damped_from_the_last_price(self):
+        self.assertEqual(self.signals.last_price[0], 1590)
+        # Half the Rs 10 daily slope, starting from today's level
+        np.testing.assert_allclose(self.signals.forecast[0], 1590 + 5 * np.arange(1, HORIZON + 1))
+
+    def test_only_the_planted_outlier_is_anomalous(self):
+        z = np.nan_to_num(self.signals.zscores)
+        flagged = np.argwhere(np.abs(z) > 3.5)
+        lookback = z.shape[1]
+        self.assertEqual(flagged.tolist(), [[1, SPIKE_DAY - (DAYS - lookback)]])
+        self.assertGreater(z[1, SPIKE_DAY - (DAYS - lookback)], 0)
+
+    def test_gaps_carry_the_last_observation(self):
+        self.assertEqual(self.signals.last_price[2], 800)
+        np.testing.assert_allclose(self.signals.forecast[2], 800)
+        self.assertTrue(np.isnan(self.signals.zscores[2]).all())
+        self.assertTrue(np.isnan(self.signals.last_price[3]))
+
+
+class ForecastViewTests(TestCase):
+    def setUp(self):
+        self.tomato = Commodity.objects.create(name='Tomato')
+        maddur = Market.objects.create(state='Karnataka', district='Mandya', name='Maddur')
+        mysuru = Market.objects.create(state='Karnataka', district='Mysuru', name='Mysuru')
+        rows = []
+        for market, series in ((maddur, trend_series()), (mysuru, steady_series())):
+            for day, price in enumerate(series):
+                price = int(price)
+                rows.append(MandiPrice(
+                    market=market, commodity=self.tomato, date=START + timedelta(days=day),
+                    min_price=price, max_price=price, modal_price=price,
+                ))
+        MandiPrice.objects.bulk_create(rows)
+        self.result = run_forecast_job(days=DAYS)
+
+    def test_the_job_stores_a_forecast_per_series_and_the_anomaly(self):
+        self.assertEqual((self.result['series'], self.result['anomalies']), (2, 1))
+        self.assertEqual(PriceForecast.objects.get(market__name='Maddur').forecast[0], 1595)
+        anomaly = PriceAnomaly.objects.get()
+        self.assertEqual((anomaly.date, anomaly.price, anomaly.kind),
+                         (START + timedelta(days=SPIKE_DAY), 2000, PriceAnomaly.SPIKE))
+
+    def test_rerunning_replaces_rather_than_duplicates(self):
+        run_forecast_job(days=DAYS)
+        self.assertEqual((PriceForecast.objects.count(), PriceAnomaly.objects.count()), (2, 1))
+
+    def test_forecast_view(self):
+        response = self.client.get('/api/mandi/forecast/', {'commodity': 'tomato'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['market'] for row in response.json()['data']], ['Maddur', 'Mysuru'])
+
+        data = self.client.get('/api/mandi/forecast/', {'commodity': 'tomato', 'district': 'mandya'}).json()['data']
+        self.assertEqual(len(data), 1)
+        self.assertEqual((data[0]['lastPrice'], data[0]['asOf']), (1590, (START + timedelta(days=DAYS - 1)).isoformat()))
+        self.assertEqual(data[0]['forecast'], [1595, 1600, 1605, 1610, 1615, 1620, 1625])
+
+        self.assertEqual(self.client.get('/api/mandi/forecast/', {'commodity': 'ragi'}).status_code, 404)
+
+    def test_anomaly_view(self):
+        data = self.client.get('/api/mandi/anomalies/', {'commodity': 'Tomato'}).json()['data']
+        self.assertEqual([(row['market'], row['price'], row['kind']) for row in data], [('Mysuru', 2000, 'spike')])
+        self.assertEqual(self.client.get('/api/mandi/anomalies/', {'district': 'Mandya'}).json()['data'], [])
+        self.assertEqual(self.client.get('/api/mandi/anomalies/', {'commodity': 'ragi'}).status_code, 404)
@@ -1,7 +1,11 @@
 from django.urls import path
+from .views import MandiPricesView, NearbyMandiView, PriceAnomalyView, PriceForecastView
 
 app_name = 'mandi'
 
-urlpatterns = []
-
-
+urlpatterns = [
+    path('prices/', MandiPricesView.as_view(), name='prices'),
+    path('nearby/', NearbyMandiView.as_view(), name='nearby'),
+    path('forecast/', PriceForecastView.as_view(), name='forecast'),
+    path('anomalies/', PriceAnomalyView.as_view(), name='anomalies'),
+]
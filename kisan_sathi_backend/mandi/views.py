@@ -1,3 +1,184 @@
-from django.shortcuts import render
+import hashlib
+import math
 
-# Create your views here.
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+
+from .models import Commodity, PriceAnomaly, PriceForecast, PriceRollup
+from .rollups import rollup_version
+from .spatial import get_market_index
+
+
+PRICE_CACHE_TTL = 300
+
+
+class MandiPricesView(APIView):
+    """
+    Latest min/max/avg price, trend and percent change per commodity for a
+    district (default: the farmer's own) or for all markets (``district=all``).
+    """
+
+    def get(self, request):
+        period = request.query_params.get('period', PriceRollup.DAY)
+        if period not in dict(PriceRollup.PERIODS):
+            return Response({'success': False, 'message': 'Invalid period'}, status=status.HTTP_400_BAD_REQUEST)
+
+        district = request.query_params.get('district')
+        if district is None:
+            district = getattr(request.user, 'district', '') or ''
+        if district.lower() == 'all':
+            district = ''
+
+        scope = hashlib.md5(f"{period}:{district}".encode()).hexdigest()[:12]
+        etag = f'"mandi-{rollup_version()}-{scope}"'
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        data = cache.get(etag)
+        if data is None:
+            data = self._query(period, district)
+            cache.set(etag, data, PRICE_CACHE_TTL)
+        return Response({'success': True, 'district': district, 'period': period, 'data': data},
+                        headers={'ETag': etag, 'Cache-Control': 'private, max-age=60'})
+
+    def _query(self, period, district):
+        scope = PriceRollup.objects.filter(period=period, district=district, market__isnull=True)
+        latest = scope.filter(commodity=OuterRef('commodity')).order_by('-period_start').values('period_start')[:1]
+        rollups = (
+            scope.filter(period_start=Subquery(latest))
+            .select_related('commodity')
+            .order_by('commodity__name')
+        )
+        return [
+            {
+                'crop': rollup.commodity.name,
+                'minPrice': rollup.min_price,
+                'maxPrice': rollup.max_price,
+                'avgPrice': rollup.avg_price,
+                'trend': rollup.trend or 'stable',
+                'change': rollup.change_pct or 0,
+                'unit': '₹/quintal',
+                'periodStart': rollup.period_start.isoformat(),
+            }
+            for rollup in rollups
+        ]
+
+
+def _get_commodity(request):
+    # Names are unique only case-sensitively, so several rows may match
+    name = request.query_params.get('commodity', '')
+    return Commodity.objects.filter(name__iexact=name).order_by('id').first()
+
+
+class NearbyMandiView(APIView):
+    """
+    Top markets by latest modal price for a commodity within ``radius_km``
+    of ``lat``/``lon``. Without coordinates the farmer's district centre
+    (mean of its located markets) is used, as farmers only record a village name.
+    """
+
+    def get(self, request):
+        params = request.query_params
+        commodity = _get_commodity(request)
+        if commodity is None:
+            return Response({'success': False, 'message': 'Unknown commodity'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            radius_km = float(params.get('radius_km', 50))
+            limit = int(params.get('limit', 5))
+        except ValueError:
+            radius_km = limit = None
+        if radius_km is None or not (math.isfinite(radius_km) and radius_km > 0):
+            return Response({
+                'success': False,
+                'message': 'radius_km must be a positive number and limit an integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        radius_km = min(radius_km, 500)
+        limit = max(1, min(limit, 50))
+
+        try:
+            if 'lat' in params and 'lon' in params:
+                lat, lon = float(params['lat']), float(params['lon'])
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                    raise ValueError("Out of range")
+            else:
+                lat, lon = self._district_centre(request.user)
+        except (TypeError, ValueError):
+            return Response({
+                'success': False,
+                'message': 'Valid lat/lon required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results = get_market_index().best_prices(commodity.id, lat, lon, radius_km, limit)
+        return Response({'success': True, 'commodity': commodity.name, 'data': results})
+
+    def _district_centre(self, user):
+        centre = get_market_index().district_centre(getattr(user, 'district', ''))
+        if centre is None:
+            raise ValueError("No location")
+        return centre
+
+
+class PriceForecastView(APIView):
+    """Stored short-horizon forecasts for a commodity, optionally narrowed to a district."""
+
+    def get(self, request):
+        commodity = _get_commodity(request)
+        if commodity is None:
+            return Response({'success': False, 'message': 'Unknown commodity'}, status=status.HTTP_404_NOT_FOUND)
+
+        forecasts = PriceForecast.objects.filter(commodity=commodity).select_related('market')
+        district = request.query_params.get('district')
+        if district:
+            forecasts = forecasts.filter(market__district__iexact=district)
+        return Response({
+            'success': True,
+            'commodity': commodity.name,
+            'data': [
+                {
+                    'market': f.market.name,
+                    'district': f.market.district,
+                    'asOf': f.as_of.isoformat(),
+                    'lastPrice': f.last_price,
+                    'rollingMean': round(f.rolling_mean, 1),
+                    'rollingStd': round(f.rolling_std, 1),
+                    'zscore': f.zscore,
+                    'forecast': f.forecast,
+                }
+                for f in forecasts.order_by('market__district', 'market__name')[:200]
+            ]
+        })
+
+
+class PriceAnomalyView(APIView):
+    """Recent abnormal price spikes and crashes, newest first."""
+
+    def get(self, request):
+        anomalies = PriceAnomaly.objects.select_related('commodity', 'market')
+        if request.query_params.get('commodity'):
+            commodity = _get_commodity(request)
+            if commodity is None:
+                return Response({'success': False, 'message': 'Unknown commodity'}, status=status.HTTP_404_NOT_FOUND)
+            anomalies = anomalies.filter(commodity=commodity)
+        district = request.query_params.get('district')
+        if district:
+            anomalies = anomalies.filter(market__district__iexact=district)
+        return Response({
+            'success': True,
+            'data': [
+                {
+                    'crop': a.commodity.name,
+                    'market': a.market.name,
+                    'district': a.market.district,
+                    'date': a.date.isoformat(),
+                    'price': a.price,
+                    'expected': a.expected,
+                    'zscore': a.zscore,
+                    'kind': a.kind,
+                }
+                for a in anomalies.order_by('-date', '-zscore')[:100]
+            ]
+        })
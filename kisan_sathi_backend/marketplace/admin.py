@@ -1,3 +1,46 @@
 from django.contrib import admin
+from .models import Listing, Order, Review, Seller
+from .reviews import delete_review
 
-# Register your models here.
+
+@admin.register(Seller)
+class SellerAdmin(admin.ModelAdmin):
+    list_display = ['display_name', 'district', 'rating', 'review_count']
+    search_fields = ['display_name']
+    raw_id_fields = ['farmer']
+    readonly_fields = ['rating', 'rating_total', 'review_count']
+
+
+@admin.register(Listing)
+class ListingAdmin(admin.ModelAdmin):
+    list_display = ['name', 'listing_type', 'crop', 'price', 'district', 'rating', 'review_count', 'is_active']
+    list_filter = ['listing_type', 'is_active']
+    search_fields = ['name', 'crop']
+    raw_id_fields = ['seller']
+    list_select_related = ['seller']
+    # Kept in step with reviews by marketplace.reviews
+    readonly_fields = ['rating', 'rating_total', 'review_count']
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    list_display = ['listing', 'reviewer', 'rating', 'created_at']
+    raw_id_fields = ['listing', 'reviewer']
+    readonly_fields = ['rating']
+
+    # Deletes go through delete_review so listing and seller aggregates stay correct
+    def delete_model(self, request, obj):
+        delete_review(obj)
+
+    def delete_queryset(self, request, queryset):
+        for review in queryset.select_related('listing'):
+            delete_review(review)
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ['id', 'listing', 'buyer', 'quantity', 'amount', 'status', 'expires_at']
+    list_filter = ['status']
+    raw_id_fields = ['listing', 'buyer']
+    # Status and quantity move stock; change them through marketplace.orders only
+    readonly_fields = ['quantity', 'amount', 'status', 'request_key', 'expires_at', 'confirmed_at']
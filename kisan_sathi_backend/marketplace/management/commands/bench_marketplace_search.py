@@ -0,0 +1,86 @@
+import random
+import resource
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from marketplace.search import ListingSearchIndex
+
+
+CROPS = ['tomato', 'onion', 'potato', 'rice', 'wheat', 'ragi', 'maize', 'cotton', 'banana',
+         'chilli', 'groundnut', 'coconut', 'arecanut', 'coffee', 'mango', 'sugarcane']
+KANNADA = {'tomato': 'ಟೊಮೆಟೊ', 'onion': 'ಈರುಳ್ಳಿ', 'rice': 'ಅಕ್ಕಿ', 'ragi': 'ರಾಗಿ', 'cotton': 'ಹತ್ತಿ'}
+ADJECTIVES = ['Organic', 'Fresh', 'Premium', 'Local', 'Grade A', 'Export quality', 'Hybrid', 'Desi']
+DISTRICTS = {
+    'Mandya': (12.52, 76.90), 'Mysuru': (12.30, 76.64), 'Hassan': (13.01, 76.10),
+    'Kolar': (13.14, 78.13), 'Belagavi': (15.85, 74.50), 'Bengaluru': (12.97, 77.59),
+    'Tumakuru': (13.34, 77.10), 'Shivamogga': (13.93, 75.57), 'Dharwad': (15.46, 75.01),
+    'Raichur': (16.20, 77.36),
+}
+QUERIES = ['organic tomatoes', 'ಟೊಮೆಟೊ', 'fresh onion', 'premium rice', 'export quality coffee',
+           'hybrid maize seeds', 'desi ragi', 'ಸಾವಯವ ಅಕ್ಕಿ', 'banana', 'grade a chilli', 'mango']
+
+
+class Command(BaseCommand):
+    help = "Build the marketplace search index over synthetic listings and time queries and updates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=1000000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _rows(self, count, rng):
+        now = datetime.now(timezone.utc)
+        districts = list(DISTRICTS.items())
+        for i in range(1, count + 1):
+            crop = rng.choice(CROPS)
+            district, (lat, lon) = rng.choice(districts)
+            name = f"{rng.choice(ADJECTIVES)} {crop.title()}"
+            if crop in KANNADA and rng.random() < 0.3:
+                name = f"{KANNADA[crop]} {name}"
+            yield (
+                i, rng.choice(('buy', 'sell')), name, crop,
+                f"{rng.randint(10, 500)} kg from {district}, harvested this season", district, district,
+                lat + rng.uniform(-0.4, 0.4), lon + rng.uniform(-0.4, 0.4),
+                now - timedelta(days=rng.uniform(0, 120)), True,
+            )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        count = options['listings']
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        started = time.perf_counter()
+        index = ListingSearchIndex.build(self._rows(count, rng), expected=count)
+        build = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(f"Built index over {index.live} listings, {len(index.vocab)} tokens in {build:.1f}s "
+                          f"(peak RSS +{(rss_after - rss_before) / 1024:.0f} MB)")
+
+        origins = list(DISTRICTS.values())
+        timings = []
+        for i in range(options['queries']):
+            query = QUERIES[i % len(QUERIES)]
+            origin = origins[i % len(origins)] if i % 3 else None
+            started = time.perf_counter()
+            hits = index.search(query, origin=origin, listing_type=('buy', 'sell', None)[i % 3], limit=20)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert hits, query
+        timings = np.array(timings)
+        self.stdout.write(f"Query latency over {len(timings)} queries: p50 {np.percentile(timings, 50):.1f} ms, "
+                          f"p95 {np.percentile(timings, 95):.1f} ms, max {timings.max():.1f} ms")
+
+        updates = list(self._rows(10000, rng))
+        started = time.perf_counter()
+        for row in updates:
+            index.upsert(row)
+        elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        index.search('organic tomatoes', origin=origins[0], limit=20)
+        first_query = (time.perf_counter() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(updates)} incremental upserts in {elapsed:.2f}s ({len(updates) / elapsed:.0f}/s); "
+            f"next query (merging pending postings) {first_query:.1f} ms"
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from marketplace.orders import release_expired
+
+
+class Command(BaseCommand):
+    help = "Expire marketplace reservations past their hold time and return their stock"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once nothing has lapsed")
+        parser.add_argument('--interval', type=float, default=15.0, help="Idle poll interval in seconds")
+
+    def handle(self, *args, **options):
+        released = 0
+        try:
+            while True:
+                batch = release_expired()
+                released += batch
+                if batch:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired reservations"))
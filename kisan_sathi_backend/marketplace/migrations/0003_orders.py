@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0002_listing_search_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='listing',
+            name='price',
+            field=models.PositiveIntegerField(help_text='Rupees per unit'),
+        ),
+        migrations.CreateModel(
+            name='Order',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('amount', models.PositiveIntegerField(help_text='Rupees, at the listing price when reserved')),
+                ('status', models.CharField(choices=[('reserved', 'Reserved'), ('confirmed', 'Confirmed'), ('cancelled', 'Cancelled'), ('expired', 'Expired')], default='reserved', max_length=10)),
+                ('request_key', models.CharField(max_length=64)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True)),
+                ('buyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marketplace_orders', to=settings.AUTH_USER_MODEL)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='orders', to='marketplace.listing')),
+            ],
+            options={
+                'db_table': 'marketplace_orders',
+                'indexes': [models.Index(condition=models.Q(('status', 'reserved')), fields=['expires_at'], name='order_hold_expiry'), models.Index(fields=['buyer', '-id'], name='order_buyer_recent')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(fields=('buyer', 'request_key'), name='marketplace_order_request_key'),
+        ),
+    ]
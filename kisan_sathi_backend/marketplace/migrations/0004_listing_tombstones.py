@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0003_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('listing_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'marketplace_listing_tombstones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['updated_at'], name='listing_updated'),
+        ),
+    ]
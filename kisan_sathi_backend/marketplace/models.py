@@ -1,3 +1,157 @@
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
-# Create your models here.
+
+class Seller(models.Model):
+    """Marketplace identity of a farmer, with review aggregates across all their listings."""
+
+    farmer = models.OneToOneField(settings.AUTH_USER_MODEL, related_name='seller', on_delete=models.CASCADE)
+    display_name = models.CharField(max_length=150)
+    district = models.CharField(max_length=100, blank=True)
+    # Maintained by marketplace.reviews; never aggregated at read time
+    rating = models.FloatField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'marketplace_sellers'
+
+    def __str__(self) -> str:
+        return self.display_name
+
+    @classmethod
+    def for_farmer(cls, farmer):
+        seller, _ = cls.objects.get_or_create(farmer=farmer, defaults={
+            'display_name': f"Farmer {farmer.first_name}" if farmer.first_name else str(farmer.phone),
+            'district': farmer.district,
+        })
+        return seller
+
+
+class Listing(models.Model):
+    BUY = 'buy'
+    SELL = 'sell'
+    TYPES = [(BUY, 'Buy'), (SELL, 'Sell')]
+
+    seller = models.ForeignKey(Seller, related_name='listings', on_delete=models.CASCADE)
+    listing_type = models.CharField(max_length=4, choices=TYPES)
+    name = models.CharField(max_length=150)
+    description = models.TextField(blank=True)
+    # Lowercased crop name used for filtering (e.g. "tomato" for "Organic Tomatoes")
+    crop = models.CharField(max_length=100)
+    price = models.PositiveIntegerField(help_text="Rupees per unit")
+    # Units still available; orders take stock with conditional decrements (see marketplace.orders)
+    quantity = models.PositiveIntegerField()
+    unit = models.CharField(max_length=20, default='kg')
+    location = models.CharField(max_length=100)
+    district = models.CharField(max_length=100)
+    # Defaults to the district centre (see mandi.spatial) when not given
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    image = models.CharField(max_length=20, blank=True)
+    is_active = models.BooleanField(default=True)
+    # Maintained by marketplace.reviews; never aggregated at read time
+    rating = models.FloatField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'marketplace_listings'
+        # One partial index per sort order (and filtered variant) over active
+        # listings, so keyset pages are index range scans
+        indexes = [
+            models.Index(fields=['listing_type', '-created_at', '-id'], name='listing_newest',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['listing_type', 'price', 'id'], name='listing_price',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['listing_type', '-rating', '-id'], name='listing_rating',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['listing_type', 'crop', '-created_at', '-id'], name='listing_crop',
+                         condition=models.Q(is_active=True)),
+            models.Index(fields=['listing_type', 'district', '-created_at', '-id'], name='listing_district',
+                         condition=models.Q(is_active=True)),
+            # Search indexes in other processes pull recent writes (see marketplace.search)
+            models.Index(fields=['updated_at'], name='listing_updated'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.listing_type})"
+
+    def save(self, *args, **kwargs):
+        self.crop = self.crop.strip().lower()
+        super().save(*args, **kwargs)
+
+
+class ListingTombstone(models.Model):
+    """A hard-deleted listing, kept briefly so every process's search index drops it."""
+
+    listing_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'marketplace_listing_tombstones'
+
+    def __str__(self) -> str:
+        return f"Deleted listing {self.listing_id}"
+
+
+class Review(models.Model):
+    listing = models.ForeignKey(Listing, related_name='review_set', on_delete=models.CASCADE)
+    reviewer = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='marketplace_reviews',
+                                 on_delete=models.CASCADE)
+    rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'marketplace_reviews'
+        constraints = [
+            models.UniqueConstraint(fields=['listing', 'reviewer'], name='marketplace_one_review_per_listing'),
+        ]
+        indexes = [models.Index(fields=['listing', '-id'], name='review_listing_recent')]
+
+    def __str__(self) -> str:
+        return f"{self.rating}/5 on {self.listing_id}"
+
+
+class Order(models.Model):
+    """
+    A buyer's claim on listing stock. Stock is taken when the order is
+    reserved; a reservation not confirmed before ``expires_at`` is expired
+    and its stock returned.
+    """
+
+    RESERVED = 'reserved'
+    CONFIRMED = 'confirmed'
+    CANCELLED = 'cancelled'
+    EXPIRED = 'expired'
+    STATUSES = [(RESERVED, 'Reserved'), (CONFIRMED, 'Confirmed'), (CANCELLED, 'Cancelled'), (EXPIRED, 'Expired')]
+
+    listing = models.ForeignKey(Listing, related_name='orders', on_delete=models.PROTECT)
+    buyer = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='marketplace_orders', on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    amount = models.PositiveIntegerField(help_text="Rupees, at the listing price when reserved")
+    status = models.CharField(max_length=10, choices=STATUSES, default=RESERVED)
+    # Client-supplied Idempotency-Key; retries with the same key return the same order
+    request_key = models.CharField(max_length=64)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'marketplace_orders'
+        constraints = [
+            models.UniqueConstraint(fields=['buyer', 'request_key'], name='marketplace_order_request_key'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='order_hold_expiry', condition=models.Q(status='reserved')),
+            models.Index(fields=['buyer', '-id'], name='order_buyer_recent'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Order {self.pk}: {self.quantity} x {self.listing_id} ({self.status})"
@@ -0,0 +1,142 @@
+"""
+Contention-safe order reservations.
+
+Stock is never read-modified-written in Python. ``reserve`` takes it with a
+single conditional ``UPDATE ... SET quantity = quantity - n WHERE quantity
+>= n``: it either succeeds atomically or matches no row, so concurrent
+buyers cannot oversell and no row stays locked longer than that statement's
+transaction. A reservation holds stock until it is confirmed, cancelled or
+expired; ``release_expired`` claims lapsed holds with ``SKIP LOCKED`` so
+several sweepers (and ``reserve`` itself, when a lot looks sold out) can run
+without blocking each other.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from live.events import listing_stock
+from stats.counters import REVENUE_TOTAL, TRANSACTIONS_TOTAL, increment
+
+from .models import Listing, Order
+
+
+class OrderError(Exception):
+    pass
+
+
+class OutOfStock(OrderError):
+    pass
+
+
+class IdempotencyConflict(OrderError):
+    pass
+
+
+class InvalidOrderState(OrderError):
+    pass
+
+
+def _existing(buyer, request_key, listing_id, quantity):
+    order = Order.objects.filter(buyer=buyer, request_key=request_key).first()
+    if order is not None and (order.listing_id != listing_id or order.quantity != quantity):
+        raise IdempotencyConflict("Idempotency key was already used for a different order")
+    return order
+
+
+def _take_stock(listing_id, quantity):
+    return Listing.objects.filter(pk=listing_id, is_active=True, quantity__gte=quantity).update(
+        quantity=F('quantity') - quantity
+    )
+
+
+def reserve(listing_id, buyer, quantity, request_key):
+    """Hold ``quantity`` units for ``buyer``. Returns ``(order, created)``."""
+    order = _existing(buyer, request_key, listing_id, quantity)
+    if order is not None:
+        return order, False
+
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                if not _take_stock(listing_id, quantity):
+                    raise OutOfStock("Not enough stock")
+                price, remaining = Listing.objects.values_list('price', 'quantity').get(pk=listing_id)
+                listing_stock(listing_id, remaining)
+                order = Order.objects.create(
+                    listing_id=listing_id, buyer=buyer, quantity=quantity, amount=price * quantity,
+                    request_key=request_key,
+                    expires_at=timezone.now() + timedelta(seconds=settings.MARKETPLACE_HOLD_SECONDS),
+                )
+            return order, True
+        except IntegrityError:
+            # A concurrent retry with the same key won; its stock decrement stands, ours rolled back
+            order = _existing(buyer, request_key, listing_id, quantity)
+            if order is None:
+                raise
+            return order, False
+        except OutOfStock:
+            # Lapsed holds may be keeping the lot "sold out"; reclaim them once and retry
+            if attempt or not release_expired(listing_id=listing_id):
+                raise
+
+
+def confirm(order_id, buyer):
+    now = timezone.now()
+    confirmed = Order.objects.filter(
+        pk=order_id, buyer=buyer, status=Order.RESERVED, expires_at__gt=now
+    ).update(status=Order.CONFIRMED, confirmed_at=now)
+    if not confirmed:
+        raise InvalidOrderState("Order is not an active reservation")
+    order = Order.objects.get(pk=order_id)
+    # Outside the status change so confirmations don't queue on the shared counter rows
+    increment(TRANSACTIONS_TOTAL)
+    increment(REVENUE_TOTAL, order.amount)
+    return order
+
+
+def cancel(order_id, buyer):
+    with transaction.atomic():
+        # The conditional status change is the guard: only one caller can move it out of RESERVED
+        if not Order.objects.filter(pk=order_id, buyer=buyer, status=Order.RESERVED).update(status=Order.CANCELLED):
+            raise InvalidOrderState("Only reserved orders can be cancelled")
+        order = Order.objects.get(pk=order_id)
+        Listing.objects.filter(pk=order.listing_id).update(quantity=F('quantity') + order.quantity)
+        listing_stock(order.listing_id, Listing.objects.values_list('quantity', flat=True).get(pk=order.listing_id))
+    return order
+
+
+def _lock_for_write():
+    # SQLite has no row locks, and a transaction that reads before writing fails
+    # with "database is locked" if another writer commits in between. A no-op
+    # UPDATE takes the write lock up front (waiting on the busy timeout instead).
+    if connection.vendor == 'sqlite':
+        Order.objects.filter(pk=0).update(status=Order.EXPIRED)
+
+
+def release_expired(listing_id=None, limit=500):
+    """Expire lapsed reservations and return their stock. Returns the number released."""
+    lapsed = Order.objects.filter(status=Order.RESERVED, expires_at__lte=timezone.now())
+    if listing_id is not None:
+        lapsed = lapsed.filter(listing_id=listing_id)
+    # Cheap unlocked check first: callers on the sold-out path should not queue for locks
+    if not lapsed.exists():
+        return 0
+
+    with transaction.atomic():
+        _lock_for_write()
+        rows = list(lapsed.select_for_update(skip_locked=True).values_list('pk', 'listing_id', 'quantity')[:limit])
+        if not rows:
+            return 0
+        Order.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(status=Order.EXPIRED)
+        returned = defaultdict(int)
+        for _, listing, quantity in rows:
+            returned[listing] += quantity
+        for listing, quantity in returned.items():
+            Listing.objects.filter(pk=listing).update(quantity=F('quantity') + quantity)
+        for listing, quantity in Listing.objects.filter(pk__in=returned).values_list('pk', 'quantity'):
+            listing_stock(listing, quantity)
+    return len(rows)
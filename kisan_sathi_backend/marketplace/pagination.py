@@ -0,0 +1,74 @@
+"""
+Keyset (seek) pagination.
+
+A page is fetched with ``WHERE (sort key) after (last row's key) ORDER BY
+sort key LIMIT n``. With a matching index, deep pages cost the same as the
+first page; OFFSET would instead scan and discard every earlier row.
+Cursors are opaque base64 tokens holding the last row's key values.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering, model):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor("Malformed cursor")
+    decoded = []
+    for (name, _), value in zip(ordering, values):
+        # Cursors come from clients; anything the column would not accept is tampering
+        if value is None or isinstance(value, (list, dict)):
+            raise InvalidCursor("Malformed cursor")
+        try:
+            value = model._meta.get_field(name).to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise InvalidCursor("Malformed cursor")
+        if value is None:
+            raise InvalidCursor("Malformed cursor")
+        decoded.append(value)
+    return decoded
+
+
+def _after(ordering, values):
+    """``(a, b, c) > (x, y, z)`` in sort order, expanded into ORs of equalities."""
+    condition = Q()
+    for i, (name, descending) in enumerate(ordering):
+        step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+        for j, (prior, _) in enumerate(ordering[:i]):
+            step &= Q(**{prior: values[j]})
+        condition |= step
+    # Redundant bound on the leading column lets the index seek instead of filter
+    name, descending = ordering[0]
+    return Q(**{f"{name}__{'lte' if descending else 'gte'}": values[0]}) & condition
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=20):
+    """
+    ``ordering`` is a sequence of ``(field, descending)`` ending in a unique
+    field. Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    ordering = list(ordering)
+    if cursor:
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, ordering, queryset.model)))
+    queryset = queryset.order_by(*[f"-{name}" if descending else name for name, descending in ordering])
+    rows = list(queryset[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor([getattr(rows[-1], name) for name, _ in ordering])
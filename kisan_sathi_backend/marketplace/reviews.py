@@ -0,0 +1,63 @@
+"""
+Review writes with incremental rating aggregates.
+
+Listings and sellers carry ``rating_total``, ``review_count`` and the
+derived ``rating``. Each review write adjusts them with a single UPDATE
+built from F() expressions. The adjustment runs in the same transaction
+as the review row, so concurrent reviews cannot lose updates, and reads
+never need to aggregate reviews.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Round
+
+from .models import Listing, Review, Seller
+
+
+def _apply(model, pk, delta_total, delta_count):
+    total = F('rating_total') + delta_total
+    count = F('review_count') + delta_count
+    # Every right-hand side reads the pre-update row, so rating uses the new total and count
+    rating = Case(
+        When(review_count__lte=-delta_count, then=Value(0.0)),
+        default=Round(Cast(total, FloatField()) / count, 2),
+    )
+    model.objects.filter(pk=pk).update(rating_total=total, review_count=count, rating=rating)
+
+
+def _apply_all(listing, delta_total, delta_count):
+    _apply(Listing, listing.pk, delta_total, delta_count)
+    _apply(Seller, listing.seller_id, delta_total, delta_count)
+
+
+@transaction.atomic
+def submit_review(listing, reviewer, rating, comment=''):
+    """Create or replace ``reviewer``'s review of ``listing``. Returns (review, created)."""
+    reviews = Review.objects.select_for_update().filter(listing=listing, reviewer=reviewer)
+    review = reviews.first()
+    if review is None:
+        try:
+            with transaction.atomic():
+                review = Review.objects.create(listing=listing, reviewer=reviewer, rating=rating, comment=comment)
+        except IntegrityError:
+            # A concurrent first review won the unique constraint; replace it instead
+            review = reviews.get()
+        else:
+            _apply_all(listing, rating, 1)
+            return review, True
+
+    delta = rating - review.rating
+    review.rating = rating
+    review.comment = comment
+    review.save(update_fields=['rating', 'comment', 'updated_at'])
+    if delta:
+        _apply_all(listing, delta, 0)
+    return review, False
+
+
+@transaction.atomic
+def delete_review(review):
+    listing = review.listing
+    rating = review.rating
+    review.delete()
+    _apply_all(listing, -rating, -1)
@@ -0,0 +1,376 @@
+"""
+In-memory marketplace search.
+
+Listings are tokenized into an inverted index (token -> array of document
+slots). English words are lowercased and crudely singularized; Kannada words
+are NFC-normalized, stripped of common plural/case suffixes and, for known
+crop and produce terms, mapped to the English token, so "ಟೊಮೆಟೊ" and
+"tomatoes" hit the same postings.
+
+A query scores candidate slots with summed IDF weights (name and crop
+tokens count fully, description and location tokens half), then boosts them
+by distance from the buyer and by listing age, all as NumPy operations over
+the candidate arrays; the top k come from ``argpartition``.
+
+Each process holds one index. Listing writes update the local index at once
+(see ``marketplace.signals``); hard deletes also leave a ``ListingTombstone``.
+Every few seconds the other processes pull rows changed since their last
+sync by ``updated_at`` and drop tombstoned ids, two indexed range reads.
+Edits and deletes leave dead slots behind, so a process rebuilds once fewer
+than ``MIN_LIVE_FRACTION`` of its slots are live, when ``SEARCH_REBUILD`` is
+bumped, or when it has not synced for longer than tombstones are kept.
+"""
+import math
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from stats.counters import current
+
+from .models import Listing, ListingTombstone
+
+
+# Bump (stats.counters.increment) to make every process rebuild its index
+SEARCH_REBUILD = 'marketplace.search_rebuild'
+
+EARTH_RADIUS_KM = 6371.0
+GEO_SCALE_KM = 25.0
+FRESH_DAYS = 14.0
+GEO_WEIGHT = 1.0
+FRESH_WEIGHT = 0.5
+SECONDARY_WEIGHT = 0.5
+# Rebuild once dead slots (edited or removed listings) outnumber live ones
+MIN_LIVE_FRACTION = 0.5
+
+# \w misses Kannada vowel signs (combining marks), so include the whole block
+_TOKEN_RE = re.compile(r'(?:[^\W_]|[\u0c80-\u0cff])+')
+_KANNADA_RE = re.compile(r'[\u0c80-\u0cff]')
+_NEAR_RE = re.compile(r'\s+(?:near|around|in)\s+(.+)$', re.IGNORECASE)
+_NEAR_KN_RE = re.compile(r'\s*(\S+)\s+(?:ಹತ್ತಿರ|ಬಳಿ)\s*$')
+
+_STOPWORDS = {'a', 'an', 'the', 'and', 'or', 'of', 'for', 'in', 'at', 'to', 'with', 'from', 'near', 'kg'}
+
+# Kannada plural and case endings, longest first
+_KANNADA_SUFFIXES = ('ಗಳನ್ನು', 'ಗಳಿಗೆ', 'ಗಳು', 'ಗಳ', 'ವನ್ನು', 'ನ್ನು', 'ಅನ್ನು')
+
+# Kannada produce and listing terms indexed under their English token
+_KANNADA_TERMS = {
+    'ಟೊಮೆಟೊ': 'tomato', 'ಟೊಮ್ಯಾಟೊ': 'tomato', 'ಈರುಳ್ಳಿ': 'onion', 'ಆಲೂಗಡ್ಡೆ': 'potato',
+    'ಅಕ್ಕಿ': 'rice', 'ಭತ್ತ': 'paddy', 'ಗೋಧಿ': 'wheat', 'ರಾಗಿ': 'ragi', 'ಜೋಳ': 'jowar',
+    'ಮೆಕ್ಕೆಜೋಳ': 'maize', 'ಹತ್ತಿ': 'cotton', 'ಕಬ್ಬು': 'sugarcane', 'ತೆಂಗಿನಕಾಯಿ': 'coconut',
+    'ಬಾಳೆಹಣ್ಣು': 'banana', 'ಮೆಣಸಿನಕಾಯಿ': 'chilli', 'ಕಡಲೆಕಾಯಿ': 'groundnut', 'ಶೇಂಗಾ': 'groundnut',
+    'ಅಡಿಕೆ': 'arecanut', 'ಕಾಫಿ': 'coffee', 'ಮಾವು': 'mango', 'ದ್ರಾಕ್ಷಿ': 'grape',
+    'ಸಾವಯವ': 'organic', 'ತಾಜಾ': 'fresh', 'ಬೀಜ': 'seed', 'ಗೊಬ್ಬರ': 'fertilizer',
+    # Districts, so "ಮಂಡ್ಯ ಹತ್ತಿರ" resolves like "near Mandya"
+    'ಬೆಂಗಳೂರು': 'bengaluru', 'ಮೈಸೂರು': 'mysuru', 'ಮಂಡ್ಯ': 'mandya', 'ಹಾಸನ': 'hassan', 'ಕೋಲಾರ': 'kolar',
+    'ತುಮಕೂರು': 'tumakuru', 'ಶಿವಮೊಗ್ಗ': 'shivamogga', 'ಬೆಳಗಾವಿ': 'belagavi', 'ಧಾರವಾಡ': 'dharwad',
+    'ರಾಯಚೂರು': 'raichur', 'ಕಲಬುರಗಿ': 'kalaburagi', 'ಬಳ್ಳಾರಿ': 'ballari', 'ಚಿಕ್ಕಮಗಳೂರು': 'chikkamagaluru',
+    'ದಾವಣಗೆರೆ': 'davanagere', 'ಉಡುಪಿ': 'udupi', 'ವಿಜಯಪುರ': 'vijayapura', 'ಚಿತ್ರದುರ್ಗ': 'chitradurga',
+}
+
+_token_cache: Dict[str, Optional[str]] = {}
+
+
+def normalize_token(raw: str) -> Optional[str]:
+    token = _token_cache.get(raw)
+    if token is not None or raw in _token_cache:
+        return token
+    word = unicodedata.normalize('NFC', raw.lower())
+    if _KANNADA_RE.search(word):
+        for suffix in _KANNADA_SUFFIXES if word not in _KANNADA_TERMS else ():
+            if word.endswith(suffix) and len(word) > len(suffix) + 1:
+                word = word[:-len(suffix)]
+                break
+        word = _KANNADA_TERMS.get(word, word)
+    elif word in _STOPWORDS or word.isdigit():
+        word = None
+    elif len(word) > 3:
+        if word.endswith('ies'):
+            word = word[:-3] + 'y'
+        elif word.endswith('oes') or word.endswith(('ches', 'shes', 'xes', 'sses')):
+            word = word[:-2]
+        elif word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+    if len(_token_cache) < 200000:
+        _token_cache[raw] = word
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = (normalize_token(raw) for raw in _TOKEN_RE.findall(text or ''))
+    return list(dict.fromkeys(token for token in tokens if token))
+
+
+def _unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+
+def parse_query(query: str) -> Tuple[str, Optional[str]]:
+    """Split "organic tomatoes near Mandya" into ("organic tomatoes", "mandya")."""
+    query = (query or '').strip()
+    for pattern in (_NEAR_RE, _NEAR_KN_RE):
+        match = pattern.search(query)
+        if match:
+            place = ' '.join(normalize_token(raw) or raw for raw in _TOKEN_RE.findall(match.group(1)))
+            return query[:match.start()].strip(), place or None
+    return query, None
+
+
+# Row shape used to build the index and to apply updates
+ROW_FIELDS = ('id', 'listing_type', 'name', 'crop', 'description', 'location', 'district',
+              'latitude', 'longitude', 'created_at', 'is_active')
+
+
+class ListingSearchIndex:
+    def __init__(self, capacity: int = 1024):
+        self.vocab: Dict[str, int] = {}
+        self.postings: List[np.ndarray] = []
+        self.weights: List[np.ndarray] = []
+        self._pending: Dict[int, list] = {}
+        self.slot_of: Dict[int, int] = {}
+        self.size = 0
+        self.live = 0
+        self._allocate(capacity)
+        self._lock = threading.Lock()
+
+    def _allocate(self, capacity):
+        old = getattr(self, 'ids', None)
+        arrays = {
+            'ids': np.zeros(capacity, dtype=np.int64),
+            # Unit vectors on the sphere: distance is a float32 chord, no per-row trig
+            'x': np.full(capacity, np.nan, dtype=np.float32),
+            'y': np.full(capacity, np.nan, dtype=np.float32),
+            'z': np.full(capacity, np.nan, dtype=np.float32),
+            'created': np.zeros(capacity, dtype=np.float32),
+            'kind': np.zeros(capacity, dtype=np.int8),
+            'alive': np.zeros(capacity, dtype=bool),
+        }
+        for name, array in arrays.items():
+            if old is not None:
+                array[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, array)
+
+    @staticmethod
+    def _document(row) -> List[Tuple[str, float]]:
+        _, _, name, crop, description, location, district = row[:7]
+        weighted = {token: 1.0 for token in tokenize(f"{name} {crop}")}
+        for token in tokenize(f"{description} {location} {district}"):
+            weighted.setdefault(token, SECONDARY_WEIGHT)
+        return list(weighted.items())
+
+    def _token_id(self, token: str) -> int:
+        tid = self.vocab.get(token)
+        if tid is None:
+            tid = self.vocab[token] = len(self.postings)
+            self.postings.append(np.zeros(0, dtype=np.int32))
+            self.weights.append(np.zeros(0, dtype=np.float32))
+        return tid
+
+    def _store(self, slot, row):
+        self.ids[slot] = row[0]
+        self.kind[slot] = row[1] == Listing.SELL
+        if row[7] is not None and row[8] is not None:
+            self.x[slot], self.y[slot], self.z[slot] = _unit_vector(row[7], row[8])
+        # Days since the epoch
+        self.created[slot] = row[9].timestamp() / 86400
+        self.alive[slot] = True
+        self.slot_of[row[0]] = slot
+        self.live += 1
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple], expected: int = 0) -> 'ListingSearchIndex':
+        """Bulk build: token/slot pairs are collected flat and grouped with one sort."""
+        index = cls(capacity=max(expected, 1024))
+        token_ids, slots, weights = array('i'), array('i'), array('f')
+        for row in rows:
+            if not row[10]:
+                continue
+            slot = index.size
+            if slot >= len(index.ids):
+                index._allocate(2 * len(index.ids))
+            index._store(slot, row)
+            index.size += 1
+            for token, weight in cls._document(row):
+                token_ids.append(index._token_id(token))
+                slots.append(slot)
+                weights.append(weight)
+
+        token_ids = np.frombuffer(token_ids, dtype=np.int32)
+        order = np.argsort(token_ids, kind='stable')
+        slots = np.frombuffer(slots, dtype=np.int32)[order]
+        weights = np.frombuffer(weights, dtype=np.float32)[order]
+        bounds = np.searchsorted(token_ids[order], np.arange(len(index.postings) + 1))
+        for tid in range(len(index.postings)):
+            index.postings[tid] = slots[bounds[tid]:bounds[tid + 1]]
+            index.weights[tid] = weights[bounds[tid]:bounds[tid + 1]]
+        return index
+
+    def upsert(self, row):
+        """Add or replace one listing. Replaced slots are marked dead, not reused (see ``MIN_LIVE_FRACTION``)."""
+        with self._lock:
+            self._remove(row[0])
+            if not row[10]:
+                return
+            if self.size >= len(self.ids):
+                self._allocate(2 * len(self.ids))
+            slot = self.size
+            self._store(slot, row)
+            self.size += 1
+            for token, weight in self._document(row):
+                self._pending.setdefault(self._token_id(token), []).append((slot, weight))
+
+    def remove(self, listing_id):
+        with self._lock:
+            self._remove(listing_id)
+
+    def _remove(self, listing_id):
+        slot = self.slot_of.pop(listing_id, None)
+        if slot is not None and self.alive[slot]:
+            self.alive[slot] = False
+            self.live -= 1
+
+    def _postings(self, tid):
+        pending = self._pending.pop(tid, None)
+        if pending:
+            added = np.array(pending, dtype=np.float64)
+            self.postings[tid] = np.concatenate([self.postings[tid], added[:, 0].astype(np.int32)])
+            self.weights[tid] = np.concatenate([self.weights[tid], added[:, 1].astype(np.float32)])
+        return self.postings[tid], self.weights[tid]
+
+    def search(self, text: str, origin: Optional[Tuple[float, float]] = None,
+               listing_type: Optional[str] = None, limit: int = 20) -> List[Tuple[int, float, Optional[float]]]:
+        """Top ``limit`` as (listing id, score, distance km or None)."""
+        tokens = tokenize(text)
+        size = self.size
+        if not size:
+            return []
+
+        with self._lock:
+            terms = [self._postings(self.vocab[t]) for t in tokens if t in self.vocab]
+        if tokens and not terms:
+            return []
+
+        # Dense masks over all slots are cheaper than gathering per candidate
+        eligible = self.alive[:size].copy()
+        if listing_type is not None:
+            eligible &= self.kind[:size] == (listing_type == Listing.SELL)
+
+        if terms:
+            live = max(self.live, 1)
+            scores = np.zeros(size, dtype=np.float32)
+            hit = np.zeros(size, dtype=bool)
+            total_idf = 0.0
+            for slots, weights in terms:
+                idf = math.log(1 + live / (1 + len(slots)))
+                total_idf += idf
+                # Postings are in slot order; drop slots added after ``size`` was read
+                end = np.searchsorted(slots, size)
+                scores[slots[:end]] += weights[:end] * idf
+                hit[slots[:end]] = True
+            # Unknown query tokens still count against coverage
+            total_idf += math.log(1 + live) * (len(tokens) - len(terms))
+            candidates = np.flatnonzero(hit & eligible)
+            text_score = scores[candidates] / np.float32(total_idf)
+        else:
+            candidates = np.flatnonzero(eligible)
+            text_score = np.ones(len(candidates), dtype=np.float32)
+        if not len(candidates):
+            return []
+
+        age_days = np.float32(time.time() / 86400) - self.created[candidates]
+        boost = 1 + FRESH_WEIGHT * np.exp(-np.maximum(age_days, 0) / FRESH_DAYS)
+        distance = None
+        if origin is not None:
+            x0, y0, z0 = _unit_vector(*origin)
+            dx, dy, dz = self.x[candidates] - x0, self.y[candidates] - y0, self.z[candidates] - z0
+            chord = np.sqrt(dx * dx + dy * dy + dz * dz)
+            distance = (2 * EARTH_RADIUS_KM) * np.arcsin(np.minimum(chord / 2, 1))
+            boost += GEO_WEIGHT * np.nan_to_num(1 / (1 + distance / GEO_SCALE_KM))
+        score = text_score * boost
+
+        if len(score) > limit:
+            top = np.argpartition(-score, limit)[:limit]
+        else:
+            top = np.arange(len(score))
+        top = top[np.argsort(-score[top], kind='stable')]
+        return [
+            (int(self.ids[candidates[i]]), float(score[i]),
+             None if distance is None or np.isnan(distance[i]) else float(distance[i]))
+            for i in top
+        ]
+
+
+def listing_row(listing) -> tuple:
+    return tuple(getattr(listing, field) for field in ROW_FIELDS)
+
+
+_index: Optional[ListingSearchIndex] = None
+_rebuild_version = None
+_synced_at = None
+_checked_at = 0.0
+_lock = threading.Lock()
+# Listing id -> updated_at already applied by _sync; rows stay in the slack
+# window for several syncs and are only re-indexed when they changed again
+_applied: Dict[int, object] = {}
+
+
+def _sync(index, since):
+    window = since - timedelta(seconds=settings.MARKETPLACE_SEARCH_SYNC_SLACK)
+    changed = Listing.objects.filter(updated_at__gte=window).values_list(*ROW_FIELDS, 'updated_at')
+    for row in changed.iterator(chunk_size=2000):
+        if _applied.get(row[0]) != row[-1]:
+            index.upsert(row[:-1])
+            _applied[row[0]] = row[-1]
+    for listing_id in ListingTombstone.objects.filter(deleted_at__gte=window).values_list('listing_id', flat=True):
+        index.remove(listing_id)
+    for listing_id in [pk for pk, updated_at in _applied.items() if updated_at < window]:
+        del _applied[listing_id]
+
+
+def _tombstone_cutoff(now):
+    return now - timedelta(hours=settings.MARKETPLACE_SEARCH_TOMBSTONE_HOURS)
+
+
+def get_search_index() -> ListingSearchIndex:
+    """Process-wide index; pulls other processes' listing writes and deletes every few seconds."""
+    global _index, _rebuild_version, _synced_at, _checked_at
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < settings.MARKETPLACE_SEARCH_CHECK_SECONDS:
+        return _index
+    with _lock:
+        rebuild_version = current(SEARCH_REBUILD)
+        started = timezone.now()
+        window = timedelta(seconds=settings.MARKETPLACE_SEARCH_SYNC_SLACK)
+        if (_index is None or rebuild_version != _rebuild_version
+                or _synced_at - window < _tombstone_cutoff(started)
+                or _index.live < _index.size * MIN_LIVE_FRACTION):
+            rows = Listing.objects.filter(is_active=True).values_list(*ROW_FIELDS).iterator(chunk_size=5000)
+            _index = ListingSearchIndex.build(rows, expected=Listing.objects.count())
+            _applied.clear()
+        else:
+            _sync(_index, _synced_at)
+        _synced_at = started
+        _rebuild_version = rebuild_version
+        _checked_at = now
+    return _index
+
+
+def listing_saved(listing):
+    if _index is not None:
+        _index.upsert(listing_row(listing))
+
+
+def listing_deleted(listing):
+    if _index is not None:
+        _index.remove(listing.pk)
+    ListingTombstone.objects.create(listing_id=listing.pk)
+    ListingTombstone.objects.filter(deleted_at__lt=_tombstone_cutoff(timezone.now())).delete()
@@ -0,0 +1,45 @@
+from rest_framework import serializers
+from mandi.spatial import get_market_index
+from .models import Listing, Order, Review
+
+
+class ListingSerializer(serializers.ModelSerializer):
+    type = serializers.ChoiceField(source='listing_type', choices=Listing.TYPES)
+    seller = serializers.CharField(source='seller.display_name', read_only=True)
+    reviews = serializers.IntegerField(source='review_count', read_only=True)
+
+    class Meta:
+        model = Listing
+        fields = ['id', 'type', 'name', 'description', 'crop', 'seller', 'price', 'quantity', 'unit',
+                  'location', 'district', 'latitude', 'longitude', 'image', 'rating', 'reviews', 'created_at']
+        read_only_fields = ['rating', 'created_at']
+
+    def create(self, validated_data):
+        if validated_data.get('latitude') is None or validated_data.get('longitude') is None:
+            centre = get_market_index().district_centre(validated_data['district'])
+            if centre:
+                validated_data['latitude'], validated_data['longitude'] = centre
+        return super().create(validated_data)
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    reviewer = serializers.CharField(source='reviewer.first_name', read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ['id', 'reviewer', 'rating', 'comment', 'created_at']
+        read_only_fields = ['created_at']
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    listing = serializers.PrimaryKeyRelatedField(queryset=Listing.objects.all())
+
+    class Meta:
+        model = Order
+        fields = ['id', 'listing', 'quantity', 'amount', 'status', 'expires_at', 'created_at', 'confirmed_at']
+        read_only_fields = ['amount', 'status', 'expires_at', 'created_at', 'confirmed_at']
+
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Quantity must be at least 1")
+        return value
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from live.events import listing_changed, listing_removed
+
+from .models import Listing
+from .search import listing_deleted, listing_saved
+
+
+@receiver(post_save, sender=Listing)
+def index_listing(sender, instance, raw=False, **kwargs):
+    if not raw:
+        listing_saved(instance)
+        listing_changed(instance)
+
+
+@receiver(post_delete, sender=Listing)
+def unindex_listing(sender, instance, **kwargs):
+    listing_deleted(instance)
+    listing_removed(instance.pk)
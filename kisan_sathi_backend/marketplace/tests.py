@@ -1,3 +1,223 @@
-from django.test import TestCase
+import base64
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Sum
+from django.db.models.query import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from farmers.tests import make_farmer
+
+from . import search
+from .models import Listing, ListingTombstone, Order, Review, Seller
+from .orders import IdempotencyConflict, InvalidOrderState, OutOfStock, cancel, confirm, release_expired, reserve
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .reviews import submit_review
+
+
+def make_listing(farmer, **fields):
+    fields = {
+        'listing_type': Listing.SELL, 'name': 'Tomatoes', 'crop': 'tomato', 'price': 30, 'quantity': 100,
+        'location': 'Kestur', 'district': 'Mandya', **fields,
+    }
+    return Listing.objects.create(seller=Seller.for_farmer(farmer), **fields)
+
+
+class CursorTests(TestCase):
+    ordering = [('created_at', True), ('id', True)]
+
+    def tampered(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def test_round_trip(self):
+        listing = make_listing(make_farmer())
+        cursor = encode_cursor([listing.created_at, listing.id])
+        self.assertEqual(decode_cursor(cursor, self.ordering, Listing), [listing.created_at, listing.id])
+
+    def test_values_the_columns_would_not_accept_are_invalid(self):
+        for values in (['2026-10-19T04:00:00+00:00', 'abc'], ['2026-10-19T04:00:00+00:00', {'a': 1}],
+                       ['2026-10-19T04:00:00+00:00', None], [5, 1], ['yesterday', 1], 'x', [1]):
+            with self.subTest(values=values):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(self.tampered(values), self.ordering, Listing)
+
+
+class SubmitReviewTests(TestCase):
+    def setUp(self):
+        self.listing = make_listing(make_farmer())
+        self.reviewer = make_farmer(phone='+919800000003', email='reviewer@example.com')
+
+    def test_concurrent_first_review_becomes_an_update(self):
+        submit_review(self.listing, self.reviewer, 4)
+        # The pre-read misses the row another request just inserted
+        with mock.patch.object(QuerySet, 'first', return_value=None):
+            review, created = submit_review(self.listing, self.reviewer, 2, 'changed my mind')
+
+        self.assertFalse(created)
+        self.assertEqual((review.rating, review.comment), (2, 'changed my mind'))
+        self.assertEqual(Review.objects.count(), 1)
+        self.listing.refresh_from_db()
+        self.assertEqual((self.listing.review_count, self.listing.rating_total, self.listing.rating), (1, 2, 2.0))
+
+
+class SearchSyncTests(TestCase):
+    """Another process's index catching up through ``_sync``."""
+
+    def setUp(self):
+        search._index = None
+        search._applied.clear()
+        farmer = make_farmer()
+        self.kept = make_listing(farmer, name='Organic Tomatoes')
+        self.doomed = make_listing(farmer, name='Fresh Tomatoes')
+        rows = Listing.objects.values_list(*search.ROW_FIELDS)
+        self.other = search.ListingSearchIndex.build(rows)
+        self.since = timezone.now() - timedelta(seconds=1)
+
+    def tearDown(self):
+        search._index = None
+        search._applied.clear()
+
+    def ids(self, index):
+        return {listing_id for listing_id, _, _ in index.search('tomatoes')}
+
+    def test_deletes_reach_other_processes_through_tombstones(self):
+        doomed = self.doomed.pk
+        with CaptureQueriesContext(connection) as queries:
+            self.doomed.delete()
+        self.assertFalse(any('stats_' in q['sql'] for q in queries))
+        self.assertTrue(ListingTombstone.objects.filter(listing_id=doomed).exists())
+
+        search._sync(self.other, self.since)
+        self.assertEqual(self.ids(self.other), {self.kept.pk})
+
+    def test_saves_do_not_touch_a_shared_counter(self):
+        self.kept.name, self.kept.crop = 'Organic Onions', 'onion'
+        with CaptureQueriesContext(connection) as queries:
+            self.kept.save()
+        self.assertEqual([q['sql'].split()[0] for q in queries], ['UPDATE'])
+
+        search._sync(self.other, self.since)
+        self.assertEqual(self.ids(self.other), {self.doomed.pk})
+
+    def test_repeated_syncs_do_not_reindex_unchanged_rows(self):
+        search._sync(self.other, self.since)
+        size = self.other.size
+        search._sync(self.other, self.since)
+        self.assertEqual(self.other.size, size)
+        self.assertEqual(self.other.live, 2)
+
+    @override_settings(MARKETPLACE_SEARCH_CHECK_SECONDS=0)
+    def test_dead_slots_are_compacted_by_a_rebuild(self):
+        index = search.get_search_index()
+        self.assertEqual((index.size, index.live), (2, 2))
+        for quantity in range(1, 4):
+            self.kept.quantity = quantity
+            self.kept.save()
+        self.assertEqual((index.size, index.live), (5, 2))
+
+        index = search.get_search_index()
+        self.assertEqual((index.size, index.live), (2, 2))
+        self.assertEqual(self.ids(index), {self.kept.pk, self.doomed.pk})
+
+    def test_old_tombstones_are_pruned(self):
+        stale = ListingTombstone.objects.create(listing_id=12345)
+        ListingTombstone.objects.filter(pk=stale.pk).update(deleted_at=timezone.now() - timedelta(days=2))
+        self.doomed.delete()
+        self.assertFalse(ListingTombstone.objects.filter(pk=stale.pk).exists())
+
+
+class ListingReviewsViewTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.listing = make_listing(make_farmer())
+
+    def reviews(self, pk):
+        return self.client.get(f'/api/marketplace/listings/{pk}/reviews/')
+
+    def test_reviews_of_a_missing_listing_are_not_found(self):
+        self.assertEqual(self.reviews(self.listing.pk + 1).status_code, 404)
+
+    def test_a_listing_without_reviews_has_an_empty_page(self):
+        self.assertEqual(self.reviews(self.listing.pk).json()['data'], [])
+        submit_review(self.listing, make_farmer(phone='+919800000003', email='reviewer@example.com'), 5)
+        self.assertEqual([row['rating'] for row in self.reviews(self.listing.pk).json()['data']], [5])
+
+
+class ConcurrentOrderTests(TransactionTestCase):
+    """Reservations, retries, confirmations and cancellations racing on one listing."""
+
+    stock = 300
+    requests = 600
+    threads = 8
+    hold_seconds = 1
+
+    def setUp(self):
+        self.buyers = [
+            make_farmer(phone=f'+91980002{i:04d}', email=f'buyer{i}@example.com') for i in range(20)
+        ]
+        self.listing = make_listing(make_farmer(), quantity=self.stock)
+
+    def work(self, i):
+        rng = random.Random(i)
+        buyer = self.buyers[i % len(self.buyers)]
+        key = f'req-{i}'
+        outcomes = []
+        try:
+            order, created = reserve(self.listing.pk, buyer, rng.randint(1, 3), key)
+            outcomes.append('reserved' if created else 'replayed')
+            # A client retry of the same request must not reserve twice
+            if rng.random() < 0.2:
+                again, created = reserve(self.listing.pk, buyer, order.quantity, key)
+                outcomes.append('replayed' if not created and again.pk == order.pk else 'DUPLICATE')
+            roll = rng.random()
+            if roll < 0.6:
+                confirm(order.pk, buyer)
+                outcomes.append('confirmed')
+            elif roll < 0.8:
+                cancel(order.pk, buyer)
+                outcomes.append('cancelled')
+        except OutOfStock:
+            outcomes.append('out of stock')
+        except (InvalidOrderState, IdempotencyConflict) as e:
+            outcomes.append(type(e).__name__)
+        return outcomes
+
+    def test_stock_is_never_oversold_or_lost(self):
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def worker(start):
+            # One connection per thread, as in a threaded app server
+            try:
+                for i in range(start, self.requests, self.threads):
+                    result = self.work(i)
+                    with lock:
+                        outcomes.update(result)
+            finally:
+                connection.close()
+
+        with override_settings(MARKETPLACE_HOLD_SECONDS=self.hold_seconds):
+            with ThreadPoolExecutor(self.threads) as pool:
+                list(pool.map(worker, range(self.threads)))
+        time.sleep(self.hold_seconds + 0.1)
+        while release_expired():
+            pass
+
+        self.listing.refresh_from_db()
+        orders = Order.objects.filter(listing=self.listing)
+        held = orders.filter(status__in=[Order.RESERVED, Order.CONFIRMED]).aggregate(total=Sum('quantity'))['total']
+        self.assertEqual(self.listing.quantity + (held or 0), self.stock)
+        self.assertGreater(outcomes['out of stock'], 0, "The lot should sell out under this load")
+        self.assertEqual(outcomes['DUPLICATE'], 0)
+        self.assertEqual(orders.values('buyer', 'request_key').distinct().count(), orders.count())
@@ -1,7 +1,16 @@
 from django.urls import path
+from .views import (
+    ListingDetailView, ListingListView, ListingReviewsView, MarketplaceSearchView, OrderActionView, OrderListView,
+)
 
 app_name = 'marketplace'
 
-urlpatterns = []
-
-
+urlpatterns = [
+    path('listings/', ListingListView.as_view(), name='listings'),
+    path('listings/<int:pk>/', ListingDetailView.as_view(), name='listing-detail'),
+    path('listings/<int:pk>/reviews/', ListingReviewsView.as_view(), name='listing-reviews'),
+    path('search/', MarketplaceSearchView.as_view(), name='search'),
+    path('orders/', OrderListView.as_view(), name='orders'),
+    path('orders/<int:pk>/confirm/', OrderActionView.as_view(), {'action': 'confirm'}, name='order-confirm'),
+    path('orders/<int:pk>/cancel/', OrderActionView.as_view(), {'action': 'cancel'}, name='order-cancel'),
+]
@@ -1,3 +1,235 @@
-from django.shortcuts import render
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from kisan_sathi.db_router import ReplicaReadMixin
+from mandi.spatial import get_market_index
+from .models import Listing, Order, Review, Seller
+from .orders import IdempotencyConflict, InvalidOrderState, OutOfStock, cancel, confirm, reserve
+from .pagination import InvalidCursor, keyset_page
+from .reviews import submit_review
+from .search import get_search_index, parse_query
+from .serializers import ListingSerializer, OrderSerializer, ReviewSerializer
 
-# Create your views here.
+
+LISTING_SORTS = {
+    'newest': [('created_at', True), ('id', True)],
+    'price_low': [('price', False), ('id', False)],
+    'price_high': [('price', True), ('id', True)],
+    'rating': [('rating', True), ('id', True)],
+}
+MAX_PAGE_SIZE = 50
+
+
+def _page_size(request, default=20):
+    try:
+        return max(1, min(int(request.query_params.get('page_size', default)), MAX_PAGE_SIZE))
+    except ValueError:
+        return default
+
+
+class ListingListView(ReplicaReadMixin, APIView):
+    """
+    Active listings of one ``type`` (buy/sell), optionally filtered by
+    ``crop`` and ``location`` (district), in ``sort`` order. Pages are
+    fetched with the opaque ``cursor`` returned as ``next``.
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        params = request.query_params
+        listing_type = params.get('type', Listing.BUY)
+        ordering = LISTING_SORTS.get(params.get('sort', 'newest'))
+        if listing_type not in dict(Listing.TYPES) or ordering is None:
+            return Response({
+                'success': False,
+                'message': 'Invalid type or sort'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        listings = Listing.objects.filter(listing_type=listing_type, is_active=True).select_related('seller')
+        if params.get('crop'):
+            listings = listings.filter(crop=params['crop'].strip().lower())
+        if params.get('location'):
+            listings = listings.filter(district=params['location'].strip())
+
+        try:
+            rows, next_cursor = keyset_page(listings, ordering, params.get('cursor'), _page_size(request))
+        except InvalidCursor as e:
+            return Response({'success': False, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'data': ListingSerializer(rows, many=True).data,
+            'next': next_cursor,
+        })
+
+    def post(self, request):
+        serializer = ListingSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        listing = serializer.save(seller=Seller.for_farmer(request.user))
+        return Response({
+            'success': True,
+            'data': ListingSerializer(listing).data
+        }, status=status.HTTP_201_CREATED)
+
+
+class ListingDetailView(ReplicaReadMixin, APIView):
+    def get(self, request, pk):
+        listing = get_object_or_404(Listing.objects.select_related('seller'), pk=pk)
+        data = ListingSerializer(listing).data
+        data['sellerRating'] = listing.seller.rating
+        data['sellerReviews'] = listing.seller.review_count
+        return Response({'success': True, 'data': data})
+
+
+class ListingReviewsView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request, pk):
+        reviews = Review.objects.filter(listing_id=pk).select_related('reviewer')
+        try:
+            rows, next_cursor = keyset_page(reviews, [('id', True)], request.query_params.get('cursor'),
+                                            _page_size(request))
+        except InvalidCursor as e:
+            return Response({'success': False, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Only an empty page needs the listing looked up
+        if not rows and not Listing.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response({
+            'success': True,
+            'data': ReviewSerializer(rows, many=True).data,
+            'next': next_cursor,
+        })
+
+    def post(self, request, pk):
+        listing = get_object_or_404(Listing, pk=pk)
+        if listing.seller.farmer_id == request.user.pk:
+            return Response({
+                'success': False,
+                'message': 'You cannot review your own listing'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ReviewSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        review, created = submit_review(listing, request.user, serializer.validated_data['rating'],
+                                        serializer.validated_data.get('comment', ''))
+        return Response({
+            'success': True,
+            'data': ReviewSerializer(review).data
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class MarketplaceSearchView(ReplicaReadMixin, APIView):
+    """
+    Ranked listing search, e.g. ``q=organic tomatoes near Mandya``. The
+    buyer's position comes from ``lat``/``lon``, else a place named after
+    "near", else the farmer's own district.
+    """
+
+    def get(self, request):
+        params = request.query_params
+        listing_type = params.get('type')
+        if listing_type is not None and listing_type not in dict(Listing.TYPES):
+            return Response({'success': False, 'message': 'Invalid type'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(params.get('limit', 20)), MAX_PAGE_SIZE))
+            origin = (float(params['lat']), float(params['lon'])) if 'lat' in params and 'lon' in params else None
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'Invalid limit or lat/lon'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        text, place = parse_query(params.get('q', ''))
+        if origin is None:
+            markets = get_market_index()
+            origin = markets.district_centre(place) if place else None
+            if origin is None:
+                if place:
+                    # Unknown place: match it against listing locations as text
+                    text = f"{text} {place}"
+                origin = markets.district_centre(getattr(request.user, 'district', ''))
+
+        hits = get_search_index().search(text, origin=origin, listing_type=listing_type, limit=limit)
+        listings = Listing.objects.select_related('seller').in_bulk([listing_id for listing_id, _, _ in hits])
+        data = []
+        for listing_id, score, distance in hits:
+            listing = listings.get(listing_id)
+            # The index can briefly trail other processes' writes
+            if listing is None or not listing.is_active:
+                continue
+            item = ListingSerializer(listing).data
+            item['score'] = round(score, 4)
+            item['distanceKm'] = None if distance is None else round(distance, 1)
+            data.append(item)
+        return Response({'success': True, 'query': text, 'near': origin, 'data': data})
+
+
+class OrderListView(APIView):
+    """
+    ``POST`` reserves stock on a listing. Clients send an ``Idempotency-Key``
+    header; repeating a request with the same key returns the original
+    order instead of reserving again.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        orders = Order.objects.filter(buyer=request.user)
+        try:
+            rows, next_cursor = keyset_page(orders, [('id', True)], request.query_params.get('cursor'),
+                                            _page_size(request))
+        except InvalidCursor as e:
+            return Response({'success': False, 'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'success': True, 'data': OrderSerializer(rows, many=True).data, 'next': next_cursor})
+
+    def post(self, request):
+        request_key = request.headers.get('Idempotency-Key', '').strip()
+        if not request_key or len(request_key) > 64:
+            return Response({
+                'success': False,
+                'message': 'Idempotency-Key header (up to 64 characters) required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = OrderSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            order, created = reserve(serializer.validated_data['listing'].pk, request.user,
+                                     serializer.validated_data['quantity'], request_key)
+        except OutOfStock as e:
+            return Response({'success': False, 'message': str(e)}, status=status.HTTP_409_CONFLICT)
+        except IdempotencyConflict as e:
+            return Response({'success': False, 'message': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        return Response({
+            'success': True,
+            'data': OrderSerializer(order).data
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class OrderActionView(APIView):
+    permission_classes = [IsAuthenticated]
+    actions = {'confirm': confirm, 'cancel': cancel}
+
+    def post(self, request, pk, action):
+        try:
+            order = self.actions[action](pk, request.user)
+        except InvalidOrderState as e:
+            return Response({'success': False, 'message': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response({'success': True, 'data': OrderSerializer(order).data})
@@ -0,0 +1,49 @@
+"""
+SMS backends, selected with ``settings.SMS_BACKEND``. Email goes through
+Django's ``EMAIL_BACKEND`` (console/file/locmem stand in for SMTP locally).
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseSMSBackend:
+    """Connection-style backend: the worker opens it once per run and sends many messages."""
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, phone: str, body: str):
+        raise NotImplementedError
+
+
+class ConsoleSMSBackend(BaseSMSBackend):
+    def send(self, phone, body):
+        print(f"\n{'='*50}")
+        print(f"SMS to {phone}: {body}")
+        print(f"{'='*50}\n")
+
+
+class FileSMSBackend(BaseSMSBackend):
+    """Append messages to ``settings.SMS_FILE_PATH``; useful in tests and load runs."""
+
+    def __init__(self):
+        self._stream = None
+
+    def open(self):
+        if self._stream is None:
+            self._stream = open(settings.SMS_FILE_PATH, 'a', encoding='utf-8')
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def send(self, phone, body):
+        self._stream.write(f"{phone}\t{body}\n")
+
+
+def get_sms_backend() -> BaseSMSBackend:
+    return import_string(settings.SMS_BACKEND)()
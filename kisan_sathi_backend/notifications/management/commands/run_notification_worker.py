@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import Dispatcher
+
+
+class Command(BaseCommand):
+    help = "Drain the notification outbox, sending queued email and SMS in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once nothing is due")
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=1.0, help="Idle poll interval in seconds")
+        parser.add_argument('--report-every', type=float, default=60.0,
+                            help="Seconds between metrics reports while running")
+
+    def handle(self, *args, **options):
+        with Dispatcher(options['batch_size']) as dispatcher:
+            reported_at = time.monotonic()
+            try:
+                while True:
+                    claimed = dispatcher.drain_once()
+                    if time.monotonic() - reported_at >= options['report_every']:
+                        # A long-running worker would otherwise only report when it exits
+                        self.stdout.write(str(dispatcher.metrics.as_dict()))
+                        self.stdout.flush()
+                        reported_at = time.monotonic()
+                    if claimed:
+                        continue
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(str(dispatcher.metrics.as_dict()))
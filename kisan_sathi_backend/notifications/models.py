@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    CHANNEL_EMAIL = 'email'
+    CHANNEL_SMS = 'sms'
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+
+    channel = models.CharField(max_length=8, choices=[(CHANNEL_EMAIL, 'Email'), (CHANNEL_SMS, 'SMS')])
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200, blank=True)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=8,
+        choices=[(STATUS_PENDING, 'Pending'), (STATUS_SENT, 'Sent'), (STATUS_DEAD, 'Dead')],
+        default=STATUS_PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # Also used as a lease: claimed rows are pushed forward while a worker sends them
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notification_outbox'
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self) -> str:
+        return f"{self.channel} to {self.recipient} ({self.status})"
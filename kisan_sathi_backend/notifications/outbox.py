@@ -0,0 +1,164 @@
+"""
+Notification outbox.
+
+``enqueue_email``/``enqueue_sms`` only insert a row, so they join the
+caller's transaction and never block on SMTP/SMS gateways. ``drain`` is run
+by the ``run_notification_worker`` command: it claims due rows in batches,
+sends them over connections kept open for the whole run, and reschedules
+failures with exponential backoff until they are dead-lettered.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .backends import get_sms_backend
+from .models import OutboxMessage
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(recipient, subject, body):
+    return OutboxMessage.objects.create(
+        channel=OutboxMessage.CHANNEL_EMAIL, recipient=recipient, subject=subject, body=body
+    )
+
+
+def enqueue_sms(recipient, body):
+    return OutboxMessage.objects.create(channel=OutboxMessage.CHANNEL_SMS, recipient=recipient, body=body)
+
+
+@dataclass
+class DispatchMetrics:
+    batches: int = 0
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+    send_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Messages delivered per second of send time."""
+        return self.sent / self.send_seconds if self.send_seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'batches': self.batches,
+            'sent': self.sent,
+            'retried': self.retried,
+            'dead': self.dead,
+            'send_seconds': round(self.send_seconds, 3),
+            'throughput': round(self.throughput, 1),
+        }
+
+
+def _claim_batch(size):
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+    with transaction.atomic():
+        # skip_locked lets several workers drain concurrently on Postgres; a no-op on SQLite
+        ids = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxMessage.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:size]
+        )
+        OutboxMessage.objects.filter(id__in=ids).update(next_attempt_at=lease_until)
+    return list(OutboxMessage.objects.filter(id__in=ids))
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(
+        settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.NOTIFICATION_RETRY_MAX_SECONDS,
+    ))
+
+
+class Dispatcher:
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.metrics = DispatchMetrics()
+        self._mail = get_connection()
+        self._sms = get_sms_backend()
+
+    def __enter__(self):
+        self._mail.open()
+        self._sms.open()
+        return self
+
+    def __exit__(self, *exc):
+        self._mail.close()
+        self._sms.close()
+
+    def _reconnect_mail(self):
+        # A failed SMTP conversation can leave the connection unusable
+        try:
+            self._mail.close()
+            self._mail.open()
+        except Exception:
+            logger.warning("Could not reopen mail connection", exc_info=True)
+
+    def _send(self, message):
+        if message.channel == OutboxMessage.CHANNEL_EMAIL:
+            EmailMessage(
+                message.subject, message.body, settings.DEFAULT_FROM_EMAIL, [message.recipient],
+                connection=self._mail,
+            ).send()
+        else:
+            self._sms.send(message.recipient, message.body)
+
+    def drain_once(self):
+        """Send one batch of due messages; returns the number claimed."""
+        batch = _claim_batch(self.batch_size)
+        if not batch:
+            return 0
+
+        started = time.monotonic()
+        sent, failed = [], []
+        for message in batch:
+            message.attempts += 1
+            try:
+                self._send(message)
+            except Exception as e:
+                message.last_error = f"{type(e).__name__}: {e}"
+                failed.append(message)
+                if message.channel == OutboxMessage.CHANNEL_EMAIL:
+                    self._reconnect_mail()
+            else:
+                sent.append(message)
+        self.metrics.send_seconds += time.monotonic() - started
+
+        now = timezone.now()
+        for message in sent:
+            message.status = OutboxMessage.STATUS_SENT
+            message.sent_at = now
+            message.last_error = ''
+        for message in failed:
+            if message.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+                message.status = OutboxMessage.STATUS_DEAD
+                self.metrics.dead += 1
+                logger.error("Dead-lettered outbox message %s: %s", message.id, message.last_error)
+            else:
+                message.next_attempt_at = now + _backoff(message.attempts)
+                self.metrics.retried += 1
+        OutboxMessage.objects.bulk_update(
+            batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+
+        self.metrics.batches += 1
+        self.metrics.sent += len(sent)
+        return len(batch)
+
+
+def drain(batch_size=None):
+    """Drain every message that is currently due and return the run metrics."""
+    with Dispatcher(batch_size) as dispatcher:
+        while dispatcher.drain_once():
+            pass
+    return dispatcher.metrics
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .backends import BaseSMSBackend
+from .models import OutboxMessage
+from .outbox import Dispatcher, _claim_batch, enqueue_email, enqueue_sms
+
+
+class RecordingSMSBackend(BaseSMSBackend):
+    sent = []
+
+    def send(self, phone, body):
+        self.sent.append((phone, body))
+
+
+class FailingSMSBackend(BaseSMSBackend):
+    def send(self, phone, body):
+        raise ConnectionError("gateway unavailable")
+
+
+@override_settings(SMS_BACKEND='notifications.tests.RecordingSMSBackend', NOTIFICATION_MAX_ATTEMPTS=3,
+                   NOTIFICATION_RETRY_BASE_SECONDS=30, NOTIFICATION_RETRY_MAX_SECONDS=45)
+class DispatcherTests(TestCase):
+    def setUp(self):
+        RecordingSMSBackend.sent = []
+
+    def test_sends_due_email_and_sms(self):
+        enqueue_email('farmer@example.com', 'Your OTP', '123456')
+        enqueue_sms('+919800000001', 'Your OTP is 123456')
+        with Dispatcher() as dispatcher:
+            self.assertEqual(dispatcher.drain_once(), 2)
+            self.assertEqual(dispatcher.drain_once(), 0)
+        self.assertEqual([message.to for message in mail.outbox], [['farmer@example.com']])
+        self.assertEqual(RecordingSMSBackend.sent, [('+919800000001', 'Your OTP is 123456')])
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.STATUS_SENT).count(), 2)
+        self.assertEqual(dispatcher.metrics.as_dict()['sent'], 2)
+
+    @override_settings(NOTIFICATION_LEASE_SECONDS=60)
+    def test_claimed_messages_are_leased(self):
+        message = enqueue_sms('+919800000001', 'hello')
+        before = timezone.now()
+        self.assertEqual([m.pk for m in _claim_batch(10)], [message.pk])
+        # A second worker finds nothing due while the lease runs
+        self.assertEqual(_claim_batch(10), [])
+        message.refresh_from_db()
+        self.assertGreaterEqual(message.next_attempt_at, before + timedelta(seconds=60))
+        self.assertEqual(message.status, OutboxMessage.STATUS_PENDING)
+
+    @override_settings(SMS_BACKEND='notifications.tests.FailingSMSBackend')
+    def test_failures_back_off_then_dead_letter(self):
+        message = enqueue_sms('+919800000001', 'hello')
+        delays = []
+        with Dispatcher() as dispatcher, self.assertLogs('notifications.outbox', 'ERROR'):
+            for _ in range(3):
+                started = timezone.now()
+                self.assertEqual(dispatcher.drain_once(), 1)
+                message.refresh_from_db()
+                delays.append(round((message.next_attempt_at - started).total_seconds()))
+                # Nothing is due until the backoff has passed
+                self.assertEqual(dispatcher.drain_once(), 0)
+                OutboxMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now())
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.STATUS_DEAD)
+        self.assertEqual(message.attempts, 3)
+        self.assertEqual(message.last_error, 'ConnectionError: gateway unavailable')
+        # 30s, then doubled but capped at 45s; the dead letter keeps its last schedule
+        self.assertEqual(delays[:2], [30, 45])
+        self.assertEqual((dispatcher.metrics.retried, dispatcher.metrics.dead, dispatcher.metrics.sent), (2, 1, 0))
+
+    def test_worker_reports_metrics_while_running(self):
+        enqueue_sms('+919800000001', 'hello')
+        out = StringIO()
+        call_command('run_notification_worker', once=True, report_every=0, stdout=out)
+        reports = out.getvalue().splitlines()
+        # One report after each batch and idle poll, and one on exit
+        self.assertGreaterEqual(len(reports), 3)
+        self.assertIn("'sent': 1", reports[0])
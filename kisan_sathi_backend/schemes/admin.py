@@ -1,3 +1,18 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from .models import Scheme
+from .notify import notify_eligible_farmers
+
+
+@admin.register(Scheme)
+class SchemeAdmin(admin.ModelAdmin):
+    list_display = ['name', 'benefit', 'deadline', 'is_active', 'updated_at']
+    list_filter = ['is_active']
+    search_fields = ['name']
+    actions = ['notify_eligible']
+
+    @admin.action(description="Notify eligible farmers by SMS")
+    def notify_eligible(self, request, queryset):
+        for scheme in queryset.filter(is_active=True):
+            queued = notify_eligible_farmers(scheme)
+            self.message_user(request, f"{scheme.name}: queued {queued} SMS", messages.SUCCESS)
@@ -0,0 +1,97 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from schemes.matching import Profile, compile_rules
+
+
+CROPS = ['rice', 'ragi', 'maize', 'sugarcane', 'cotton', 'tomato', 'onion', 'coconut', 'arecanut', 'coffee']
+DISTRICTS = ['Mandya', 'Mysuru', 'Hassan', 'Kolar', 'Belagavi', 'Tumakuru', 'Shivamogga', 'Dharwad', 'Raichur']
+
+
+def interpret(rules, profile):
+    """Reference matcher that re-reads the JSON on every call."""
+    for key, value in rules.items():
+        if key == 'verified' and profile.verified is not value:
+            return False
+        if key == 'districts' and profile.district not in [d.lower() for d in value]:
+            return False
+        if key == 'taluks' and profile.taluk not in [t.lower() for t in value]:
+            return False
+        if key == 'land_size':
+            if profile.land_size is None:
+                return False
+            if 'min' in value and profile.land_size < value['min']:
+                return False
+            if 'max' in value and profile.land_size > value['max']:
+                return False
+        if key == 'crops' and not profile.crops & {c.lower() for c in value}:
+            return False
+        if key == 'any' and not any(interpret(option, profile) for option in value):
+            return False
+    return True
+
+
+class Command(BaseCommand):
+    help = "Time compiled scheme matching against re-interpreting the rules, over synthetic profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schemes', type=int, default=200)
+        parser.add_argument('--farmers', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _rules(self, rng, depth=0):
+        rules = {}
+        if rng.random() < 0.3:
+            rules['verified'] = True
+        if rng.random() < 0.4:
+            rules['districts'] = rng.sample(DISTRICTS, rng.randint(1, 4))
+        if rng.random() < 0.5:
+            rules['land_size'] = {'max': rng.choice([2.5, 5, 10])}
+        if rng.random() < 0.5:
+            rules['crops'] = rng.sample(CROPS, rng.randint(1, 3))
+        if depth == 0 and rng.random() < 0.2:
+            rules['any'] = [self._rules(rng, 1) for _ in range(2)]
+        return rules
+
+    def _profile(self, rng):
+        return Profile.from_values(
+            None if rng.random() < 0.1 else round(rng.uniform(0.5, 20), 2),
+            rng.sample(CROPS, rng.randint(0, 3)),
+            rng.choice(DISTRICTS), f"Taluk {rng.randint(1, 5)}", rng.random() < 0.7,
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rule_sets = [self._rules(rng) for _ in range(options['schemes'])]
+        profiles = [self._profile(rng) for _ in range(options['farmers'])]
+
+        started = time.perf_counter()
+        predicates = [compile_rules(rules).predicate for rules in rule_sets]
+        compiled = time.perf_counter() - started
+
+        started = time.perf_counter()
+        matches = [[i for i, predicate in enumerate(predicates) if predicate(p)] for p in profiles]
+        fast = time.perf_counter() - started
+
+        started = time.perf_counter()
+        expected = [[i for i, rules in enumerate(rule_sets) if interpret(rules, p)] for p in profiles]
+        slow = time.perf_counter() - started
+        if matches != expected:
+            raise CommandError("Compiled rules disagree with the reference matcher")
+
+        started = time.perf_counter()
+        predicate = predicates[0]
+        eligible = sum(1 for p in profiles if predicate(p))
+        one_scheme = time.perf_counter() - started
+
+        pairs = len(profiles) * len(predicates)
+        self.stdout.write(f"Compiled {len(predicates)} schemes in {compiled * 1000:.1f} ms")
+        self.stdout.write(
+            f"All schemes x {len(profiles)} farmers: {fast:.2f}s compiled "
+            f"({fast / pairs * 1e9:.0f} ns/check, {fast / len(profiles) * 1e6:.1f} us/farmer) "
+            f"vs {slow:.2f}s interpreted ({slow / fast:.1f}x)"
+        )
+        self.stdout.write(f"One scheme over all farmers: {one_scheme * 1000:.1f} ms ({eligible} eligible)")
+        self.stdout.write(self.style.SUCCESS("OK"))
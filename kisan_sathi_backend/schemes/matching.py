@@ -0,0 +1,252 @@
+"""
+Scheme eligibility matching.
+
+A scheme's ``rules`` is a JSON object whose keys must all hold:
+
+    {
+        "land_size": {"min": 0, "max": 5},   # acres, either bound optional
+        "crops": ["rice", "ragi"],           # grows at least one of these
+        "districts": ["Mandya", "Mysuru"],
+        "taluks": ["Maddur"],
+        "verified": true,
+        "any": [{...}, {...}]                # at least one nested rule set holds
+    }
+
+An empty object matches every farmer. ``compile_rules`` turns the JSON into
+a chain of closures once per scheme (cheapest and most selective checks
+first) plus a ``Q`` that narrows the farmers table for the checks SQL can
+express, so matching is plain function calls over a ``Profile`` with no
+per-match parsing.
+
+``get_matcher`` keeps the compiled active schemes per process and rebuilds
+them when the schemes version counter changes. ``eligible_scheme_ids``
+caches a farmer's matches under a hash of the profile fields rules can
+read, so any profile edit misses the cache and farmers with identical
+profiles share one entry.
+"""
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Callable, FrozenSet, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from stats.counters import current
+
+from .models import Scheme
+
+
+SCHEMES_VERSION = 'schemes.version'
+RULE_KEYS = {'land_size', 'crops', 'districts', 'taluks', 'verified', 'any'}
+
+
+class RuleError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Profile:
+    """The farmer fields eligibility rules can read, normalized for matching."""
+
+    land_size: Optional[float]
+    crops: FrozenSet[str]
+    district: str
+    taluk: str
+    verified: bool
+
+    FIELDS = ('land_size', 'crops_grown', 'district', 'taluk', 'is_verified')
+
+    @classmethod
+    def from_values(cls, land_size, crops_grown, district, taluk, is_verified):
+        return cls(
+            land_size=float(land_size) if land_size is not None else None,
+            crops=frozenset(str(c).strip().lower() for c in crops_grown or () if str(c).strip()),
+            district=(district or '').strip().lower(),
+            taluk=(taluk or '').strip().lower(),
+            verified=bool(is_verified),
+        )
+
+    @classmethod
+    def from_farmer(cls, farmer):
+        return cls.from_values(*(getattr(farmer, field) for field in cls.FIELDS))
+
+    def digest(self) -> str:
+        land = '' if self.land_size is None else repr(self.land_size)
+        key = '|'.join([land, ','.join(sorted(self.crops)), self.district, self.taluk, str(int(self.verified))])
+        return hashlib.sha1(key.encode()).hexdigest()
+
+
+Predicate = Callable[[Profile], bool]
+
+
+class Rule(NamedTuple):
+    predicate: Predicate
+    # Superset of the matching farmers; None when no check maps to SQL
+    prefilter: Optional[Q]
+
+
+def _names(rules, key):
+    values = rules[key]
+    if not isinstance(values, list) or not values or not all(isinstance(v, str) for v in values):
+        raise RuleError(f"'{key}' must be a non-empty list of names")
+    return frozenset(v.strip().lower() for v in values)
+
+
+def _bound(spec, key):
+    value = spec.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RuleError(f"land_size.{key} must be a number")
+    return float(value)
+
+
+def _all(checks: List[Predicate]) -> Predicate:
+    if not checks:
+        return lambda profile: True
+    if len(checks) == 1:
+        return checks[0]
+    first, rest = checks[0], _all(checks[1:])
+    return lambda profile: first(profile) and rest(profile)
+
+
+def compile_rules(rules) -> Rule:
+    if not isinstance(rules, dict):
+        raise RuleError("Rules must be an object")
+    unknown = set(rules) - RULE_KEYS
+    if unknown:
+        raise RuleError(f"Unknown rule keys: {', '.join(sorted(unknown))}")
+
+    checks, filters = [], []
+    if 'verified' in rules:
+        if not isinstance(rules['verified'], bool):
+            raise RuleError("'verified' must be true or false")
+        wanted = rules['verified']
+        checks.append(lambda profile: profile.verified is wanted)
+        filters.append(Q(is_verified=wanted))
+    # Place names are stripped and lowercased in Python, which iexact on the raw column
+    # does not do for padded values; checked in Python only so the prefilter stays a superset
+    if 'districts' in rules:
+        districts = _names(rules, 'districts')
+        checks.append(lambda profile: profile.district in districts)
+    if 'taluks' in rules:
+        taluks = _names(rules, 'taluks')
+        checks.append(lambda profile: profile.taluk in taluks)
+    if 'land_size' in rules:
+        spec = rules['land_size']
+        if not isinstance(spec, dict) or set(spec) - {'min', 'max'}:
+            raise RuleError("'land_size' must be an object with 'min' and/or 'max'")
+        low, high = _bound(spec, 'min'), _bound(spec, 'max')
+        low = float('-inf') if low is None else low
+        high = float('inf') if high is None else high
+        checks.append(lambda profile: profile.land_size is not None and low <= profile.land_size <= high)
+        land = Q(land_size__isnull=False)
+        if low != float('-inf'):
+            land &= Q(land_size__gte=Decimal(str(low)))
+        if high != float('inf'):
+            land &= Q(land_size__lte=Decimal(str(high)))
+        filters.append(land)
+    if 'crops' in rules:
+        # JSON list membership is not portable SQL; checked in Python only
+        crops = _names(rules, 'crops')
+        checks.append(lambda profile: not crops.isdisjoint(profile.crops))
+    if 'any' in rules:
+        if not isinstance(rules['any'], list) or not rules['any']:
+            raise RuleError("'any' must be a non-empty list of rule objects")
+        options = [compile_rules(option) for option in rules['any']]
+        predicates = [option.predicate for option in options]
+        checks.append(lambda profile: any(predicate(profile) for predicate in predicates))
+        if all(option.prefilter is not None for option in options):
+            query = Q()
+            for option in options:
+                query |= option.prefilter
+            filters.append(query)
+
+    prefilter = None
+    for query in filters:
+        prefilter = query if prefilter is None else prefilter & query
+    return Rule(_all(checks), prefilter)
+
+
+class CompiledScheme(NamedTuple):
+    id: int
+    deadline: Optional[date]
+    predicate: Predicate
+
+
+class SchemeMatcher:
+    """Every active scheme compiled once; matches a profile against all of them in one pass."""
+
+    def __init__(self, schemes, version=None):
+        self.version = version
+        self.schemes: List[CompiledScheme] = []
+        for scheme in schemes:
+            try:
+                rule = compile_rules(scheme.rules)
+            except RuleError:
+                # Admin validates rules on save; skip anything written around it
+                continue
+            self.schemes.append(CompiledScheme(scheme.pk, scheme.deadline, rule.predicate))
+
+    @classmethod
+    def load(cls, version=None):
+        return cls(Scheme.objects.filter(is_active=True).only('id', 'rules', 'deadline').order_by('id'), version)
+
+    def match(self, profile: Profile, today: Optional[date] = None) -> List[int]:
+        today = today or date.today()
+        return [
+            scheme.id for scheme in self.schemes
+            if (scheme.deadline is None or scheme.deadline >= today) and scheme.predicate(profile)
+        ]
+
+
+def eligible_farmer_ids(rules, chunk_size=5000) -> List[int]:
+    """All farmers matching ``rules``, in one streamed pass over the SQL-narrowed farmers table."""
+    from farmers.models import Farmer
+
+    rule = compile_rules(rules)
+    farmers = Farmer.objects.filter(is_active=True)
+    if rule.prefilter is not None:
+        farmers = farmers.filter(rule.prefilter)
+    predicate = rule.predicate
+    return [
+        row[0]
+        for row in farmers.values_list('id', *Profile.FIELDS).iterator(chunk_size=chunk_size)
+        if predicate(Profile.from_values(*row[1:]))
+    ]
+
+
+_matcher: Optional[SchemeMatcher] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_matcher() -> SchemeMatcher:
+    """Process-wide matcher, recompiled when the schemes version changes."""
+    global _matcher, _checked_at
+    now = time.monotonic()
+    if _matcher is not None and now - _checked_at < settings.SCHEMES_CHECK_SECONDS:
+        return _matcher
+    with _lock:
+        version = current(SCHEMES_VERSION)
+        if _matcher is None or version != _matcher.version:
+            _matcher = SchemeMatcher.load(version)
+        _checked_at = now
+    return _matcher
+
+
+def eligible_scheme_ids(farmer) -> List[int]:
+    matcher = get_matcher()
+    profile = Profile.from_farmer(farmer)
+    # The date is part of the key so schemes drop out on the day after their deadline
+    key = f"schemes:eligible:{matcher.version}:{date.today().isoformat()}:{profile.digest()}"
+    ids = cache.get(key)
+    if ids is None:
+        ids = matcher.match(profile)
+        cache.set(key, ids, settings.SCHEMES_MATCH_CACHE_TTL)
+    return ids
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Scheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('description', models.TextField()),
+                ('benefit', models.CharField(help_text='e.g. "Up to 50% premium subsidy"', max_length=200)),
+                ('eligibility', models.CharField(max_length=300)),
+                ('rules', models.JSONField(blank=True, default=dict)),
+                ('icon', models.CharField(blank=True, max_length=20)),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'schemes',
+            },
+        ),
+    ]
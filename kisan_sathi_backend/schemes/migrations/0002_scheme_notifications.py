@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('schemes', '0001_schemes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchemeNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('farmer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='schemes.scheme')),
+            ],
+            options={
+                'db_table': 'scheme_notifications',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='schemenotification',
+            constraint=models.UniqueConstraint(fields=('scheme', 'farmer'), name='scheme_notification_once'),
+        ),
+    ]
@@ -1,3 +1,50 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 
-# Create your models here.
+
+class Scheme(models.Model):
+    """
+    A government scheme. ``eligibility`` is the text shown to farmers;
+    ``rules`` is its machine-readable form, matched against farmer
+    profiles by schemes.matching (see that module for the rule format).
+    """
+
+    name = models.CharField(max_length=200, unique=True)
+    description = models.TextField()
+    benefit = models.CharField(max_length=200, help_text="e.g. \"Up to 50% premium subsidy\"")
+    eligibility = models.CharField(max_length=300)
+    rules = models.JSONField(default=dict, blank=True)
+    icon = models.CharField(max_length=20, blank=True)
+    # Null for schemes that are always open
+    deadline = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'schemes'
+
+    def __str__(self) -> str:
+        return self.name
+
+    def clean(self):
+        from .matching import RuleError, compile_rules
+
+        try:
+            compile_rules(self.rules)
+        except RuleError as e:
+            raise ValidationError({'rules': str(e)})
+
+
+class SchemeNotification(models.Model):
+    """A farmer already told about a scheme, so re-running the admin action does not SMS them twice."""
+
+    scheme = models.ForeignKey(Scheme, on_delete=models.CASCADE, related_name='notifications')
+    farmer = models.ForeignKey('farmers.Farmer', on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'scheme_notifications'
+        constraints = [
+            models.UniqueConstraint(fields=['scheme', 'farmer'], name='scheme_notification_once'),
+        ]
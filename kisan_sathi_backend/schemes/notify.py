@@ -0,0 +1,31 @@
+from django.db import transaction
+
+from farmers.models import Farmer
+from notifications.models import OutboxMessage
+
+from .matching import eligible_farmer_ids
+from .models import Scheme, SchemeNotification
+
+
+def notify_eligible_farmers(scheme, batch_size=1000):
+    """
+    Queue an SMS about ``scheme`` to every eligible farmer not already told
+    about it; returns how many were queued.
+    """
+    body = f"New scheme you may be eligible for: {scheme.name}. {scheme.benefit}."
+    if scheme.deadline:
+        body += f" Apply by {scheme.deadline:%d %b %Y}."
+    with transaction.atomic():
+        # Two admins running the action at once would otherwise both see nobody notified
+        Scheme.objects.select_for_update().filter(pk=scheme.pk).first()
+        notified = set(SchemeNotification.objects.filter(scheme=scheme).values_list('farmer_id', flat=True))
+        ids = [pk for pk in eligible_farmer_ids(scheme.rules) if pk not in notified]
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            SchemeNotification.objects.bulk_create([SchemeNotification(scheme=scheme, farmer_id=pk) for pk in batch])
+            phones = Farmer.objects.filter(pk__in=batch).values_list('phone', flat=True)
+            OutboxMessage.objects.bulk_create([
+                OutboxMessage(channel=OutboxMessage.CHANNEL_SMS, recipient=str(phone), body=body)
+                for phone in phones
+            ])
+    return len(ids)
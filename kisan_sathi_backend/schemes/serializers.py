@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+from .models import Scheme
+
+
+class SchemeSerializer(serializers.ModelSerializer):
+    subsidy = serializers.CharField(source='benefit')
+    deadline = serializers.SerializerMethodField()
+    eligible = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Scheme
+        fields = ['id', 'name', 'description', 'subsidy', 'eligibility', 'deadline', 'icon', 'eligible']
+
+    def get_deadline(self, scheme):
+        return scheme.deadline.isoformat() if scheme.deadline else 'Ongoing'
+
+    def get_eligible(self, scheme):
+        eligible = self.context.get('eligible')
+        return None if eligible is None else scheme.pk in eligible
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from stats.counters import increment
+
+from .matching import SCHEMES_VERSION
+from .models import Scheme
+
+
+@receiver(post_save, sender=Scheme)
+@receiver(post_delete, sender=Scheme)
+def bump_schemes_version(sender, **kwargs):
+    # Every process recompiles its matcher, and cached matches fall out of use
+    transaction.on_commit(lambda: increment(SCHEMES_VERSION))
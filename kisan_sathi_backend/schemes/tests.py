@@ -1,3 +1,134 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from farmers.models import Farmer
+from farmers.tests import make_farmer
+from notifications.models import OutboxMessage
+
+from . import matching
+from .matching import Profile, RuleError, SchemeMatcher, compile_rules, eligible_farmer_ids, eligible_scheme_ids
+from .models import Scheme
+from .notify import notify_eligible_farmers
+
+
+def profile(land_size=2.0, crops=('Rice',), district='Mandya', taluk='Maddur', verified=True):
+    return Profile.from_values(land_size, list(crops), district, taluk, verified)
+
+
+class CompileRulesTests(TestCase):
+    def test_malformed_rules_are_rejected(self):
+        for rules in (
+            [], {'colour': 'green'}, {'verified': 'yes'}, {'districts': []}, {'districts': 'Mandya'},
+            {'crops': [1]}, {'land_size': 5}, {'land_size': {'min': '1'}}, {'land_size': {'min': True}},
+            {'land_size': {'least': 1}}, {'any': []}, {'any': [{'colour': 'green'}]},
+        ):
+            with self.subTest(rules=rules), self.assertRaises(RuleError):
+                compile_rules(rules)
+
+    def test_an_empty_rule_set_matches_everyone_without_a_prefilter(self):
+        rule = compile_rules({})
+        self.assertTrue(rule.predicate(profile()))
+        self.assertIsNone(rule.prefilter)
+
+    def test_place_and_crop_names_ignore_case_and_padding(self):
+        rule = compile_rules({'districts': [' mandya'], 'taluks': ['MADDUR'], 'crops': ['rice ']})
+        self.assertTrue(rule.predicate(profile(district='Mandya ', taluk=' Maddur', crops=['RICE'])))
+        self.assertFalse(rule.predicate(profile(district='Mysuru')))
+
+    def test_land_bounds_are_inclusive_and_need_a_land_size(self):
+        rule = compile_rules({'land_size': {'min': 1, 'max': 5}})
+        for land_size, expected in ((0.99, False), (1, True), (5, True), (5.01, False), (None, False)):
+            with self.subTest(land_size=land_size):
+                self.assertIs(rule.predicate(profile(land_size=land_size)), expected)
+        self.assertTrue(compile_rules({'land_size': {'max': 2}}).predicate(profile(land_size=0)))
+
+    def test_any_needs_one_option_to_hold(self):
+        rule = compile_rules({
+            'verified': True,
+            'any': [{'districts': ['Mysuru']}, {'land_size': {'max': 2}}],
+        })
+        self.assertTrue(rule.predicate(profile(district='Mysuru', land_size=10)))
+        self.assertTrue(rule.predicate(profile(district='Mandya', land_size=1)))
+        self.assertFalse(rule.predicate(profile(district='Mandya', land_size=10)))
+        self.assertFalse(rule.predicate(profile(district='Mysuru', verified=False)))
+
+
+class SchemeMatcherTests(TestCase):
+    def test_schemes_stop_matching_the_day_after_their_deadline(self):
+        today = date(2026, 6, 1)
+        open_scheme = Scheme.objects.create(name="Open", rules={}, deadline=None)
+        closing = Scheme.objects.create(name="Closing", rules={}, deadline=today)
+        Scheme.objects.create(name="Closed", rules={}, deadline=today - timedelta(days=1))
+        matcher = SchemeMatcher.load()
+        self.assertEqual(matcher.match(profile(), today=today), [open_scheme.pk, closing.pk])
+        self.assertEqual(matcher.match(profile(), today=today + timedelta(days=1)), [open_scheme.pk])
+
+    def test_rules_written_around_validation_are_skipped(self):
+        Scheme.objects.create(name="Broken", rules={'colour': 'green'})
+        valid = Scheme.objects.create(name="Valid", rules={})
+        self.assertEqual(SchemeMatcher.load().match(profile()), [valid.pk])
+
+
+@override_settings(SCHEMES_CHECK_SECONDS=0)
+class EligibleSchemeIdsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        matching._matcher = None
+        self.addCleanup(setattr, matching, '_matcher', None)
+        self.small = Scheme.objects.create(name="Small holders", rules={'land_size': {'max': 2}})
+        self.farmer = make_farmer(land_size=Decimal('1.50'))
+
+    def test_a_profile_edit_misses_the_cached_match(self):
+        self.assertEqual(eligible_scheme_ids(self.farmer), [self.small.pk])
+        self.farmer.land_size = Decimal('4.00')
+        self.farmer.save()
+        self.assertEqual(eligible_scheme_ids(self.farmer), [])
+
+    def test_farmers_with_the_same_profile_share_an_entry(self):
+        eligible_scheme_ids(self.farmer)
+        twin = make_farmer(phone='+919800000002', email='twin@example.com', land_size=Decimal('1.50'))
+        with mock.patch.object(SchemeMatcher, 'match') as match:
+            self.assertEqual(eligible_scheme_ids(twin), [self.small.pk])
+        match.assert_not_called()
+
+    def test_a_scheme_edit_recompiles_the_matcher(self):
+        self.assertEqual(eligible_scheme_ids(self.farmer), [self.small.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.small.rules = {'land_size': {'min': 2}}
+            self.small.save()
+        self.assertEqual(eligible_scheme_ids(self.farmer), [])
+
+
+class NotifyEligibleFarmersTests(TestCase):
+    def setUp(self):
+        self.padded = make_farmer(district='Mandya ')
+        self.upper = make_farmer(phone='+919800000002', email='upper@example.com', district='MANDYA')
+        make_farmer(phone='+919800000003', email='mysuru@example.com', district='Mysuru')
+        make_farmer(phone='+919800000004', email='inactive@example.com', is_active=False)
+        self.scheme = Scheme.objects.create(
+            name="Mandya drip", benefit="Drip kits", rules={'districts': ['Mandya']},
+            deadline=date(2026, 12, 31),
+        )
+
+    def test_matching_farmers_are_found_despite_stored_padding(self):
+        self.assertCountEqual(eligible_farmer_ids(self.scheme.rules), [self.padded.pk, self.upper.pk])
+
+    def test_queues_one_sms_per_eligible_farmer(self):
+        self.assertEqual(notify_eligible_farmers(self.scheme, batch_size=1), 2)
+        messages = OutboxMessage.objects.all()
+        self.assertCountEqual([m.recipient for m in messages], [str(self.padded.phone), str(self.upper.phone)])
+        self.assertIn("Apply by 31 Dec 2026", messages[0].body)
+        self.assertEqual({m.channel for m in messages}, {OutboxMessage.CHANNEL_SMS})
+
+    def test_running_again_only_messages_newly_eligible_farmers(self):
+        notify_eligible_farmers(self.scheme)
+        self.assertEqual(notify_eligible_farmers(self.scheme), 0)
+        self.assertEqual(OutboxMessage.objects.count(), 2)
+
+        Farmer.objects.filter(district='Mysuru').update(district='Mandya')
+        self.assertEqual(notify_eligible_farmers(self.scheme), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 3)
@@ -1,7 +1,8 @@
 from django.urls import path
+from .views import SchemeListView
 
 app_name = 'schemes'
 
-urlpatterns = []
-
-
+urlpatterns = [
+    path('', SchemeListView.as_view(), name='list'),
+]
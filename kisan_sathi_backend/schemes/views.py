@@ -1,3 +1,31 @@
-from django.shortcuts import render
+from datetime import date
 
-# Create your views here.
+from django.db.models import Q
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from .matching import eligible_scheme_ids
+from .models import Scheme
+from .serializers import SchemeSerializer
+
+
+class SchemeListView(APIView):
+    """
+    Open schemes. For a signed-in farmer each is flagged ``eligible``
+    against their profile, eligible ones first; ``eligible=1`` lists
+    only those.
+    """
+
+    def get(self, request):
+        schemes = Scheme.objects.filter(Q(deadline__isnull=True) | Q(deadline__gte=date.today()), is_active=True)
+        eligible = None
+        if request.user.is_authenticated:
+            eligible = set(eligible_scheme_ids(request.user))
+            if request.query_params.get('eligible') in ('1', 'true'):
+                schemes = schemes.filter(pk__in=eligible)
+
+        schemes = list(schemes.order_by('deadline', 'name'))
+        if eligible is not None:
+            schemes.sort(key=lambda scheme: scheme.pk not in eligible)
+        data = SchemeSerializer(schemes, many=True, context={'eligible': eligible}).data
+        return Response({'success': True, 'data': data})
@@ -0,0 +1,7 @@
+from django.contrib import admin
+from .models import StatCounter
+
+
+@admin.register(StatCounter)
+class StatCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at']
@@ -0,0 +1,74 @@
+"""
+Incrementally maintained dashboard counters.
+
+Writers call ``increment`` (a single ``UPDATE ... SET value = value + n``),
+``reconcile`` recomputes everything from the source tables to correct drift
+(bulk inserts, farmers ageing out of the active window) and ``snapshot``
+serves the cached values to the admin dashboard.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import StatCounter
+
+
+FARMERS_TOTAL = 'farmers.total'
+FARMERS_VERIFIED = 'farmers.verified'
+FARMERS_ACTIVE = 'farmers.active'
+FARMERS_LOGINS = 'farmers.logins'
+ANALYSES_TOTAL = 'crop_doctor.analyses'
+TRANSACTIONS_TOTAL = 'marketplace.transactions'
+REVENUE_TOTAL = 'marketplace.revenue'
+
+SNAPSHOT_CACHE_KEY = 'stats:snapshot'
+
+
+def active_since():
+    """Farmers who logged in after this moment count as active."""
+    return timezone.now() - timedelta(days=settings.STATS_ACTIVE_DAYS)
+
+
+def increment(name, delta=1):
+    if not StatCounter.objects.filter(name=name).update(value=F('value') + delta):
+        counter, created = StatCounter.objects.get_or_create(name=name, defaults={'value': delta})
+        if not created:
+            StatCounter.objects.filter(name=name).update(value=F('value') + delta)
+
+
+def current(name):
+    """Read one counter straight from the table (bypasses the snapshot cache)."""
+    return StatCounter.objects.filter(name=name).values_list('value', flat=True).first() or 0
+
+
+def reconcile():
+    """Recompute every counter from source tables; returns the new values."""
+    from crop_doctor.models import Analysis
+    from farmers.models import Farmer
+    from marketplace.models import Order
+
+    confirmed = Order.objects.filter(status=Order.CONFIRMED)
+
+    values = {
+        FARMERS_TOTAL: Farmer.objects.count(),
+        FARMERS_VERIFIED: Farmer.objects.filter(is_verified=True).count(),
+        FARMERS_ACTIVE: Farmer.objects.filter(last_login__gte=active_since()).count(),
+        ANALYSES_TOTAL: Analysis.objects.count(),
+        TRANSACTIONS_TOTAL: confirmed.count(),
+        REVENUE_TOTAL: confirmed.aggregate(total=Sum('amount'))['total'] or 0,
+    }
+    for name, value in values.items():
+        StatCounter.objects.update_or_create(name=name, defaults={'value': value})
+    cache.delete(SNAPSHOT_CACHE_KEY)
+    return values
+
+
+def snapshot():
+    values = cache.get(SNAPSHOT_CACHE_KEY)
+    if values is None:
+        values = dict(StatCounter.objects.values_list('name', 'value'))
+        cache.set(SNAPSHOT_CACHE_KEY, values, settings.STATS_CACHE_TTL)
+    return values
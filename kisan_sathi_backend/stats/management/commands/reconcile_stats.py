@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from stats.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute dashboard counters from source tables (run periodically, e.g. hourly from cron)"
+
+    def handle(self, *args, **options):
+        for name, value in reconcile().items():
+            self.stdout.write(f"{name}: {value}")
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class StatCounter(models.Model):
+    """One row per dashboard metric, bumped in place with F() updates."""
+
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stat_counters'
+
+    def __str__(self) -> str:
+        return f"{self.name}={self.value}"
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from crop_doctor.models import Analysis
+from farmers.models import Farmer
+
+from .counters import ANALYSES_TOTAL, FARMERS_TOTAL, FARMERS_VERIFIED, increment
+
+
+@receiver(post_save, sender=Farmer)
+def count_new_farmer(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        increment(FARMERS_TOTAL)
+        if instance.is_verified:
+            increment(FARMERS_VERIFIED)
+
+
+@receiver(post_save, sender=Analysis)
+def count_new_analysis(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        increment(ANALYSES_TOTAL)
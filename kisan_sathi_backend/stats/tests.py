@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from crop_doctor.models import Analysis
+from farmers.authentication import FarmerRefreshToken
+from farmers.tests import make_farmer
+from marketplace.models import Order
+from marketplace.tests import make_listing
+
+from . import counters
+from .counters import current, increment, reconcile, snapshot
+from .models import StatCounter
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_increment_creates_then_adds(self):
+        increment('test.counter')
+        increment('test.counter', 41)
+        self.assertEqual(current('test.counter'), 42)
+        self.assertEqual(current('test.missing'), 0)
+
+    def test_new_farmers_and_analyses_are_counted(self):
+        make_farmer()
+        farmer = make_farmer(phone='+919800000002', email='verified@example.com', is_verified=True)
+        Analysis.objects.create(farmer=farmer, crop_type='tomato')
+        # Saving again is not a new row
+        farmer.save()
+        self.assertEqual(current(counters.FARMERS_TOTAL), 2)
+        self.assertEqual(current(counters.FARMERS_VERIFIED), 1)
+        self.assertEqual(current(counters.ANALYSES_TOTAL), 1)
+
+    def test_only_the_first_login_in_the_window_makes_a_farmer_active(self):
+        farmer = make_farmer()
+        farmer.set_password('correct horse')
+        farmer.save()
+        for _ in range(2):
+            response = self.client.post('/api/auth/login/', {'phone': str(farmer.phone), 'password': 'correct horse'})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(current(counters.FARMERS_LOGINS), 2)
+        self.assertEqual(current(counters.FARMERS_ACTIVE), 1)
+
+    def test_reconcile_recomputes_from_source_tables(self):
+        now = timezone.now()
+        seller = make_farmer(is_verified=True)
+        buyer = make_farmer(phone='+919800000002', email='buyer@example.com', last_login=now)
+        make_farmer(phone='+919800000003', email='lapsed@example.com', last_login=now - timedelta(days=90))
+        Analysis.objects.create(farmer=seller, crop_type='ragi')
+        listing = make_listing(seller)
+        for status, amount in ((Order.CONFIRMED, 300), (Order.CONFIRMED, 200), (Order.CANCELLED, 900)):
+            Order.objects.create(
+                listing=listing, buyer=buyer, quantity=1, amount=amount, status=status,
+                request_key=f'{status}-{amount}', expires_at=now,
+            )
+        # Drift: bulk writes that skipped the signals, and a farmer who left the active window
+        StatCounter.objects.update(value=0)
+        increment(counters.FARMERS_ACTIVE, 2)
+
+        self.assertEqual(reconcile(), {
+            counters.FARMERS_TOTAL: 3,
+            counters.FARMERS_VERIFIED: 1,
+            counters.FARMERS_ACTIVE: 1,
+            counters.ANALYSES_TOTAL: 1,
+            counters.TRANSACTIONS_TOTAL: 2,
+            counters.REVENUE_TOTAL: 500,
+        })
+        self.assertEqual(current(counters.FARMERS_ACTIVE), 1)
+
+    def test_reconcile_drops_the_cached_snapshot(self):
+        make_farmer()
+        self.assertEqual(snapshot()[counters.FARMERS_TOTAL], 1)
+        make_farmer(phone='+919800000002', email='second@example.com')
+        self.assertEqual(snapshot()[counters.FARMERS_TOTAL], 1)
+        reconcile()
+        self.assertEqual(snapshot()[counters.FARMERS_TOTAL], 2)
+
+
+class AdminStatsViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.farmer = make_farmer(is_verified=True)
+        self.admin = make_farmer(phone='+919800000002', email='admin@example.com', is_staff=True)
+
+    def get(self, user=None):
+        headers = {}
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f"Bearer {FarmerRefreshToken.for_user(user).access_token}"
+        return self.client.get('/api/admin/stats/', **headers)
+
+    def test_only_staff_see_stats(self):
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.get(self.farmer).status_code, 403)
+
+    def test_serves_the_counters_in_the_dashboard_shape(self):
+        response = self.get(self.admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {
+            'totalUsers': 2, 'activeUsers': 0, 'verifiedUsers': 1, 'totalLogins': 0,
+            'totalAnalyses': 0, 'totalTransactions': 0, 'revenue': 0,
+        })
+
+    def test_stats_are_served_from_the_cached_snapshot(self):
+        self.get(self.admin)
+        increment(counters.FARMERS_LOGINS, 5)
+        self.assertEqual(self.get(self.admin).json()['data']['totalLogins'], 0)
+        cache.delete(counters.SNAPSHOT_CACHE_KEY)
+        self.assertEqual(self.get(self.admin).json()['data']['totalLogins'], 5)
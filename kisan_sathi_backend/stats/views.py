@@ -0,0 +1,24 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+
+from . import counters
+
+
+class AdminStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        values = counters.snapshot()
+        return Response({
+            'success': True,
+            'data': {
+                'totalUsers': values.get(counters.FARMERS_TOTAL, 0),
+                'activeUsers': values.get(counters.FARMERS_ACTIVE, 0),
+                'verifiedUsers': values.get(counters.FARMERS_VERIFIED, 0),
+                'totalLogins': values.get(counters.FARMERS_LOGINS, 0),
+                'totalAnalyses': values.get(counters.ANALYSES_TOTAL, 0),
+                'totalTransactions': values.get(counters.TRANSACTIONS_TOTAL, 0),
+                'revenue': values.get(counters.REVENUE_TOTAL, 0),
+            }
+        })
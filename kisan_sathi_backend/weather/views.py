@@ -1,31 +1,66 @@
-from decouple import config
 import requests
 from datetime import datetime
+from urllib.parse import quote
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from kisan_sathi.conditional import conditional
+from kisan_sathi.metrics import UPSTREAM, timer
+
+
+def _city(request) -> str:
+    return request.query_params.get('q') or request.query_params.get('city') or 'Bengaluru'
+
+
+def _cache_key(city: str) -> str:
+    return f"weather:summary:{quote(city.strip().lower())}"
+
+
+def _summary_validators(view, request):
+    entry = view.cached_summary(request)
+    if entry is None:
+        return None
+    fetched_at = entry['fetched_at']
+    return f"{_cache_key(_city(request))}:{fetched_at.timestamp()}", fetched_at
+
 
 class WeatherSummaryView(APIView):
+    def cached_summary(self, request):
+        """The city's cached summary as ``{'payload', 'fetched_at'}``, read once per request."""
+        if not hasattr(self, '_summary'):
+            self._summary = cache.get(_cache_key(_city(request)))
+        return self._summary
+
+    @conditional(_summary_validators)
     def get(self, request):
-        city = request.query_params.get('q') or request.query_params.get('city') or 'Bengaluru'
-        api_key = config('OPENWEATHER_API_KEY', default='')
+        city = _city(request)
+        api_key = settings.OPENWEATHER_API_KEY
         if not api_key or api_key == 'your-api-key':
             return Response({
                 'success': False,
                 'message': 'OPENWEATHER_API_KEY missing. Set it in backend .env and restart.'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        entry = self.cached_summary(request)
+        if entry is not None:
+            return Response(entry['payload'])
+
         try:
-            current_url = 'https://api.openweathermap.org/data/2.5/weather'
-            forecast_url = 'https://api.openweathermap.org/data/2.5/forecast'
+            current_url = f'{settings.OPENWEATHER_BASE_URL}/weather'
+            forecast_url = f'{settings.OPENWEATHER_BASE_URL}/forecast'
             params = {'q': city, 'appid': api_key, 'units': 'metric'}
 
-            current = requests.get(current_url, params=params, timeout=10)
+            with timer(UPSTREAM, 'openweather'):
+                current = requests.get(current_url, params=params, timeout=10)
             current.raise_for_status()
             current_data = current.json()
 
-            forecast = requests.get(forecast_url, params=params, timeout=10)
+            with timer(UPSTREAM, 'openweather'):
+                forecast = requests.get(forecast_url, params=params, timeout=10)
             forecast.raise_for_status()
             forecast_data = forecast.json()
 
@@ -125,13 +160,17 @@ class WeatherSummaryView(APIView):
             except Exception:
                 pass
 
-            return Response({
+            payload = {
                 'success': True,
                 'city': display_city,
                 'current': current_payload,
                 'forecast': daily,
                 'alerts': [],
-            })
+            }
+            # Only real summaries are cached; the fallback below is retried next time
+            self._summary = {'payload': payload, 'fetched_at': timezone.now()}
+            cache.set(_cache_key(city), self._summary, settings.WEATHER_CACHE_TTL)
+            return Response(payload)
         except requests.HTTPError as e:
             try:
                 err = e.response.json()